@@ -1,17 +1,48 @@
+import sys
 from sys import exit
 
+import pydemic.argfuncs as argfuncs
+import pydemic.constants as constants
 import pydemic.exceptions as exceptions
 from pydemic.display import indent
-from pydemic.main import main
-
-try:
-    main()
-except exceptions.GameOverWin:
-    print('Congratulations, you won!')
-except exceptions.GameOverLose as error:
-    print('GAME OVER')
-    print(f'{indent}{error}')
-    print(f'{indent}Better luck next time!')
-except KeyboardInterrupt:
-    print()  # Start new line in case shell doesn't
-    exit()
+
+
+def run():
+    # Parse before importing the game modules so --help and --version exit without loading them
+    args = argfuncs.parse_args(
+        sys.argv[1:],
+        constants.player_min_word,
+        constants.player_max_word,
+        constants.epidemic_min_word,
+        constants.epidemic_max_word,
+        constants.default_map,
+        constants.start_city,
+        constants.outbreak_max,
+        constants.infection_seq,
+        constants.cube_num,
+        constants.station_num,
+    )
+
+    from pydemic.main import main
+
+    try:
+        main(args)
+    except exceptions.GameOverWin:
+        print('Congratulations, you won!')
+    except exceptions.GameOverLose as error:
+        print('GAME OVER')
+        print(f'{indent}{error}')
+        print(f'{indent}Better luck next time!')
+    except KeyboardInterrupt:
+        print()  # Start new line in case shell doesn't
+        exit()
+
+
+# Guard so worker processes that re-import the main module do not start a game
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['sweep']:
+        from pydemic.sweep import main as sweep
+
+        sweep(sys.argv[2:])
+    else:
+        run()
@@ -20,12 +20,49 @@ def parse_args(
     infection_seq,
     cube_num,
     station_num,
+):
+    parser = make_parser(
+        player_min_word,
+        player_max_word,
+        epidemic_min_word,
+        epidemic_max_word,
+        default_map,
+        start_city,
+        outbreak_max,
+        infection_seq,
+        cube_num,
+        station_num,
+    )
+
+    return parser.parse_args(args)
+
+
+def make_parser(
+    player_min_word,
+    player_max_word,
+    epidemic_min_word,
+    epidemic_max_word,
+    default_map,
+    start_city,
+    outbreak_max,
+    infection_seq,
+    cube_num,
+    station_num,
 ):
     parser = ArgumentParser(
         prog='pydemic',
         description='A text-based implementation of the board game Pandemic.',
+        epilog=(
+            'Run "%(prog)s sweep [OPTIONS]" to play unattended games over a grid of settings; '
+            'see "%(prog)s sweep -h" for its options.'
+        ),
         formatter_class=ArgumentDefaultsHelpFormatter,
     )
+    parser.add_argument(
+        '--version',
+        action='version',
+        version=f'%(prog)s {__version__}',
+    )
     parser.add_argument(
         '--player_num',
         default=None,
@@ -84,8 +121,28 @@ def parse_args(
         type=int,
         help='the total number of stations',
     )
+    parser.add_argument(
+        '--load',
+        default=None,
+        help='a saved game to resume; the game settings are read from the save',
+    )
+    parser.add_argument(
+        '--autosave',
+        default=constants.autosave_path,
+        help='the file where the game is saved after every command',
+    )
+    parser.add_argument(
+        '--no_autosave',
+        action='store_true',
+        help='do not save the game after every command',
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='resume the game saved in the autosave file',
+    )
 
-    return parser.parse_args(args)
+    return parser
 
 
 def check_args(
@@ -0,0 +1,104 @@
+"""Checkpoints of interactive games written in the background.
+
+An autosaver observes the commands of a game. After each one, it encodes a save of the state on
+the calling thread, which only takes microseconds, and hands it to a writer thread, so the prompt
+never waits on the disk. The writer only keeps the latest save, and after each write it waits for
+an interval, so bursts of commands are batched into one write. Writes go to a temporary file that
+replaces the checkpoint, so the checkpoint is always a complete save. If a write fails, the writer
+keeps the error and raises it from the next checkpoint or from close.
+"""
+
+import os
+import threading
+
+import pydemic.records as records
+import pydemic.saves as saves
+
+
+def write_atomic(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class Autosaver:
+    def __init__(self, path, interval=1):
+        self.path = path
+        self.interval = interval
+        self.pending = None
+        self.closed = False
+        self.written = False  # Whether a checkpoint exists at path
+        self.error = None  # The last error of the writer that was not raised yet
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name='autosave', daemon=True)
+        self.thread.start()
+
+    def attach(self, state):
+        """Checkpoint a state after each of its commands."""
+        state.hooks.observe(records.Command, self.on_command)
+
+    def on_command(self, state, record):
+        # A full disk should not end an interactive game, so only report the error
+        try:
+            self.checkpoint(state)
+        except OSError as error:
+            print(f'Could not autosave to {self.path}: {error}')
+
+    def checkpoint(self, state, phase=None):
+        """Queue a save of a state, then raise the error of a failed earlier write, if any."""
+        data = saves.dumps(state, phase)
+        with self.condition:
+            self.pending = data
+            self.condition.notify()
+        self.raise_error()
+
+    def raise_error(self):
+        with self.condition:
+            error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                data, self.pending = self.pending, None
+                closed = self.closed
+            if data is not None:
+                try:
+                    write_atomic(self.path, data)
+                except OSError as error:
+                    with self.condition:
+                        self.error = error
+                else:
+                    self.written = True
+            if closed:
+                return
+            with self.condition:  # Batch the commands in the interval into the next write
+                self.condition.wait_for(lambda: self.closed, timeout=self.interval)
+
+    def close(self):
+        """Write any pending checkpoint, stop the writer thread, and raise any error of the writer."""
+        self.stop()
+        self.raise_error()
+
+    def stop(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+
+    def discard(self):
+        """Stop the writer thread and remove the checkpoint, e.g. when the game is over."""
+        with self.condition:
+            self.pending = None
+        self.stop()
+        for path in [self.path, f'{self.path}.tmp']:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,242 @@
+"""Append-only binary logs of the decisions in games.
+
+Each decision is a fixed-width record of 32-bit integers in native byte order, so a log can be
+memory-mapped and read by column without parsing, e.g. with memoryview slices or
+numpy.memmap(path, dtype='i4').reshape(-1, width). The first record of a file is a header with a
+magic number, the format version, and the width of a record.
+
+Records store pieces as indices into a table of (NAMESPACE, NAME) symbols, which is written to a
+JSON file next to the log, i.e. PATH.json. Names are only unique within a namespace, e.g. a player
+may be named after a city, so each argument is looked up in the namespace that arg_namespaces gives
+for its position. Fields:
+    turn: Turn count when the decision was made
+    phase: Index into phases
+    actor: Index of the deciding player in the symbols or -1
+    code: Index into codes, i.e. the action, event card, or discard
+    arg0-arg5: Indices of the arguments in the symbols or -1 if absent
+    rng: Position of the generator of the state, i.e. the number of words drawn from it
+    hash_lo, hash_hi: Low and high 32 bits of the state hash before the decision
+"""
+
+import json
+import os
+from array import array
+from contextlib import ExitStack
+from mmap import ACCESS_READ, mmap
+
+import pydemic.cards as cards
+import pydemic.simulate as simulate
+
+magic = 0x474C4450  # "PDLG" in little-endian order
+version = 3
+fields = [
+    'turn',
+    'phase',
+    'actor',
+    'code',
+    'arg0',
+    'arg1',
+    'arg2',
+    'arg3',
+    'arg4',
+    'arg5',
+    'rng',
+    'hash_lo',
+    'hash_hi',
+]
+width = len(fields)
+arg_max = 6
+phases = ['action', 'draw', 'infect', 'epidemic', 'discard']
+codes = (
+    [('action', name) for name in simulate.actions]
+    + [('event', name) for name in cards.events]
+    + [('discard', None)]
+)
+arg_namespaces = {
+    ('action', 'ground'): ('city', 'player'),
+    ('action', 'direct'): ('city', 'player'),
+    ('action', 'charter'): ('city', 'player'),
+    ('action', 'shuttle'): ('city', 'player'),
+    ('action', 'station'): ('city',),
+    ('action', 'treat'): ('color',),
+    ('action', 'share'): ('player', 'card'),
+    ('action', 'cure'): ('color',) + ('card',) * (arg_max - 1),
+    ('action', 'pass'): (),
+    ('action', 'airlift'): ('player', 'player'),
+    ('action', 'opex_shuttle'): ('city', 'card'),
+    ('action', 'contingency'): ('card',),
+    ('event', 'airlift'): ('player', 'city'),
+    ('event', 'forecast'): ('number',) * arg_max,
+    ('event', 'government_grant'): ('city',),
+    ('event', 'one_quiet_night'): (),
+    ('event', 'resilient_population'): ('city',),
+    ('discard', None): ('card',),
+}
+
+
+def get_symbols(state):
+    """Return the (NAMESPACE, NAME) symbols of the pieces of a state in a fixed order.
+
+    Small integers are included for the orders of forecast events. Absent arguments, e.g. the
+    removed station of a station action while stations remain, are the symbol (None, None).
+    """
+    city_names = sorted(state.cities)
+    return [
+        (None, None),
+        *[('number', i) for i in range(arg_max)],
+        *[('city', name) for name in city_names],
+        *[('color', color) for color in state.disease_track.colors],
+        *[('player', name) for name in state.players],
+        *[('card', name) for name in [*city_names, *cards.events]],
+    ]
+
+
+def get_tables(symbols):
+    """Return the tables written next to a log, as they are read back from JSON."""
+    return json.loads(json.dumps({'symbols': symbols, 'codes': codes, 'phases': phases}))
+
+
+def to_int32(n):
+    return n - (1 << 32) if n >= 1 << 31 else n
+
+
+class LogWriter:
+    """Writer that appends decision records to a log.
+
+    If the log exists, its tables must match those of state, i.e. the games must have the same
+    map and players. Raises ValueError otherwise.
+    """
+
+    def __init__(self, path, state):
+        self.path = path
+        self.symbols = get_symbols(state)
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.code_ids = {code: i for i, code in enumerate(codes)}
+        tables = get_tables(self.symbols)
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new:
+            try:
+                with open(f'{path}.json') as file:
+                    stored = json.load(file)
+            except (OSError, ValueError):
+                stored = None
+            if stored != tables:
+                raise ValueError(f'{path} was written with different symbols or codes.')
+
+        # Keep the file open for the writer, but close it if the header cannot be written
+        with ExitStack() as stack:
+            self.file = stack.enter_context(open(path, 'ab'))
+            if new:
+                header = [magic, version, width] + [0] * (width - 3)
+                self.file.write(array('i', header).tobytes())
+                with open(f'{path}.json', 'w') as file:
+                    json.dump(tables, file)
+            self.stack = stack.pop_all()
+
+    def symbol_id(self, namespace, name):
+        return self.symbol_ids[(None, None) if name is None else (namespace, name)]
+
+    def write(self, state, phase, actor, kind, name, args=()):
+        if len(args) > arg_max:
+            raise ValueError(f'Records have at most {arg_max} arguments.')
+        h = state.hash
+        namespaces = arg_namespaces[(kind, name)]
+        record = [
+            state.turn_count,
+            phases.index(phase),
+            self.symbol_id('player', actor) if actor is not None else -1,
+            self.code_ids[(kind, name)],
+            *[self.symbol_id(namespace, arg) for namespace, arg in zip(namespaces, args)],
+            *[-1] * (arg_max - len(args)),
+            state.rng.position,
+            to_int32(h & 0xFFFFFFFF),
+            to_int32(h >> 32),
+        ]
+        self.file.write(array('i', record).tobytes())
+
+    def close(self):
+        self.stack.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class LoggingPolicy:
+    """Policy that writes the decisions of another policy to a log."""
+
+    def __init__(self, policy, writer):
+        self.policy = policy
+        self.writer = writer
+
+    def choose_action(self, state, player):
+        name, *args = action = self.policy.choose_action(state, player)
+        self.writer.write(state, 'action', player.name, 'action', name, args)
+        return action
+
+    def choose_discard(self, state, player):
+        card_name = self.policy.choose_discard(state, player)
+        self.writer.write(state, 'discard', player.name, 'discard', None, [card_name])
+        return card_name
+
+    def choose_event(self, state, phase):
+        event = self.policy.choose_event(state, phase)
+        if event is not None:
+            player_name, card_name, *args = event
+            self.writer.write(state, phase, player_name, 'event', card_name, args)
+        return event
+
+
+class LogReader:
+    """Memory-mapped reader of a log.
+
+    Records are returned as lists of integers in the order of fields, and columns as strided
+    memoryviews of the mapped file, so reading a column neither parses nor copies the log.
+    """
+
+    def __init__(self, path):
+        with open(f'{path}.json') as file:
+            tables = json.load(file)
+        self.symbols = [tuple(symbol) for symbol in tables['symbols']]
+        self.codes = [tuple(code) for code in tables['codes']]
+        self.phases = tables['phases']
+        # Release the mapping and close the file in reverse order, also if the header is bad
+        with ExitStack() as stack:
+            self.file = stack.enter_context(open(path, 'rb'))
+            self.mmap = stack.enter_context(mmap(self.file.fileno(), 0, access=ACCESS_READ))
+            self.values = memoryview(self.mmap).cast('i')
+            stack.callback(self.values.release)
+            if list(self.values[:3]) != [magic, version, width]:
+                raise ValueError(f'{path} is not a version {version} log.')
+            self.stack = stack.pop_all()
+
+    def __len__(self):
+        return len(self.values) // width - 1
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError('Record index out of range.')
+        start = (i % len(self) + 1) * width
+        return self.values[start : start + width].tolist()
+
+    def column(self, field):
+        return self.values[width + fields.index(field) :: width]
+
+    def decode(self, i):
+        """Return a record as (TURN, PHASE, ACTOR, KIND, NAME, ARGS) with pieces as names."""
+        turn, phase, actor, code, *args = self[i][: 4 + arg_max]
+        kind, name = self.codes[code]
+        args = tuple(self.symbols[arg][1] for arg in args if arg >= 0)
+        actor = self.symbols[actor][1] if actor >= 0 else None
+        return turn, self.phases[phase], actor, kind, name, args
+
+    def close(self):
+        self.stack.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
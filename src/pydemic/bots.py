@@ -0,0 +1,405 @@
+"""Definitions of automated policies for unattended games.
+
+Policies return actions and events as tuples of the form (NAME, *ARGS), which are applied by the
+quiet action functions in simulate. Candidate actions are scored with indices precomputed from the
+map, so bots never call the printing action methods of the roles.
+"""
+
+from collections import deque
+from functools import lru_cache
+
+
+# Indices
+@lru_cache
+def get_distances(adjacency):
+    """Return the all-pairs ground distances of a map given as ((CITY, NEIGHBORS), ...)."""
+    neighbors = dict(adjacency)
+    distances = {}
+    for source in neighbors:
+        dists = {source: 0}
+        queue = deque([source])
+        while queue:
+            name = queue.popleft()
+            for neighbor in neighbors[name]:
+                if neighbor not in dists:
+                    dists[neighbor] = dists[name] + 1
+                    queue.append(neighbor)
+        distances[source] = dists
+    return distances
+
+
+class BoardIndex:
+    def __init__(self, state):
+        self.distances = get_distances(state.topology.adjacency)
+
+    def stations(self, state):
+        return list(state.stations)
+
+    def station_distance(self, city_name, stations):
+        return min([self.distances[city_name][station] for station in stations], default=None)
+
+
+# Policies
+class Policy:
+    """Policy that passes every action and discards the oldest card when over the hand limit."""
+
+    def __init__(self, state):
+        pass
+
+    def choose_action(self, state, player):
+        return ('pass',)
+
+    def choose_discard(self, state, player):
+        return next(iter(player.hand))
+
+    def choose_event(self, state, phase):
+        return None
+
+
+class HeuristicPolicy(Policy):
+    """Policy that delegates each player's decisions to a bot for its role."""
+
+    def __init__(self, state):
+        self.index = BoardIndex(state)
+        self.bots = {
+            name: bots.get(player.role, Bot)(self.index) for name, player in state.players.items()
+        }
+
+    def choose_action(self, state, player):
+        return self.bots[player.name].choose_action(state, player)
+
+    def choose_discard(self, state, player):
+        return self.bots[player.name].choose_discard(state, player)
+
+    def choose_event(self, state, phase):
+        for name, player in state.players.items():
+            event = self.bots[name].choose_event(state, player, phase)
+            if event is not None:
+                return (name, *event)
+        return None
+
+
+# Bots
+class Bot:
+    """Greedy treat/cure bot that moves toward the cities at highest risk.
+
+    Decisions are made in priority order: cure or head to a station with a cure in hand, treat,
+    use a role-specific ability, share cards toward a cure, build a station, and finally move
+    toward the riskiest city.
+    """
+
+    risk_weights = (0, 1, 3, 9)  # Indexed by the number of cubes of a color in a city
+    spend_max = 2  # Most cards of an uncured color that may be spent on movement
+    station_spacing = 3  # Least distance to the nearest station that justifies building one
+
+    def __init__(self, index):
+        self.index = index
+
+    # Queries
+    def counts(self, player):
+        return player.color_counts  # Maintained by the player, so never mutate
+
+    def cure_color(self, state, player, counts):
+        for color, count in counts.items():
+            if count >= player.cure_num and state.disease_track.is_active(color):
+                return color
+        return None
+
+    def is_spendable(self, state, player, card_name, counts):
+        card = player.hand[card_name]
+        if card.type != 'city':
+            return False
+        if not state.disease_track.is_active(card.color):
+            return True
+        return counts[card.color] <= self.spend_max
+
+    def city_risk(self, state, city):
+        risk = 0
+        for color, cubes in city.cubes.items():
+            if not state.disease_track.is_eradicated(color):
+                risk += self.risk_weights[cubes]
+        return risk
+
+    # Movement
+    def move_options(self, state, player, counts, stations):
+        city = player.city
+        options = [(('ground', name), name) for name in city.neighbors]
+        if city.station:
+            options.extend([(('shuttle', name), name) for name in stations if name != city.name])
+        for card_name in player.hand:
+            if card_name in state.cities and card_name != city.name:
+                if self.is_spendable(state, player, card_name, counts):
+                    options.append((('direct', card_name), card_name))
+        return options
+
+    def step_toward(self, state, player, targets, counts, stations):
+        """Return the move that minimizes the distance to the nearest of the targets."""
+        distances = self.index.distances
+        best_action, best_distance = None, None
+        for action, destination in self.move_options(state, player, counts, stations):
+            distance = min([distances[destination][target] for target in targets])
+            if best_distance is None or distance < best_distance:
+                best_action, best_distance = action, distance
+
+        # Charter directly to a target if the current city card is spendable
+        city_name = player.city.name
+        if (
+            best_distance is not None
+            and best_distance > 1
+            and city_name in player.hand
+            and self.is_spendable(state, player, city_name, counts)
+        ):
+            return ('charter', min(targets, key=distances[city_name].__getitem__))
+        return best_action
+
+    # Decisions
+    def choose_action(self, state, player):
+        counts = self.counts(player)
+        stations = self.index.stations(state)
+        for choose in [
+            self.choose_cure,
+            self.choose_treat,
+            self.choose_special,
+            self.choose_share,
+            self.choose_station,
+        ]:
+            action = choose(state, player, counts, stations)
+            if action is not None:
+                return action
+
+        action = self.choose_move(state, player, counts, stations)
+        if action is not None:
+            return action
+        return ('pass',)
+
+    def choose_special(self, state, player, counts, stations):
+        return None
+
+    def choose_cure(self, state, player, counts, stations):
+        color = self.cure_color(state, player, counts)
+        if color is None:
+            return None
+        if player.city.station:
+            names = [name for name, card in player.hand.items() if card.color == color]
+            return ('cure', color, *names[: player.cure_num])
+        if stations:
+            return self.step_toward(state, player, stations, counts, stations)
+        return None
+
+    def choose_treat(self, state, player, counts, stations):
+        city = player.city
+        colors = [color for color, cubes in city.cubes.items() if cubes > 0]
+        if not colors:
+            return None
+        return ('treat', max(colors, key=lambda color: self.treat_value(state, city, color)))
+
+    def treat_value(self, state, city, color):
+        value = city.cubes[color]
+        if state.disease_track.is_cured(color):
+            value += 3  # Removes every cube
+        return value
+
+    def choose_share(self, state, player, counts, stations):
+        others = [other for other in player.city.players.values() if other is not player]
+        if not others:
+            return None
+
+        # Give the current city card to a co-located player closer to a cure
+        city_name = player.city.name
+        if city_name in player.hand:
+            color = player.hand[city_name].color
+            for other in others:
+                if self.is_needed_by(state, other, color, counts[color] - player.cure_num):
+                    return ('share', other.name, city_name)
+
+        # Take the current city card from a co-located player farther from a cure
+        for other in others:
+            if city_name in other.hand:
+                color = other.hand[city_name].color
+                other_counts = self.counts(other)
+                if self.is_needed_by(state, player, color, other_counts[color] - other.cure_num):
+                    return ('share', other.name, city_name)
+        return None
+
+    def is_needed_by(self, state, receiver, color, giver_need):
+        # Needs are negative numbers of cards missing for a cure, so a larger need is closer
+        # Strict comparison prevents the same card from being passed back and forth
+        if not state.disease_track.is_active(color):
+            return False
+        receiver_need = self.counts(receiver)[color] - receiver.cure_num
+        return receiver_need > giver_need
+
+    def choose_station(self, state, player, counts, stations):
+        city = player.city
+        if city.station or state.station_count == 0 or not self.can_build(state, player, counts):
+            return None
+        distance = self.index.station_distance(city.name, stations)
+        if distance is not None and distance < self.station_spacing:
+            return None
+        return ('station', None)
+
+    def can_build(self, state, player, counts):
+        city_name = player.city.name
+        return city_name in player.hand and self.is_spendable(state, player, city_name, counts)
+
+    def choose_move(self, state, player, counts, stations):
+        target = self.risk_target(state, player)
+        if target is None:
+            return None
+        return self.step_toward(state, player, [target], counts, stations)
+
+    def risk_target(self, state, player):
+        distances = self.index.distances[player.city.name]
+        best_target, best_score = None, 0
+        for city in state.cities.values():
+            if city is player.city:
+                continue
+            score = self.city_risk(state, city) / (1 + distances[city.name])
+            if score > best_score:
+                best_target, best_score = city.name, score
+        return best_target
+
+    def choose_discard(self, state, player):
+        counts = self.counts(player)
+
+        def value(card_name):
+            card = player.hand[card_name]
+            if card.type == 'event':
+                return player.cure_num
+            if not state.disease_track.is_active(card.color):
+                return -1
+            return counts[card.color]
+
+        return min(player.hand, key=value)
+
+    def choose_event(self, state, player, phase):
+        events = []
+        if player.event_count > 0:
+            events = [name for name, card in player.hand.items() if card.type == 'event']
+        if getattr(player, 'contingency_slot', None) is not None:
+            events.append(player.contingency_slot.name)
+        for card_name in events:
+            event = self.event_args(state, player, card_name, phase)
+            if event is not None:
+                return (card_name, *event)
+        return None
+
+    def event_args(self, state, player, card_name, phase):
+        if card_name == 'resilient_population' and phase == 'epidemic':
+            discard_pile = state.infection_deck.discard_pile
+            if discard_pile:
+                card = max(discard_pile, key=lambda card: state.cities[card.name].cubes[card.color])
+                return (card.name,)
+        elif card_name == 'one_quiet_night' and phase == 'infect':
+            if state.infect_count >= 3 or self.max_cubes(state) == 3:
+                return ()
+        elif card_name == 'forecast' and phase == 'infect':
+            top = state.infection_deck.draw_pile[:-7:-1]
+            if any(state.cities[card.name].cubes[card.color] == 3 for card in top):
+                order = sorted(
+                    range(len(top)),
+                    key=lambda i: state.cities[top[i].name].cubes[top[i].color],
+                )
+                return tuple(order)
+        elif card_name == 'airlift' and phase == 'action':
+            current = state.current_player
+            counts = self.counts(current)
+            stations = self.index.stations(state)
+            if stations and not current.city.station and self.cure_color(state, current, counts):
+                return (current.name, stations[0])
+        elif card_name == 'government_grant' and phase == 'action':
+            current = state.current_player
+            stations = self.index.stations(state)
+            distance = self.index.station_distance(current.city.name, stations)
+            if state.station_count > 0 and (distance is None or distance >= self.station_spacing):
+                return (current.city.name,)
+        return None
+
+    def max_cubes(self, state):
+        return max([max(city.cubes.values()) for city in state.cities.values()])
+
+
+class DispatcherBot(Bot):
+    """Bot that airlifts players holding a cure to a pawn at a research station."""
+
+    def choose_special(self, state, player, counts, stations):
+        station_pawns = [other for other in state.players.values() if other.city.station]
+        if not station_pawns:
+            return None
+        for other in state.players.values():
+            if other is player or other.city.station:
+                continue
+            if self.cure_color(state, other, self.counts(other)):
+                return ('airlift', other.name, station_pawns[0].name)
+        return None
+
+
+class MedicBot(Bot):
+    """Bot that prioritizes treatment since the medic removes every cube of a color."""
+
+    def treat_value(self, state, city, color):
+        return 3 * city.cubes[color]
+
+    def city_risk(self, state, city):
+        risk = super().city_risk(state, city)
+        for color, cubes in city.cubes.items():
+            if state.disease_track.is_cured(color):
+                risk += self.risk_weights[cubes]  # Cleared on arrival without an action
+        return risk
+
+
+class OperationsExpertBot(Bot):
+    """Bot that builds stations freely and flies from them with its special move."""
+
+    station_spacing = 2
+
+    def can_build(self, state, player, counts):
+        return True
+
+    def choose_special(self, state, player, counts, stations):
+        if not (player.shuttle_action and player.city.station):
+            return None
+        target = self.risk_target(state, player)
+        if target is None or self.index.distances[player.city.name][target] < 3:
+            return None
+        spendable = [name for name in player.hand if self.is_spendable(state, player, name, counts)]
+        if not spendable:
+            return None
+        card_name = min(spendable, key=lambda name: counts[player.hand[name].color])
+        return ('opex_shuttle', target, card_name)
+
+
+class ResearcherBot(Bot):
+    """Bot that gives any city card to the co-located player closest to curing its color."""
+
+    def choose_share(self, state, player, counts, stations):
+        others = [other for other in player.city.players.values() if other is not player]
+        for other in others:
+            for card_name, card in player.hand.items():
+                if card.type != 'city':
+                    continue
+                if self.is_needed_by(
+                    state, other, card.color, counts[card.color] - player.cure_num
+                ):
+                    return ('share', other.name, card_name)
+        return super().choose_share(state, player, counts, stations)
+
+
+class ScientistBot(Bot):
+    """Bot that hoards city cards since the scientist cures with fewer of them."""
+
+    spend_max = 1
+
+
+bots = {
+    'dispatcher': DispatcherBot,
+    'medic': MedicBot,
+    'operations_expert': OperationsExpertBot,
+    'researcher': ResearcherBot,
+    'scientist': ScientistBot,
+}
+
+policies = {
+    'pass': Policy,
+    'heuristic': HeuristicPolicy,
+}
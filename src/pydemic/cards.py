@@ -1,98 +1,291 @@
 """Definitions of card and deck objects."""
 
 import abc
-from random import shuffle
 
 import pydemic.exceptions as exceptions
+import pydemic.records as records
+import pydemic.zobrist as zobrist
 from pydemic.display import style, cards_to_string, indent, prompt_prefix
 
 
 # Cards and Decks
+interned = {}  # Shared cards by class and constructor arguments
+
+
+def get_card(cls, *args):
+    """Return the shared card of a class and its constructor arguments, creating it on first use.
+
+    Cards are immutable, so every deck, hand, and game in the process refers to the same card, and
+    games only allocate the lists that order them.
+    """
+    key = (cls, *args)
+    card = interned.get(key)
+    if card is None:
+        card = interned.setdefault(key, cls(*args))
+    return card
+
+
 class Card:
+    __slots__ = ('color', 'name', 'type')
+
     def __init__(self, type, name=None, color=None):
-        self.type = type
-        self.name = name
-        self.color = color
+        object.__setattr__(self, 'type', type)
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'color', color)
+
+    def __setattr__(self, key, value):
+        raise AttributeError('Cards are immutable.')
+
+    def __reduce__(self):
+        return get_card, (Card, self.type, self.name, self.color)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def display(self):
         return style(self.name, color=self.color)
 
 
 class CityCard(Card):
+    __slots__ = ('population',)
+
     def __init__(self, city_name, color, population):
         super().__init__('city', city_name, color)
-        self.population = population
+        object.__setattr__(self, 'population', population)
+
+    def __reduce__(self):
+        return get_card, (CityCard, self.name, self.color, self.population)
 
 
 class EventCard(Card):
-    def __init__(self, event_name, event_func):
+    __slots__ = ('event',)
+
+    def __init__(self, event_name, event_func=None):
         super().__init__('event', event_name, 'gold')
-        self.event = event_func
+        object.__setattr__(self, 'event', events[event_name] if event_func is None else event_func)
+
+    def __reduce__(self):
+        return get_card, (EventCard, self.name)  # The function is looked up by name
 
     def display(self):
         return style(self.name, color=self.color, bold=True)
 
 
 class Deck(abc.ABC):
-    def __init__(self, cards):
+    __slots__ = ('discard_hash', 'discard_pile', 'draw_pile')
+
+    def __init__(self, cards, rng):
         self.discard_pile = []
+        self.discard_hash = 0
         self.draw_pile = cards
 
-        shuffle(self.draw_pile)
+        rng.shuffle(self.draw_pile)
 
     @abc.abstractmethod
     def draw(self):
         pass
 
+    @property
+    def hash(self):
+        label = type(self).__name__
+        return (
+            self.discard_hash
+            ^ zobrist.key(label, 'draw_size', len(self.draw_pile))
+            ^ zobrist.key(label, 'discard_size', len(self.discard_pile))
+        )
+
+    def card_key(self, card):
+        return zobrist.key(type(self).__name__, 'discard', card.name)
+
+    def add_discard(self, card):
+        self.discard_pile.append(card)
+        self.discard_hash ^= self.card_key(card)
+
+    def pop_discard(self, card_name):
+        card = pop_by_name(self.discard_pile, card_name)
+        self.discard_hash ^= self.card_key(card)
+        return card
+
 
 class InfectionDeck(Deck):
+    """Infection deck that tracks the strata of its draw pile.
+
+    Each intensify places a shuffled stratum on top of the draw pile, so the cards of a stratum
+    are only drawn after every card above it. Strata are stored as sets of card names from the
+    bottom of the pile to the top. Cards whose positions are known exactly, e.g. after a forecast,
+    are in strata of one. Players know the strata, so they contribute to the hash.
+    """
+
+    __slots__ = ('strata', 'strata_hash')
+
+    def __init__(self, cards, rng):
+        super().__init__(cards, rng)
+        self.strata = [set(card.name for card in self.draw_pile)] if self.draw_pile else []
+        self.rehash_strata()
+
+    @property
+    def hash(self):
+        return super().hash ^ self.strata_hash
+
+    def stratum_key(self, i, card_name):
+        # Strata are indexed from the bottom, so drawing from the top never moves the others
+        return zobrist.key(type(self).__name__, 'stratum', i, card_name)
+
+    def rehash_strata(self):
+        self.strata_hash = 0
+        for i, stratum in enumerate(self.strata):
+            for name in stratum:
+                self.strata_hash ^= self.stratum_key(i, name)
+
     def draw(self, state, cubes=1, verbose=True):
         card = self.draw_pile.pop()
+        self.strata_hash ^= self.stratum_key(len(self.strata) - 1, card.name)
+        self.strata[-1].discard(card.name)
+        if not self.strata[-1]:
+            self.strata.pop()
+        state.hooks.publish(state, records.CardDrawn, 'infection', card.name)
         city = state.cities[card.name]
         try:
             city.add_disease(state, card.color, cubes, verbose=verbose)
         except exceptions.PropertyError as error:
-            print(
-                f'{city.display()} was not infected with {style(card.color, color=card.color)}:',
-                error,
-            )
-        self.discard_pile.append(card)
-
-    def infect(self, state):
-        self.draw(state, cubes=3)
-
-    def intensify(self):
-        shuffle(self.discard_pile)
+            if verbose:
+                print(
+                    f'{city.display()} was not infected with {style(card.color, color=card.color)}:',
+                    error,
+                )
+        self.add_discard(card)
+
+    def infect(self, state, verbose=True):
+        self.draw(state, cubes=3, verbose=verbose)
+
+    def intensify(self, rng):
+        rng.shuffle(self.discard_pile)
+        if self.discard_pile:
+            self.strata.append(set(card.name for card in self.discard_pile))
+            for card in self.discard_pile:
+                self.strata_hash ^= self.stratum_key(len(self.strata) - 1, card.name)
         self.draw_pile += self.discard_pile
         self.discard_pile = []
+        self.discard_hash = 0
+
+    def set_top(self, top):
+        """Replace the top cards of the draw pile with the same cards in a known order.
+
+        The cards in top are given from bottom to top, i.e. in the order of the draw pile.
+        """
+        names = set(card.name for card in top)
+        self.strata = [stratum - names for stratum in self.strata]
+        self.strata = [stratum for stratum in self.strata if stratum]
+        self.strata.extend([{card.name} for card in top])
+        self.draw_pile[len(self.draw_pile) - len(top) :] = top
+        self.rehash_strata()  # Emptied strata shift the indices of those above them
+
+    def draw_probabilities(self, k=1):
+        """Return the exact probabilities that the cards in the draw pile are in the next k draws.
+
+        The cards of a stratum are uniformly ordered, so if m cards lie above a stratum of n cards,
+        each is drawn with probability min(1, max(0, k - m) / n). Cards not in the draw pile are
+        omitted, since they cannot be drawn before the next intensify.
+        """
+        probabilities = {}
+        m = 0
+        for stratum in reversed(self.strata):
+            n = len(stratum)
+            p = min(1, max(0, k - m) / n)
+            for name in stratum:
+                probabilities[name] = p
+            m += n
+        return probabilities
+
+    def draw_probability(self, city_name, k=1):
+        m = 0
+        for stratum in reversed(self.strata):
+            n = len(stratum)
+            if city_name in stratum:
+                return min(1, max(0, k - m) / n)
+            m += n
+        return 0
 
     def remove(self, city_name):
         try:
-            pop_by_name(self.discard_pile, city_name)
+            self.pop_discard(city_name)
         except KeyError:
             raise exceptions.PropertyError('City not in discard pile.')
 
 
 class PlayerDeck(Deck):
-    def add_epidemics(self, epidemic_num):
+    """Player deck that tracks the subdecks of its draw pile.
+
+    Subdecks are stored as [CARD_NUM, EPIDEMIC_NUM] pairs from the bottom of the pile to the top,
+    so the remaining cards and epidemics of the subdeck being drawn are always at the end.
+    """
+
+    __slots__ = ('subdecks',)
+
+    def __init__(self, cards, rng):
+        super().__init__(cards, rng)
+        self.subdecks = []
+
+    def add_epidemics(self, epidemic_num, rng):
         subdecks = [self.draw_pile[i::epidemic_num] for i in range(epidemic_num)]
         for deck in subdecks:
-            deck.append(Card('epidemic', 'epidemic', 'lime'))
-            shuffle(deck)
+            deck.append(get_card(Card, 'epidemic', 'epidemic', 'lime'))
+            rng.shuffle(deck)
         self.draw_pile = [card for subdeck in subdecks for card in subdeck]
+        self.subdecks = [[len(subdeck), 1] for subdeck in subdecks]
 
-    def draw(self):
+    def draw(self, state=None):
+        """Draw the top card, publishing a record to the hooks of state if given."""
         try:
-            return self.draw_pile.pop()
+            card = self.draw_pile.pop()
         except IndexError:
-            raise exceptions.GameOverLose('The player deck ran out of cards.')
+            raise exceptions.GameOverLose('The player deck ran out of cards.', 'cards')
+        if state is not None:
+            state.hooks.publish(state, records.CardDrawn, 'player', card.name)
+        if self.subdecks:
+            subdeck = self.subdecks[-1]
+            subdeck[0] -= 1
+            if card.type == 'epidemic':
+                subdeck[1] -= 1
+            if subdeck[0] == 0:
+                self.subdecks.pop()
+        return card
+
+    def epidemic_probability(self, draws=1):
+        """Return the exact probability of at least one epidemic in the next one or two draws.
+
+        Each subdeck is shuffled with its epidemics, so the next draw is an epidemic with
+        probability equal to the fraction of epidemics left in the current subdeck. Only the
+        current subdeck and the one below it are read, so the query is O(1).
+        """
+        if draws not in (1, 2):
+            raise ValueError('draws must be 1 or 2.')
+        if not self.subdecks:
+            return 0
+        n, e = self.subdecks[-1]
+        p = e / n
+        if draws == 1:
+            return p
+
+        # Probability the second card is an epidemic given the first is not
+        if n > 1:
+            q = e / (n - 1)
+        elif len(self.subdecks) > 1:
+            n_next, e_next = self.subdecks[-2]
+            q = e_next / n_next
+        else:
+            q = 0
+        return p + (1 - p) * q
 
     def discard(self, card):
-        self.discard_pile.append(card)
+        self.add_discard(card)
 
     def retrieve(self, card_name):
         try:
-            card = pop_by_name(self.discard_pile, card_name)
+            card = self.pop_discard(card_name)
         except KeyError:
             raise exceptions.PropertyError
         return card
@@ -120,7 +313,6 @@ def airlift(state):
 
 def forecast(state):
     top = state.infection_deck.draw_pile[:-7:-1]  # Reverse so pop order reads left to right
-    bottom = state.infection_deck.draw_pile[:-6]
 
     print(cards_to_string(top))
     args = input(
@@ -136,7 +328,7 @@ def forecast(state):
         top = [top[int(i)] for i in args][::-1]  # Reverse so pop order is left to right
     except IndexError:
         raise exceptions.EventError('Missing card in arguments.')
-    state.infection_deck.draw_pile = bottom + top
+    state.infection_deck.set_top(top)
 
 
 def government_grant(state):
@@ -181,4 +373,4 @@ events = {
     'one_quiet_night': one_quiet_night,
     'resilient_population': resilient_population,
 }
-event_cards = [EventCard(name, event) for name, event in events.items()]
+event_cards = tuple(get_card(EventCard, name) for name in events)
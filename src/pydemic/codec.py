@@ -0,0 +1,191 @@
+"""Flat integer encodings of game states.
+
+A layout is built from a reference state and fixes the order of the cities, colors, players, and
+cards of every state in the same game. Encoded states are lists of integers of at most
+layout.width entries, so they can be stored in arrays and shared memory without pickling. Decoding
+starts from a copy of the reference state, so the roles and the map are never encoded. The copy is
+unpickled from a pickle of the reference state cached by the layout, which is several times faster
+than copying the state itself.
+"""
+
+import pickle
+
+import pydemic.cards as cards
+import pydemic.constants as constants
+import pydemic.pieces as pieces
+import pydemic.zobrist as zobrist
+
+statuses = list(pieces.DiseaseState)
+
+
+def get_cards(state):
+    """Return every card of a state in its decks, hands, and contingency slots."""
+    card_list = []
+    for deck in [state.player_deck, state.infection_deck]:
+        card_list.extend(deck.draw_pile)
+        card_list.extend(deck.discard_pile)
+    for player in state.players.values():
+        card_list.extend(player.hand.values())
+        if getattr(player, 'contingency_slot', None) is not None:
+            card_list.append(player.contingency_slot)
+    return card_list
+
+
+class Layout:
+    def __init__(self, state):
+        self.template = state.copy()
+        self.template_data = pickle.dumps(self.template, pickle.HIGHEST_PROTOCOL)
+        self.cities = sorted(state.cities)
+        self.city_ids = {name: i for i, name in enumerate(self.cities)}
+        self.colors = list(state.disease_track.colors)
+        self.players = list(state.players)
+
+        # Cards are identified by type and name, so every epidemic shares one id, and ids are
+        # assigned in sorted order, so they do not depend on how the decks were shuffled
+        self.cards = []
+        self.card_ids = {}
+        card_list = get_cards(self.template)
+        if not any(card.type == 'epidemic' for card in card_list):
+            card_list.append(cards.get_card(cards.Card, 'epidemic', 'epidemic', 'lime'))
+        for card in sorted(card_list, key=lambda card: (card.type, card.name)):
+            key = (card.type, card.name)
+            if key not in self.card_ids:
+                self.card_ids[key] = len(self.cards)
+                self.cards.append(card)
+
+        # Upper bound on the length of an encoded state
+        infection_num = len(state.infection_deck.draw_pile) + len(state.infection_deck.discard_pile)
+        self.width = (
+            6
+            + 2 * len(self.colors)
+            + len(self.cities) * (len(self.colors) + 1)
+            + 6 * len(self.players)
+            + 6  # Lengths of the piles, strata, and subdecks
+            + len(card_list)
+            + constants.epidemic_max
+            + infection_num
+            + 2 * constants.epidemic_max
+        )
+
+    def card_id(self, card):
+        return self.card_ids[(card.type, card.name)]
+
+    def encode(self, state):
+        values = [
+            state.turn_count,
+            state.draw_count,
+            state.infect_count,
+            state.station_count,
+            state.outbreak_track.count,
+            state.infection_track.position,
+        ]
+        values.extend([self.players.index(name) for name in state.player_order])
+        track = state.disease_track
+        values.extend([track.cubes[color] for color in self.colors])
+        values.extend([statuses.index(track.statuses[color]) for color in self.colors])
+        ranks = {name: rank for rank, name in enumerate(state.stations, 1)}
+        for name in self.cities:
+            city = state.cities[name]
+            values.extend([city.cubes[color] for color in self.colors])
+            values.append(ranks.get(name, 0))  # Order of placement or 0 for no station
+
+        for name in self.players:
+            player = state.players[name]
+            slot = getattr(player, 'contingency_slot', None)
+            values.extend(
+                [
+                    -1 if player.city is None else self.city_ids[player.city.name],
+                    player.action_count,
+                    int(getattr(player, 'shuttle_action', False)),
+                    -1 if slot is None else self.card_id(slot),
+                ]
+            )
+            values.append(len(player.hand))
+            values.extend([self.card_id(card) for card in player.hand.values()])
+
+        for deck in [state.player_deck, state.infection_deck]:
+            for pile in [deck.draw_pile, deck.discard_pile]:
+                values.append(len(pile))
+                values.extend([self.card_id(card) for card in pile])
+        strata = state.infection_deck.strata
+        values.append(len(strata))
+        values.extend([len(stratum) for stratum in strata])
+        subdecks = state.player_deck.subdecks
+        values.append(len(subdecks))
+        for n, e in subdecks:
+            values.extend([n, e])
+        return values
+
+    def decode(self, values, state=None):
+        """Return the state encoded in values.
+
+        If state is given, it must be a state of the same game, and it is overwritten in place
+        rather than copying the reference state.
+        """
+        if state is None:
+            state = pickle.loads(self.template_data)
+        values = iter(values)
+
+        def take(n):
+            return [next(values) for _ in range(n)]
+
+        (
+            state.turn_count,
+            state.draw_count,
+            state.infect_count,
+            state.station_count,
+            state.outbreak_track.count,
+            position,
+        ) = take(6)
+        state.player_order = [self.players[i] for i in take(len(self.players))]
+        state.infection_track.position = position
+        state.infection_track.rate = state.infection_track.track[position]
+        state.outbreak_track.resolved.clear()
+        track = state.disease_track
+        for color, n in zip(self.colors, take(len(self.colors))):
+            track.cubes[color] = n
+        for color, i in zip(self.colors, take(len(self.colors))):
+            track.set_status(color, statuses[i])
+        ranks = {}
+        for name in self.cities:
+            city = state.cities[name]
+            for color, n in zip(self.colors, take(len(self.colors))):
+                city.cubes[color] = n
+            ranks[name] = next(values)
+            city.station = ranks[name] > 0
+            city.players.clear()
+        stations = sorted([name for name in ranks if ranks[name] > 0], key=ranks.get)
+        state.stations = {name: state.cities[name] for name in stations}
+
+        for name in self.players:
+            player = state.players[name]
+            city_id, player.action_count, shuttle_action, slot_id = take(4)
+            player._city = None
+            if city_id >= 0:
+                player._city = state.cities[self.cities[city_id]]
+                player._city.players[name] = player
+            if hasattr(player, 'shuttle_action'):
+                player.shuttle_action = bool(shuttle_action)
+            if hasattr(player, 'contingency_slot'):
+                player.contingency_slot = None if slot_id < 0 else self.cards[slot_id]
+            player.hand = {card.name: card for card in self.decode_pile(values)}
+            player.recount()
+
+        for deck in [state.player_deck, state.infection_deck]:
+            deck.draw_pile = self.decode_pile(values)
+            deck.discard_pile = self.decode_pile(values)
+        infection_deck = state.infection_deck
+        infection_deck.strata = []
+        stop = len(infection_deck.draw_pile)
+        for n in reversed(take(next(values))):
+            names = [card.name for card in infection_deck.draw_pile[stop - n : stop]]
+            infection_deck.strata.insert(0, set(names))
+            stop -= n
+        state.player_deck.subdecks = [take(2) for _ in range(next(values))]
+
+        zobrist.rehash(state)
+        state.reset_immunities()
+        return state
+
+    def decode_pile(self, values):
+        return [self.cards[next(values)] for _ in range(next(values))]
@@ -11,3 +11,4 @@ outbreak_max = 8
 infection_seq = '2,2,2,3,3,4,4'  # Length must be one more than epidemic_max
 cube_num = 24
 station_num = 6
+autosave_path = 'pydemic.autosave'
@@ -0,0 +1,58 @@
+"""Determinization of the hidden deck orders for information-set search.
+
+Players know the discard piles, the subdecks of the player deck, and the strata of the infection
+deck, but not the order of the cards within a subdeck or stratum. A sampler splits the draw piles
+of one information set into these segments once, and each sample only permutes the segments with
+more than one card. The card objects are shared by every sample, since cards are never mutated.
+"""
+
+
+def get_segments(pile, sizes):
+    """Split a pile into segments with sizes given from the bottom to the top.
+
+    Any cards below the given segments are placed in a segment of their own.
+    """
+    segments = []
+    stop = len(pile)
+    for size in reversed(sizes):
+        segments.append(pile[stop - size : stop])
+        stop -= size
+    if stop > 0:
+        segments.append(pile[:stop])
+    return segments[::-1]
+
+
+class Sampler:
+    def __init__(self, state):
+        infection_deck = state.infection_deck
+        player_deck = state.player_deck
+        self.infection_segments = get_segments(
+            infection_deck.draw_pile, [len(stratum) for stratum in infection_deck.strata]
+        )
+        self.player_segments = get_segments(
+            player_deck.draw_pile, [n for n, _ in player_deck.subdecks]
+        )
+
+    def sample_pile(self, segments, rng):
+        pile = []
+        for segment in segments:
+            if len(segment) > 1:
+                pile.extend(rng.sample(segment, len(segment)))
+            else:
+                pile.extend(segment)
+        return pile
+
+    def apply(self, state, rng=None):
+        """Replace the draw piles of a state in the same information set with a sample.
+
+        If rng is None, the generator of the state is used.
+        """
+        rng = state.rng if rng is None else rng
+        state.infection_deck.draw_pile = self.sample_pile(self.infection_segments, rng)
+        state.player_deck.draw_pile = self.sample_pile(self.player_segments, rng)
+
+    def sample(self, state, rng=None):
+        """Return a copy of a state with its draw piles sampled from its information set."""
+        sample = state.copy()
+        self.apply(sample, rng)
+        return sample
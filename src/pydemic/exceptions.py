@@ -6,13 +6,24 @@ class GameOver(Exception):
 
 
 class GameOverLose(GameOver):
-    pass
+    def __init__(self, message, reason=None):
+        super().__init__(message)
+        self.reason = reason
 
 
 class GameOverWin(GameOver):
     pass
 
 
+class GameLoaded(Exception):
+    """Signal to the game loop to continue with a loaded game at the start of a phase."""
+
+    def __init__(self, state, phase):
+        super().__init__()
+        self.state = state
+        self.phase = phase
+
+
 class DiscardError(Exception):
     pass
 
@@ -0,0 +1,44 @@
+"""Subscriptions of role abilities to game events.
+
+Abilities that only matter after certain events, e.g. a pawn moving or a disease being cured,
+register callbacks for those events rather than overriding the methods that cause them. The
+callbacks keep indices like GameState.immunities up to date, so the engine checks an index when a
+cube is placed instead of asking every player.
+
+Events and their arguments after the state:
+    ('pawn_moved', PLAYER_NAME): PLAYER, ORIGIN_CITY (None if the pawn was not on the board)
+    'disease_cured': COLOR
+
+Pawn events are keyed by the name of the pawn, so moving a pawn only calls the callbacks of the
+roles that react to that pawn.
+
+Observers outside the game, e.g. loggers and renderers, instead observe the typed records in
+records. Copied and unpickled states resubscribe the abilities of their players, but observers are
+not part of the game, so searches on copies of a state do not report to the observers of the
+original.
+"""
+
+
+class Hooks:
+    __slots__ = ('callbacks', 'observers')
+
+    def __init__(self):
+        self.callbacks = {}
+        self.observers = {}
+
+    def subscribe(self, event, callback):
+        self.callbacks.setdefault(event, []).append(callback)
+
+    def emit(self, event, state, *args):
+        for callback in self.callbacks.get(event, ()):
+            callback(state, *args)
+
+    def observe(self, kind, callback):
+        self.observers.setdefault(kind, []).append(callback)
+
+    def publish(self, state, kind, *fields):
+        observers = self.observers.get(kind)
+        if observers:
+            record = kind(*fields)
+            for callback in observers:
+                callback(state, record)
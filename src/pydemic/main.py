@@ -1,9 +1,11 @@
-"""A text-based implementation of the board game Pandemic."""
+"""A text-based implementation of the board game Pandemic.
+
+The interactive-only modules readline and inspect and the modules behind single commands, e.g.
+saves and paths, are imported inside the functions that use them, so headless and library use of
+this module does not pay for them at startup.
+"""
 
-import readline
 import sys
-from inspect import cleandoc
-from random import shuffle
 from sys import exit
 from time import sleep
 
@@ -11,10 +13,12 @@ import pydemic.argfuncs as argfuncs
 import pydemic.cards as cards
 import pydemic.constants as constants
 import pydemic.exceptions as exceptions
+import pydemic.maps as maps
 import pydemic.pieces as pieces
+import pydemic.records as records
 import pydemic.roles as roles
 from pydemic.display import style, indent, prompt_prefix
-from pydemic.state import GameState
+from pydemic.state import GameState, Random
 
 
 # Generic commands
@@ -32,7 +36,7 @@ def draw_player(state, *args):
 
     syntax: draw
     """
-    card = state.player_deck.draw()
+    card = state.player_deck.draw(state)
     state.draw_count -= 1
     if card.type == 'epidemic':
         print('An epidemic occurred.')
@@ -63,6 +67,43 @@ def play_event(state, *args):
     print('Event failed: No player has the specified card.')
 
 
+def save_game(state, *args):
+    """Save the game to a file.
+
+    syntax: save PATH
+    """
+    if len(args) != 1:
+        print('Action failed: Incorrect number of arguments.')
+        return
+    import pydemic.saves as saves
+
+    try:
+        saves.save(state, args[0])
+    except OSError as error:
+        print('Action failed:', error)
+        return
+    print('Game saved!')
+
+
+def load_game(state, *args):
+    """Replace the game with one saved to a file.
+
+    syntax: load PATH
+    """
+    if len(args) != 1:
+        print('Action failed: Incorrect number of arguments.')
+        return
+    import pydemic.saves as saves
+
+    try:
+        loaded, phase = saves.load(args[0])
+    except (OSError, ValueError) as error:
+        print('Action failed:', error)
+        return
+    print('Game loaded!')
+    raise exceptions.GameLoaded(loaded, phase)
+
+
 def quit(state, *args):
     """Quit the game.
 
@@ -98,14 +139,77 @@ def print_neighbors(state, *args):
         return
 
     print(f'The neighbors of {city.display()} are:')
-    for neighbor in city.neighbors.values():
-        print(f'{indent}{neighbor.display()}')
+    for name in city.neighbors:
+        print(f'{indent}{state.cities[name].display()}')
+
+
+def print_path(state, *args):
+    """Display the fewest actions to move between two cities.
+
+    Ground moves and shuttle flights are always used. If "cards" is given, direct and charter
+    flights with the city cards of the current player are also used.
+
+    syntax: path START_CITY END_CITY [cards]
+    """
+    if len(args) not in (2, 3) or (len(args) == 3 and args[2] != 'cards'):
+        print('Action failed: Incorrect number or form of arguments.')
+        return
+    if args[0] not in state.cities or args[1] not in state.cities:
+        print('Action failed: Nonexistent city specified.')
+        return
+
+    import pydemic.paths as paths
+
+    hand = state.current_player.hand if len(args) == 3 else None
+    moves = paths.find_path(state, args[0], args[1], hand)
+    start, end = state.cities[args[0]], state.cities[args[1]]
+    if moves is None:
+        print(f'No path exists from {start.display()} to {end.display()}.')
+        return
+
+    print(f'The shortest path from {start.display()} to {end.display()} is {len(moves)} action(s):')
+    for action, city_name, _ in moves:
+        print(f'{indent}{action} {state.cities[city_name].display()}')
+    spent = [card_name for _, _, card_name in moves if card_name is not None]
+    if spent:
+        card_string = ', '.join([state.cities[card_name].display() for card_name in spent])
+        print(f'Cards used: {card_string}')
+
+
+def print_reach(state, *args):
+    """Display the cities each pawn can reach with up to four actions.
+
+    If the PLAYER argument is given, only the pawns that player can move are displayed.
+
+    syntax: reach [PLAYER]
+    """
+    if len(args) > 1:
+        print('Action failed: Incorrect number of arguments.')
+        return
+    if len(args) == 1 and args[0] not in state.players:
+        print('Action failed: Nonexistent player specified.')
+        return
+    import pydemic.paths as paths
+
+    for (mover_name, pawn_name), layers in paths.reachability(state).items():
+        if args and mover_name != args[0]:
+            continue
+        mover = state.players[mover_name]
+        header = f'{style(mover_name.upper(), color=mover.color)}'
+        if pawn_name != mover_name:
+            pawn = state.players[pawn_name]
+            header += f' moving {style(pawn_name.upper(), color=pawn.color)}'
+        print(header)
+        for actions, layer in enumerate(layers[1:], 1):
+            if layer:
+                city_string = ', '.join([state.cities[name].display() for name in layer])
+                print(f'{indent}{actions}: {city_string}')
 
 
 def print_status(state, *args):
     """Display the current state of the game.
 
-    syntax: status [player_discard|infection_discard]
+    syntax: status [player_discard|infection_discard|risk]
     """
     if len(args) == 0:
         print()
@@ -169,31 +273,59 @@ def print_status(state, *args):
             print('INFECTION DISCARD')
             for card in state.infection_deck.discard_pile:
                 print(f'{indent}{card.display()}')
+        elif args[0] == 'risk':
+            print_risk(state)
         else:
-            print('Action failed: Argument is not "player_discard" or "infection_discard."')
+            print(
+                'Action failed: Argument is not "player_discard," "infection_discard," or "risk."'
+            )
     else:
         print('Action failed: Incorrect number of arguments.')
 
 
+def print_risk(state):
+    import pydemic.risk as risk
+
+    forecast = risk.forecast(state)
+    rows = []
+    for name, cubes, outbreaks in zip(forecast.cities, forecast.cubes, forecast.outbreaks):
+        for color, expected, p in zip(forecast.colors, cubes, outbreaks):
+            if expected > 0 or p > 0:
+                rows.append((p, expected, name, color))
+    rows.sort(key=lambda row: (row[0], row[1]), reverse=True)
+
+    print(f'INFECTION RISK ({state.infection_track.rate} infection(s))')
+    print(f'{indent}Expected outbreaks: {sum(row[0] for row in rows):.2f}')
+    for p, expected, name, color in rows[:10]:
+        city = state.cities[name]
+        print(
+            f'{indent}{city.display()} {style(color, color=color)}: '
+            f'{expected:.2f} cube(s), {p:.0%} outbreak'
+        )
+
+
 # Flow control
-def main():
+def main(args=None):
+    import readline
+
+    if args is None:
+        args = argfuncs.parse_args(
+            sys.argv[1:],
+            constants.player_min_word,
+            constants.player_max_word,
+            constants.epidemic_min_word,
+            constants.epidemic_max_word,
+            constants.default_map,
+            constants.start_city,
+            constants.outbreak_max,
+            constants.infection_seq,
+            constants.cube_num,
+            constants.station_num,
+        )
+
     readline.parse_and_bind('tab: menu-complete')
     readline.set_completer(lambda x: None)
 
-    args = argfuncs.parse_args(
-        sys.argv[1:],
-        constants.player_min_word,
-        constants.player_max_word,
-        constants.epidemic_min_word,
-        constants.epidemic_max_word,
-        constants.default_map,
-        constants.start_city,
-        constants.outbreak_max,
-        constants.infection_seq,
-        constants.cube_num,
-        constants.station_num,
-    )
-
     argfuncs.check_args(
         args,
         constants.player_min,
@@ -206,50 +338,83 @@ def main():
         constants.epidemic_max_word,
     )
 
-    argfuncs.dialog_args(
-        args,
-        constants.player_min,
-        constants.player_max,
-        constants.player_min_word,
-        constants.player_max_word,
-        constants.epidemic_min,
-        constants.epidemic_max,
-        constants.epidemic_min_word,
-        constants.epidemic_max_word,
-    )
+    if args.resume:
+        args.load = args.autosave
+    if args.load is not None:
+        import pydemic.saves as saves
 
-    state = initialize_state(args)
+        try:
+            state, phase = saves.load(args.load)
+        except (OSError, ValueError) as error:
+            print(f'Could not load {args.load}: {error} Quitting...')
+            exit(1)
+        print_status(state)
+    else:
+        argfuncs.dialog_args(
+            args,
+            constants.player_min,
+            constants.player_max,
+            constants.player_min_word,
+            constants.player_max_word,
+            constants.epidemic_min,
+            constants.epidemic_max,
+            constants.epidemic_min_word,
+            constants.epidemic_max_word,
+        )
+
+        state = initialize_state(args)
 
-    initialize_game(state, args)
+        initialize_game(state, args)
+        phase = None
 
-    game_loop(state)
+    if args.no_autosave:
+        game_loop(state, phase)
+        return
+    import pydemic.autosave as autosave
+
+    autosaver = autosave.Autosaver(args.autosave)
+    autosaver.attach(state)
+    try:
+        game_loop(state, phase)
+    except exceptions.GameOver:
+        autosaver.discard()  # Finished games cannot be resumed
+        raise
+    except KeyboardInterrupt:
+        print()  # Start new line in case shell doesn't
+        try:
+            autosaver.close()
+        except OSError as error:
+            print(f'Could not autosave to {args.autosave}: {error}')
+        else:  # Resumed games are in the checkpoint
+            if autosaver.written or args.load == args.autosave:
+                print(f'The game was saved to {args.autosave}. Use --resume to continue it.')
+        exit()
+    finally:
+        autosaver.close()
 
 
-def initialize_state(args, role_map=None):
-    # Count unique disease colors
-    colors = set([attrs.color for attrs in args.map.values()])
+def initialize_state(args, role_map=None, rng=None):
+    rng = Random() if rng is None else rng
 
     # Instantiate cities and associated cards
+    topology = maps.get_topology(args.map)
     cities = {}
     city_cards = []
     infection_cards = []
-    for city_name, attrs in args.map.items():
-        cities[city_name] = pieces.City(city_name, attrs.color, colors)
-        city_cards.append(cards.CityCard(city_name, attrs.color, attrs.population))
-        infection_cards.append(cards.Card('infection', city_name, attrs.color))
-    for city_name, attrs in args.map.items():
-        city = cities[city_name]
-        neighbors = {neighbor_name: cities[neighbor_name] for neighbor_name in attrs.neighbors}
-        city.neighbors = neighbors
+    for city_name, site in topology.sites.items():
+        cities[city_name] = pieces.City(site)
+        city_cards.append(cards.get_card(cards.CityCard, city_name, site.color, site.population))
+        infection_cards.append(cards.get_card(cards.Card, 'infection', city_name, site.color))
 
     # Instantiate diseases
-    disease_track = pieces.DiseaseTrack(colors, args.cube_num)
+    disease_track = pieces.DiseaseTrack(topology.colors, args.cube_num)
 
     # Instantiate players
     role_map = {} if role_map is None else role_map
-    unassigned_players = list(set(args.player_names) - set(role_map.keys()))
-    unassigned_roles = list(set(roles.roles) - set(role_map.values()))
-    shuffle(unassigned_roles)
+    # Use lists in a fixed order so seeded games assign roles reproducibly
+    unassigned_players = [name for name in args.player_names if name not in role_map]
+    unassigned_roles = [role for role in roles.roles if role not in role_map.values()]
+    rng.shuffle(unassigned_roles)
 
     players = {}
     for player_name, role in role_map.items():
@@ -264,8 +429,8 @@ def initialize_state(args, role_map=None):
     player_order = args.player_names  # Use initial order of names until starting hand is dealt
 
     # Instantiate decks
-    player_deck = cards.PlayerDeck(city_cards + cards.event_cards)
-    infection_deck = cards.InfectionDeck(infection_cards)
+    player_deck = cards.PlayerDeck([*city_cards, *cards.event_cards], rng)
+    infection_deck = cards.InfectionDeck(infection_cards, rng)
 
     # Instantiate trackers
     outbreak_track = pieces.OutbreakTrack(args.outbreak_max)
@@ -285,12 +450,13 @@ def initialize_state(args, role_map=None):
         turn_count=0,
         draw_count=0,
         infect_count=0,
+        rng=rng,
     )
 
     return state
 
 
-def initialize_game(state, args):
+def initialize_game(state, args, verbose=True):
     # Add research station to start city
     state.cities[args.start_city].add_station(state)
 
@@ -303,16 +469,16 @@ def initialize_game(state, args):
     start_hand_num = 6 - args.player_num
     for player in state.players.values():
         player.set_city(state, state.cities[args.start_city])  # Set separately from instantiation so special abilities do not interfere with setup # fmt: skip
-        starting_cards = [state.player_deck.draw() for _ in range(start_hand_num)]
+        starting_cards = [state.player_deck.draw(state) for _ in range(start_hand_num)]
         for card in starting_cards:
             player.add_card(state, card)
-    state.player_order = get_player_order(args.player_names, state.players)
+    state.player_order = get_player_order(args.player_names, state.players, verbose=verbose)
 
     # Add epidemics to deck
-    state.player_deck.add_epidemics(args.epidemic_num)
+    state.player_deck.add_epidemics(args.epidemic_num, state.rng)
 
 
-def get_player_order(player_names, players):
+def get_player_order(player_names, players, verbose=True):
     max_pop = 0
     max_card = ''
     max_player = ''
@@ -324,30 +490,55 @@ def get_player_order(player_names, players):
                 max_card = card
                 max_player = player.name
     idx = player_names.index(max_player)
-    print()
-    print(
-        f'{max_player} has the card with the highest population: {max_card.display()} ({max_pop:,})'
-    )
-    print(f'{max_player} will start the turn order.')
+    if verbose:
+        print()
+        print(
+            f'{max_player} has the card with the highest population: '
+            f'{max_card.display()} ({max_pop:,})'
+        )
+        print(f'{max_player} will start the turn order.')
     return player_names[idx:] + player_names[:idx]
 
 
-def game_loop(state):
+def game_loop(state, phase=None):
+    """Play turns until the game ends.
+
+    If phase is given, the current turn is resumed at the start of that phase, e.g. after loading
+    a saved game. Otherwise, the loop starts with the setup of a new turn.
+    """
     while True:
-        # Turn setup
+        try:
+            play_turn(state, phase)
+        except exceptions.GameLoaded as loaded:
+            loaded.state.hooks.observers = state.hooks.observers  # Observers follow the session
+            state, phase = loaded.state, loaded.phase
+            print_status(state)
+        else:
+            phase = None
+
+
+def play_turn(state, phase=None):
+    # Turn setup
+    if phase is None:
         state.draw_count = 2
         state.infect_count = state.infection_track.rate
         sleep(1)
         print_status(state)
+        phase = 'action'
 
-        # Player actions
+    # Player actions
+    if phase == 'action':
         print()
         while state.current_player.action_count > 0:
             commands = {
                 **state.current_player.actions,
                 'neighbors': print_neighbors,
+                'path': print_path,
+                'reach': print_reach,
                 'event': play_event,
                 'status': print_status,
+                'save': save_game,
+                'load': load_game,
                 'quit': quit,
             }
             prompt = (
@@ -355,14 +546,18 @@ def game_loop(state):
                 f'({state.current_player.action_count} action(s) remaining): '
             )
             interface(state, commands, prompt)
+        phase = 'draw'
 
-        # Draw cards
+    # Draw cards
+    if phase == 'draw':
         print()
         while state.draw_count > 0:
             commands = {
                 'draw': draw_player,
                 'event': play_event,
                 'status': print_status,
+                'save': save_game,
+                'load': load_game,
                 'quit': quit,
             }
             prompt = (
@@ -371,32 +566,35 @@ def game_loop(state):
             interface(state, commands, prompt)
             state.outbreak_track.reset()  # Reset outbreak after each draw
 
-        # Infect cities
-        print()
-        while state.infect_count > 0:
-            commands = {
-                'infect': draw_infect,
-                'event': play_event,
-                'status': print_status,
-                'quit': quit,
-            }
-            prompt = (
-                f'{prompt_prefix}Infect or play event card '
-                f'({state.infect_count} infect(s) remaining): '
-            )
-            interface(state, commands, prompt)
-            state.outbreak_track.reset()  # Reset outbreak after each draw
+    # Infect cities
+    print()
+    while state.infect_count > 0:
+        commands = {
+            'infect': draw_infect,
+            'event': play_event,
+            'status': print_status,
+            'save': save_game,
+            'load': load_game,
+            'quit': quit,
+        }
+        prompt = (
+            f'{prompt_prefix}Infect or play event card ({state.infect_count} infect(s) remaining): '
+        )
+        interface(state, commands, prompt)
+        state.outbreak_track.reset()  # Reset outbreak after each draw
 
-        # Turn cleanup
-        state.current_player.reset()
-        state.turn_count += 1
+    # Turn cleanup
+    state.current_player.reset()
+    state.turn_count += 1
 
 
 def epidemic(state):
     # Increase
+    state.hooks.publish(state, records.EpidemicStage, 'increase')
     state.infection_track.increment()
 
     # Infect
+    state.hooks.publish(state, records.EpidemicStage, 'infect')
     state.infection_deck.infect(state)
 
     # Play Resilient Population event if available
@@ -414,11 +612,14 @@ def epidemic(state):
                 player.event(state, 'resilient_population')
 
     # Intensify
-    state.infection_deck.intensify()
+    state.hooks.publish(state, records.EpidemicStage, 'intensify')
+    state.infection_deck.intensify(state.rng)
 
 
 # Interface
 def make_completer(commands):
+    import readline
+
     def completer(text, state):
         args = readline.get_line_buffer().split()
         if len(args) == 0:
@@ -434,25 +635,28 @@ def make_completer(commands):
 
 
 def interface(state, commands, prompt):
-    completer = make_completer(commands)
-    readline.set_completer(completer)
+    import readline
 
-    args = input(prompt).lower().strip().split()
-    if len(args) == 0:
-        return
-    command = args[0]
-    args = args[1:]
-    if command == 'help':
-        help(commands, *args)
-    else:
-        try:
-            cmd = commands[command]
-        except KeyError:
-            print('No currently available command exists with that name. Please try again.')
+    completer = readline.get_completer()
+    readline.set_completer(make_completer(commands))
+    try:
+        args = input(prompt).lower().strip().split()
+        if len(args) == 0:
             return
-        cmd(state, *args)
-
-    readline.set_completer(lambda x: None)
+        command = args[0]
+        args = args[1:]
+        if command == 'help':
+            help(commands, *args)
+        else:
+            try:
+                cmd = commands[command]
+            except KeyError:
+                print('No currently available command exists with that name. Please try again.')
+                return
+            cmd(state, *args)
+            state.hooks.publish(state, records.Command, command, tuple(args))
+    finally:  # Commands can end the game or load another, so restore the completer on any exit
+        readline.set_completer(completer)
 
 
 def help(commands, *args):
@@ -460,6 +664,8 @@ def help(commands, *args):
 
     syntax: help [COMMAND]
     """
+    from inspect import cleandoc
+
     commands = commands.copy()
     commands['help'] = help
     if len(args) == 0:
@@ -2,7 +2,77 @@
 
 from collections import namedtuple
 
-CityAttrs = namedtuple('CityAttr', ['neighbors', 'color', 'population'])
+CityAttrs = namedtuple('CityAttrs', ['neighbors', 'color', 'population'])
+
+
+class Site(namedtuple('Site', ['topology', 'name', 'color', 'population', 'neighbors'])):
+    """Immutable attributes of a city on a map."""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return get_site, (self.topology, self.name)
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class Topology:
+    """Immutable cities and connections of a map.
+
+    Every game on a map in the library shares its topology, so the names, colors, populations, and
+    neighbors of the cities are allocated once per process, and each game only allocates the
+    cubes, stations, and pawns of its cities. Topologies are never copied, and pickles refer to
+    the topologies of the library by name. NEIGHBORHOODS maps each city to the set of its name and
+    the names of its neighbors.
+    """
+
+    __slots__ = ('adjacency', 'colors', 'name', 'neighborhoods', 'sites')
+
+    def __init__(self, map, name=None):
+        self.name = name
+        self.sites = {
+            city_name: Site(self, city_name, attrs.color, attrs.population, tuple(attrs.neighbors))
+            for city_name, attrs in map.items()
+        }
+        self.colors = tuple(sorted(set(site.color for site in self.sites.values())))
+        self.adjacency = tuple((name, site.neighbors) for name, site in sorted(self.sites.items()))
+        self.neighborhoods = {
+            name: frozenset([name, *site.neighbors]) for name, site in self.sites.items()
+        }
+
+    def __reduce__(self):
+        if self.name is not None:
+            return get_topology, (self.name,)
+        map = {
+            name: CityAttrs(list(site.neighbors), site.color, site.population)
+            for name, site in self.sites.items()
+        }
+        return Topology, (map,)
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def get_site(topology, name):
+    return topology.sites[name]
+
+
+def get_topology(map):
+    """Return the shared topology of a map in the library, given by name or as the map itself.
+
+    Maps outside the library get a new topology.
+    """
+    if not isinstance(map, str):
+        name = next((name for name, library_map in maps.items() if library_map is map), None)
+        if name is None:
+            return Topology(map)
+        map = name
+    topology = topologies.get(map)
+    if topology is None:
+        topology = topologies.setdefault(map, Topology(maps[map], map))
+    return topology
+
 
 # fmt: off
 _default = {'atlanta': [['chicago', 'miami', 'washington'], 'blue', 4715000],
@@ -60,3 +130,4 @@ for city_name, attrs in _default.items():
     default[city_name] = CityAttrs(*attrs)
 
 maps = {'default': default}
+topologies = {}  # Topologies of the maps in the library by name
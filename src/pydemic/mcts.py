@@ -0,0 +1,272 @@
+"""Monte Carlo tree search agent for unattended games.
+
+The tree spans the remaining actions of the current player's turn, and each iteration finishes the
+turn and plays a few more with the heuristic bots before scoring the position. Searches are
+anytime: they stop at a time or iteration budget and return the most visited action found so far.
+
+By default, each iteration first samples the order of the draw piles from the information known to
+the players, so the agent never reads the actual order of the decks.
+"""
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import log, sqrt
+from multiprocessing import get_all_start_methods, get_context
+
+import pydemic.bots as bots
+import pydemic.determinize as determinize
+import pydemic.exceptions as exceptions
+import pydemic.simulate as simulate
+
+
+class Node:
+    def __init__(self, actions, parent=None, action=None):
+        self.action = action
+        self.parent = parent
+        self.children = {}
+        self.untried = actions
+        self.visits = 0
+        self.value = 0
+
+    def actions(self):
+        return set(self.children) | set(self.untried)
+
+    def select(self, exploration):
+        # UCT
+        log_visits = log(self.visits)
+        return max(
+            self.children.values(),
+            key=lambda child: (
+                child.value / child.visits + exploration * sqrt(log_visits / child.visits)
+            ),
+        )
+
+
+class Agent:
+    """MCTS agent that chooses actions for any player.
+
+    At least one of time_limit (seconds per decision) or iteration_limit must be given. If
+    processes is greater than one and the platform can fork, independent trees are searched in a
+    pool of forked worker processes and their root statistics are summed. The pool is started on
+    the first decision and reused until close is called. Otherwise the subtree under the chosen
+    action is kept and reused for the player's next decision in the same turn. If determinize is
+    False, the rollouts read the actual order of the decks.
+    """
+
+    def __init__(
+        self,
+        time_limit=0.5,
+        iteration_limit=None,
+        rollout_turns=2,
+        exploration=0.7,
+        processes=1,
+        prune=True,
+        determinize=True,
+        seed=None,
+    ):
+        if time_limit is None and iteration_limit is None:
+            raise ValueError('At least one of time_limit or iteration_limit must be given.')
+        self.time_limit = time_limit
+        self.iteration_limit = iteration_limit
+        self.rollout_turns = rollout_turns
+        self.exploration = exploration
+        self.processes = processes
+        self.prune = prune
+        self.determinize = determinize
+        self.sampler = None
+        self.rng = random.Random(seed)
+        self.policy = None
+        self.root = None
+        self.root_key = None
+        self.executor = None
+
+    def candidates(self, state, player):
+        destinations = None
+        if self.prune:
+            destinations = [
+                name
+                for name, city in state.cities.items()
+                if city.station or city.players or any(city.cubes.values())
+            ]
+        return simulate.legal_actions(state, player, destinations)
+
+    def choose_action(self, state, player):
+        if self.policy is None:
+            self.policy = bots.HeuristicPolicy(state)
+
+        if self.determinize:
+            self.sampler = determinize.Sampler(state)
+
+        # Searches play copies of the state, which shuffle with copies of its generator
+        if self.processes > 1 and 'fork' in get_all_start_methods():
+            stats = self.search_parallel(state, player)
+            self.root = None
+        else:
+            root = self.get_root(state, player)
+            self.search(state, player, root)
+            stats = {action: (child.visits, child.value) for action, child in root.children.items()}
+
+        action = max(stats, key=lambda action: stats[action][0])
+        if self.root is not None:
+            self.root = self.root.children[action]
+            self.root.parent = None
+            self.root_key = (state.turn_count, player.name, player.action_count - 1)
+        return action
+
+    def get_root(self, state, player):
+        # Reuse the previous subtree only if the game followed it exactly
+        actions = self.candidates(state, player)
+        key = (state.turn_count, player.name, player.action_count)
+        if self.root is None or self.root_key != key or self.root.actions() != set(actions):
+            self.root = Node(actions)
+            self.root_key = key
+        return self.root
+
+    def search(self, state, player, root, deadline=None, iteration_limit=None):
+        if deadline is None and self.time_limit is not None:
+            deadline = time.monotonic() + self.time_limit
+        if iteration_limit is None:
+            iteration_limit = self.iteration_limit
+
+        iterations = 0
+        while True:
+            self.iterate(state, player, root)
+            iterations += 1
+            if iteration_limit is not None and iterations >= iteration_limit:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        return iterations
+
+    def iterate(self, state, player, root):
+        sim = state.copy()
+        if self.sampler is not None:
+            self.sampler.apply(sim, self.rng)
+        sim_player = sim.players[player.name]
+        node = root
+        try:
+            # Select
+            while not node.untried and node.children:
+                node = node.select(self.exploration)
+                self.apply(sim, sim_player, node.action)
+
+            # Expand
+            if node.untried:
+                action = node.untried.pop(self.rng.randrange(len(node.untried)))
+                child = Node([], node, action)
+                node.children[action] = child  # Attach first, so actions that end the game are kept
+                node = child
+                self.apply(sim, sim_player, action)
+                if sim_player.action_count > 0:
+                    child.untried = self.candidates(sim, sim_player)
+
+            # Rollout
+            value = self.rollout(sim)
+        except exceptions.GameOverWin:
+            value = 1
+        except exceptions.GameOverLose:
+            value = 0
+
+        # Backpropagate
+        while node is not None:
+            node.visits += 1
+            node.value += value
+            node = node.parent
+
+    def apply(self, state, player, action):
+        simulate.apply_action(state, player, action)
+        for other in state.players.values():
+            simulate.enforce_limit(state, other, self.policy)
+
+    def rollout(self, state):
+        state.rng.seed(self.rng.getrandbits(64))
+        simulate.play_turn(state, self.policy)  # Finish the current turn
+        for _ in range(self.rollout_turns):
+            simulate.play_turn(state, self.policy)
+        return evaluate(state)
+
+    def search_parallel(self, state, player):
+        deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+        iteration_limit = None
+        if self.iteration_limit is not None:
+            iteration_limit = max(1, self.iteration_limit // self.processes)
+        seeds = [self.rng.getrandbits(64) for _ in range(self.processes)]
+
+        # Forked workers inherit the agent, so only the state is pickled for each decision
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=get_context('fork'),
+                initializer=init_worker,
+                initargs=(self,),
+            )
+        futures = [
+            self.executor.submit(search_worker, state, player.name, seed, deadline, iteration_limit)
+            for seed in seeds
+        ]
+        results = [future.result() for future in futures]
+
+        stats = {}
+        for result in results:
+            for action, (visits, value) in result.items():
+                total_visits, total_value = stats.get(action, (0, 0))
+                stats[action] = (total_visits + visits, total_value + value)
+        return stats
+
+    def close(self):
+        """Shut down the pool of worker processes, if any."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+def evaluate(state):
+    """Return a score between 0 and 1 for a position where the game has not ended."""
+    track = state.disease_track
+    colors = track.colors
+    cured = sum([not track.is_active(color) for color in colors]) / len(colors)
+    cubes = min([track.cubes[color] for color in colors]) / track.cube_num
+    outbreaks = state.outbreak_track.count / state.outbreak_track.max
+
+    # Progress toward the cures that remain
+    progress = 0
+    for color in colors:
+        if track.is_active(color):
+            for player in state.players.values():
+                count = player.color_counts[color]
+                progress = max(progress, min(1, count / player.cure_num))
+
+    return 0.4 * cured + 0.2 * progress + 0.2 * cubes + 0.2 * (1 - outbreaks)
+
+
+# Root parallelization
+_worker = None
+
+
+def init_worker(agent):
+    global _worker
+    _worker = agent
+
+
+def search_worker(state, player_name, seed, deadline, iteration_limit):
+    agent = _worker
+    agent.rng = random.Random(seed)
+    agent.sampler = determinize.Sampler(state) if agent.determinize else None
+    player = state.players[player_name]
+    root = Node(agent.candidates(state, player))
+    agent.search(state, player, root, deadline, iteration_limit)
+    return {action: (child.visits, child.value) for action, child in root.children.items()}
+
+
+# Policies
+class MCTSPolicy(bots.HeuristicPolicy):
+    """Policy that chooses actions with an MCTS agent and all other decisions with bots."""
+
+    def __init__(self, state, **kwargs):
+        super().__init__(state)
+        self.agent = Agent(**kwargs)
+        self.agent.policy = bots.HeuristicPolicy(state)
+
+    def choose_action(self, state, player):
+        return self.agent.choose_action(state, player)
@@ -0,0 +1,193 @@
+"""Shortest routes between cities using movement actions.
+
+Routes minimize the number of actions and then the number of cards spent. Since flights spend
+cards that can only be used once, the search is over pairs of a city and the set of cards spent to
+reach it. Results are memoized on the map, the route endpoints, the cities with stations, and the
+city cards in hand, so repeated queries during a turn are free.
+"""
+
+from functools import lru_cache
+from heapq import heappop, heappush
+
+import pydemic.bots as bots
+import pydemic.roles as roles
+
+
+@lru_cache(maxsize=4096)
+def shortest_path(adjacency, start, end, stations=(), hand=frozenset()):
+    """Return the moves of a shortest route as a tuple of (ACTION, CITY, CARD) or None.
+
+    The map is given as ((CITY, NEIGHBORS), ...). Shuttle flights connect the cities in stations,
+    and direct and charter flights may spend the city cards in hand. CARD is None for moves that do
+    not spend a card.
+    """
+    neighbors = dict(adjacency)
+    stations = set(stations)
+    start_node = (start, frozenset())
+    costs = {start_node: (0, 0)}
+    previous = {start_node: None}
+    heap = [(0, 0, start, frozenset())]
+    while heap:
+        actions, spent_num, city, spent = heappop(heap)
+        node = (city, spent)
+        if costs[node] < (actions, spent_num):
+            continue  # Stale entry
+        if city == end:
+            moves = []
+            while previous[node] is not None:
+                node, move = previous[node]
+                moves.append(move)
+            return tuple(moves[::-1])
+
+        edges = [(('ground', name, None), name, spent) for name in neighbors[city]]
+        if city in stations:
+            edges.extend([(('shuttle', name, None), name, spent) for name in stations - {city}])
+        for card in hand - spent:
+            if card != city:
+                edges.append((('direct', card, card), card, spent | {card}))
+        if city in hand and city not in spent:
+            edges.extend(
+                [
+                    (('charter', name, city), name, spent | {city})
+                    for name in neighbors
+                    if name != city
+                ]
+            )
+
+        for move, name, next_spent in edges:
+            cost = (actions + 1, len(next_spent))
+            next_node = (name, next_spent)
+            if next_node not in costs or cost < costs[next_node]:
+                costs[next_node] = cost
+                previous[next_node] = ((city, spent), move)
+                heappush(heap, (*cost, name, next_spent))
+    return None
+
+
+def find_path(state, start, end, hand=None):
+    """Return a shortest route between two cities in a state.
+
+    If hand is given, direct and charter flights may spend its city cards.
+    """
+    adjacency = state.topology.adjacency
+    stations = tuple(sorted(state.stations))
+    city_cards = frozenset()
+    if hand is not None:
+        city_cards = frozenset(name for name, card in hand.items() if card.type == 'city')
+    return shortest_path(adjacency, start, end, stations, city_cards)
+
+
+# Reachability
+def get_layers(costs, actions):
+    layers = [[] for _ in range(actions + 1)]
+    for name, cost in costs.items():
+        if cost <= actions:
+            layers[cost].append(name)
+    return layers
+
+
+def reachability(state, actions=4):
+    """Return the cities each pawn can reach with up to a number of actions.
+
+    The result maps (MOVER, PAWN) pairs to layers, where layer k lists the cities first reached
+    with k actions. MOVER is the player spending the actions, so every player has an entry with
+    itself as the pawn, and a dispatcher also has entries for the other pawns. Costs are computed
+    from the all-pairs ground distances and the stations, which are shared by every pawn. Each
+    card is spent at most once, and a direct flight followed by a charter flight or special move
+    is the only combination of flights that can be shorter than a single one. A dispatcher may also
+    airlift any pawn, including itself, to another pawn, possibly after moving that pawn first.
+    """
+    names = list(state.cities)
+    adjacency = state.topology.adjacency
+    distances = bots.get_distances(adjacency)
+    stations = list(state.stations)
+
+    # Ground and shuttle costs shared by every pawn
+    station_distances = {
+        name: min([distances[name][station] for station in stations], default=None)
+        for name in names
+    }
+
+    def move_cost(source, target):
+        cost = distances[source][target]
+        if stations:
+            cost = min(cost, station_distances[source] + 1 + station_distances[target])
+        return cost
+
+    def flight_costs(source, cards, can_opex):
+        # Least actions to reach any city with a charter flight or special move, including moving
+        # to the city where the flight starts, possibly with a direct flight using another card
+        costs = []
+        for charter_card in cards:
+            costs.append(move_cost(source, charter_card) + 1)
+            costs.extend(
+                [2 + move_cost(card, charter_card) for card in cards if card != charter_card]
+            )
+        if can_opex and stations:
+            if cards:
+                costs.append(station_distances[source] + 1)
+            if len(cards) > 1:
+                costs.extend([2 + station_distances[card] for card in cards])
+        return min(costs, default=None)
+
+    def pawn_costs(source, cards, airlifts=(), anywhere=None):
+        costs = {}
+        for name in names:
+            cost = move_cost(source, name)
+            for card in cards:
+                cost = min(cost, 1 + move_cost(card, name))
+            for city_name in airlifts:
+                cost = min(cost, 1 + move_cost(city_name, name))
+            if anywhere is not None and name != source:
+                cost = min(cost, anywhere)
+            costs[name] = cost
+        return costs
+
+    pawns = [player for player in state.players.values() if player.city is not None]
+    reach = {}
+    for player in pawns:
+        cards = [name for name, card in player.hand.items() if card.type == 'city']
+        source = player.city.name
+        if not isinstance(player, roles.Dispatcher):
+            can_opex = isinstance(player, roles.OperationsExpert) and player.shuttle_action
+            costs = pawn_costs(source, cards, anywhere=flight_costs(source, cards, can_opex))
+            reach[(player.name, player.name)] = get_layers(costs, actions)
+            continue
+
+        # Dispatchers charter any pawn with the card of their own city, so they first move to a
+        # city whose card they hold without spending it, possibly by airlifting to another pawn
+        others = {pawn.name: pawn.city.name for pawn in pawns if pawn is not player}
+        charter = min(
+            [
+                1
+                + min(
+                    [
+                        move_cost(source, card),
+                        *[1 + move_cost(other, card) for other in cards if other != card],
+                        *[1 + move_cost(city_name, card) for city_name in others.values()],
+                    ]
+                )
+                for card in cards
+            ],
+            default=None,
+        )
+        locations = {player.name: source, **others}
+        base = {}
+        for name, pawn_source in locations.items():
+            airlifts = [city_name for other, city_name in locations.items() if other != name]
+            base[name] = pawn_costs(pawn_source, cards, airlifts, charter)
+
+        # Airlifts to pawns that were moved earlier in the turn, which only help if the airlifted
+        # pawn cannot reach their city as quickly by itself
+        for name, costs in base.items():
+            costs = dict(costs)
+            for other, other_costs in base.items():
+                if other == name:
+                    continue
+                for city_name, cost in other_costs.items():
+                    if cost + 1 >= min(actions, costs[city_name]):
+                        continue
+                    for target in names:
+                        costs[target] = min(costs[target], cost + 1 + move_cost(city_name, target))
+            reach[(player.name, name)] = get_layers(costs, actions)
+    return reach
@@ -3,26 +3,54 @@
 from enum import Enum, auto
 
 import pydemic.exceptions as exceptions
+import pydemic.records as records
+import pydemic.zobrist as zobrist
 from pydemic.display import style
 
 
 class City:
-    def __init__(self, name, color, colors, cube_max=3):
-        self.color = color
-        self.cubes = {color: 0 for color in colors}
-        self.cube_max = cube_max
-        self.name = name
-        self.neighbors = {}
+    """City on the board of a game.
+
+    The attributes that never change, e.g. the color and the names of the neighbors, are read from
+    the site shared by every game on the map, so a city only stores its cubes, station, and pawns.
+    """
+
+    __slots__ = ('cubes', 'name', 'players', 'site', 'station')
+    cube_max = 3
+
+    def __init__(self, site):
+        self.site = site
+        self.name = site.name
+        self.cubes = {color: 0 for color in site.topology.colors}
         self.players = {}
         self.station = False
 
+    def __getstate__(self):
+        # Players are sent by name and relinked by GameState
+        return self.site, self.cubes, self.station, list(self.players)
+
+    def __setstate__(self, attrs):
+        self.site, self.cubes, self.station, self.players = attrs
+        self.name = self.site.name
+
+    @property
+    def color(self):
+        return self.site.color
+
+    @property
+    def neighbors(self):
+        """Names of the neighbors."""
+        return self.site.neighbors
+
     def add_disease(self, state, color, n=1, verbose=True):
         if self.immunity(state, color):
             raise exceptions.PropertyError(f'{self.display()} is immune.')
 
         delta = min(n, self.cube_max - self.cubes[color])
         state.disease_track.remove(color, delta)
-        self.cubes[color] += delta
+        self.set_cubes(state, color, self.cubes[color] + delta)
+        if delta > 0:
+            state.hooks.publish(state, records.CubesPlaced, self.name, color, delta)
         if verbose:
             if delta == 0:
                 msg = (
@@ -33,17 +61,19 @@ class City:
                 msg = f'{self.display()} was infected with {delta} {style(color, color=color)}.'
             print(msg)
         if n > delta:
-            self.outbreak(state, color)
+            self.outbreak(state, color, verbose=verbose)
 
-    def outbreak(self, state, color):
+    def outbreak(self, state, color, verbose=True):
         if (self.name, color) in state.outbreak_track.resolved:
             return
-        print(f'{self.display()} outbroke!')
+        if verbose:
+            print(f'{self.display()} outbroke!')
         state.outbreak_track.resolved.add((self.name, color))
+        state.hooks.publish(state, records.Outbreak, self.name, color)
         state.outbreak_track.increment()
-        for neighbor in self.neighbors.values():
+        for name in self.neighbors:
             try:
-                neighbor.add_disease(state, color)
+                state.cities[name].add_disease(state, color, verbose=verbose)
             except exceptions.PropertyError:  # Catch immunity errors but print nothing
                 pass
 
@@ -53,13 +83,18 @@ class City:
                 f'{self.display()} is not infected with {style(color, color=color)}.'
             )
 
-        if state.disease_track.is_cured(color):
-            n = self.cubes[color]
-            self.cubes[color] -= n
-            state.disease_track.add(color, n)
-        else:
-            self.cubes[color] -= 1
-            state.disease_track.add(color, 1)
+        track = state.disease_track
+        n = self.cubes[color] if track.is_cured(color) else 1
+        self.set_cubes(state, color, self.cubes[color] - n)
+        track.add(color, n)
+        state.hooks.publish(state, records.CubesRemoved, self.name, color, n)
+        if track.is_eradicated(color):
+            state.hooks.publish(state, records.Eradicated, color)
+
+    def set_cubes(self, state, color, n):
+        state.board_hash ^= zobrist.cube_key(self.name, color, self.cubes[color])
+        state.board_hash ^= zobrist.cube_key(self.name, color, n)
+        self.cubes[color] = n
 
     def add_station(self, state):
         if self.station:
@@ -68,7 +103,10 @@ class City:
             raise exceptions.StationAddError('No research stations are available.')
         else:
             state.station_count -= 1
+            state.board_hash ^= zobrist.key('station', self.name)
+            state.stations[self.name] = self
             self.station = True
+            state.hooks.publish(state, records.StationBuilt, self.name)
 
     def remove_station(self, state):
         if not self.station:
@@ -77,13 +115,13 @@ class City:
             )
         else:
             self.station = False
+            state.board_hash ^= zobrist.key('station', self.name)
+            del state.stations[self.name]
             state.station_count += 1
+            state.hooks.publish(state, records.StationRemoved, self.name)
 
     def immunity(self, state, color):
-        for player in state.players.values():
-            if player.immunity(state, self, color):
-                return True
-        return False
+        return self.name in state.quarantined or (self.name, color) in state.immunities
 
     def display(self):
         return style(self.name, color=self.color)
@@ -96,16 +134,22 @@ class DiseaseState(Enum):
 
 
 class DiseaseTrack:
+    __slots__ = ('colors', 'cube_num', 'cubes', 'cured_colors', 'hash', 'statuses')
+
     def __init__(self, colors, cube_num=24):
         self.colors = sorted(set(colors))
         self.cubes = {color: cube_num for color in colors}
-        self.statuses = {color: DiseaseState.ACTIVE for color in colors}
+        self.statuses = {}
+        self.cured_colors = []  # Colors that are cured or eradicated in order of curing
         self.cube_num = cube_num
+        self.hash = 0
+        for color in colors:
+            self.set_status(color, DiseaseState.ACTIVE)
 
     def add(self, color, n=1):
         self.cubes[color] += n
         if self.is_cured(color) and self.cubes[color] == self.cube_num:
-            self.statuses[color] = DiseaseState.ERADICATED
+            self.set_status(color, DiseaseState.ERADICATED)
 
     def remove(self, color, n=1):
         if self.statuses[color] is DiseaseState.ERADICATED:
@@ -115,7 +159,7 @@ class DiseaseTrack:
             self.cubes[color] -= n
         else:
             raise exceptions.GameOverLose(
-                f'The disease track ran out of {style(color, color=color)} cubes.'
+                f'The disease track ran out of {style(color, color=color)} cubes.', 'cubes'
             )
 
     def set_cured(self, color):
@@ -123,13 +167,23 @@ class DiseaseTrack:
             raise exceptions.PropertyError(f'{style(color, color=color)} already cured.')
 
         if self.cubes[color] == self.cube_num:
-            self.statuses[color] = DiseaseState.ERADICATED
+            self.set_status(color, DiseaseState.ERADICATED)
         else:
-            self.statuses[color] = DiseaseState.CURED
+            self.set_status(color, DiseaseState.CURED)
 
         if all([status is not DiseaseState.ACTIVE for status in self.statuses.values()]):
             raise exceptions.GameOverWin
 
+    def set_status(self, color, status):
+        if color in self.statuses:
+            self.hash ^= zobrist.key('status', color, self.statuses[color].name)
+        self.hash ^= zobrist.key('status', color, status.name)
+        self.statuses[color] = status
+        if status is not DiseaseState.ACTIVE and color not in self.cured_colors:
+            self.cured_colors.append(color)
+        elif status is DiseaseState.ACTIVE and color in self.cured_colors:
+            self.cured_colors.remove(color)
+
     def is_active(self, color):
         return self.statuses[color] is DiseaseState.ACTIVE
 
@@ -140,7 +194,23 @@ class DiseaseTrack:
         return self.statuses[color] is DiseaseState.ERADICATED
 
 
+def cure(state, color):
+    """Cure a disease and notify the hooks, including when the cure wins the game."""
+    track = state.disease_track
+    active = track.is_active(color)
+    try:
+        track.set_cured(color)
+    finally:
+        if active and not track.is_active(color):
+            state.hooks.emit('disease_cured', state, color)
+            state.hooks.publish(state, records.Cured, color)
+            if track.is_eradicated(color):
+                state.hooks.publish(state, records.Eradicated, color)
+
+
 class OutbreakTrack:
+    __slots__ = ('count', 'max', 'resolved')
+
     def __init__(self, max=8):
         self.count = 0
         self.max = max
@@ -149,13 +219,19 @@ class OutbreakTrack:
     def increment(self):
         self.count += 1
         if self.count == self.max:
-            raise exceptions.GameOverLose('The outbreak track reached its max.')
+            raise exceptions.GameOverLose('The outbreak track reached its max.', 'outbreaks')
 
     def reset(self):
         self.resolved.clear()
 
+    @property
+    def hash(self):
+        return zobrist.key('outbreaks', self.count)
+
 
 class InfectionTrack:
+    __slots__ = ('position', 'rate', 'track')
+
     def __init__(self, track):
         self.position = 0
         self.track = track
@@ -164,3 +240,7 @@ class InfectionTrack:
     def increment(self):
         self.position += 1
         self.rate = self.track[self.position]
+
+    @property
+    def hash(self):
+        return zobrist.key('infection', self.position)
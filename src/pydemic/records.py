@@ -0,0 +1,52 @@
+"""Typed records of what happens in a game.
+
+The engine publishes a record through GameState.hooks whenever it draws a card or changes the
+board. Observers register for record types, e.g. state.hooks.observe(records.Outbreak, callback),
+and are called with the state and the record. A record is only built if its type has observers,
+so unobserved games only pay for a dictionary lookup.
+
+Records refer to pieces by name rather than holding the pieces themselves, so they stay valid as
+the state changes and can be logged as is.
+"""
+
+from collections import namedtuple
+
+CardDrawn = namedtuple('CardDrawn', ['deck', 'card'])  # Deck is "player" or "infection"
+CubesPlaced = namedtuple('CubesPlaced', ['city', 'color', 'n'])
+CubesRemoved = namedtuple('CubesRemoved', ['city', 'color', 'n'])
+Outbreak = namedtuple('Outbreak', ['city', 'color'])
+EpidemicStage = namedtuple('EpidemicStage', ['stage'])  # Increase, infect, or intensify
+Cured = namedtuple('Cured', ['color'])
+Eradicated = namedtuple('Eradicated', ['color'])
+StationBuilt = namedtuple('StationBuilt', ['city'])
+StationRemoved = namedtuple('StationRemoved', ['city'])
+PawnMoved = namedtuple('PawnMoved', ['player', 'origin', 'target'])  # Origin is None when placed
+EventPlayed = namedtuple('EventPlayed', ['player', 'card'])
+Command = namedtuple('Command', ['name', 'args'])  # Interactive command after it ran
+
+kinds = [
+    CardDrawn,
+    CubesPlaced,
+    CubesRemoved,
+    Outbreak,
+    EpidemicStage,
+    Cured,
+    Eradicated,
+    StationBuilt,
+    StationRemoved,
+    PawnMoved,
+    EventPlayed,
+    Command,
+]
+
+
+class Recorder:
+    """Observer that collects the records of a state in order."""
+
+    def __init__(self, state, kinds=kinds):
+        self.records = []
+        for kind in kinds:
+            state.hooks.observe(kind, self.record)
+
+    def record(self, state, record):
+        self.records.append(record)
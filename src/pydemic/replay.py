@@ -0,0 +1,135 @@
+"""Recording and seeking through games played with policies.
+
+A game is reproduced by its settings, its seed, and the log of decisions its policy made in each
+turn, since every other source of randomness is the generator of the state seeded by
+simulate.new_game. Replaying the log through simulate.play_turn rebuilds the state at any turn,
+and keyframes of the encoded state and generator are stored every interval turns, so seeking only
+replays the turns since the nearest keyframe.
+"""
+
+from array import array
+
+import pydemic.bots as bots
+import pydemic.codec as codec
+import pydemic.exceptions as exceptions
+import pydemic.simulate as simulate
+
+
+class RecordingPolicy:
+    """Policy that logs the decisions of another policy."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.choices = []
+
+    def choose_action(self, state, player):
+        action = self.policy.choose_action(state, player)
+        self.choices.append(action)
+        return action
+
+    def choose_discard(self, state, player):
+        card_name = self.policy.choose_discard(state, player)
+        self.choices.append(card_name)
+        return card_name
+
+    def choose_event(self, state, phase):
+        event = self.policy.choose_event(state, phase)
+        self.choices.append(event)
+        return event
+
+
+class LogPolicy:
+    """Policy that repeats the decisions of a log in order."""
+
+    def __init__(self, choices):
+        self.choices = iter(choices)
+
+    def choose_action(self, state, player):
+        return next(self.choices)
+
+    def choose_discard(self, state, player):
+        return next(self.choices)
+
+    def choose_event(self, state, phase):
+        return next(self.choices)
+
+
+def play_turn(state, policy):
+    """Play a turn and return the result if the game ended during it or None otherwise."""
+    try:
+        simulate.play_turn(state, policy)
+    except exceptions.GameOverWin:
+        return simulate.GameResult(True, state.turn_count + 1, None)
+    except exceptions.GameOverLose as error:
+        return simulate.GameResult(False, state.turn_count + 1, error.reason)
+    return None
+
+
+def get_keyframe(layout, state):
+    return array('q', layout.encode(state)), state.rng.getstate()
+
+
+class Replay:
+    """Log of a game with keyframes every interval turns.
+
+    The log is a list with the decisions of each turn, so turns[t] are the choices returned by the
+    policy during turn t.
+    """
+
+    def __init__(self, settings, seed, turns, interval=10):
+        self.settings = settings
+        self.seed = seed
+        self.turns = turns
+        self.interval = interval
+        self.keyframes = {}
+        self.layout = None
+
+    @classmethod
+    def record(cls, settings, seed, policy=bots.Policy, interval=10, turn_max=None):
+        """Play a seeded game with a policy class and return its replay and result."""
+        state = simulate.new_game(settings, seed)
+        replay = cls(settings, seed, [], interval)
+        replay.layout = codec.Layout(state)
+        recorder = RecordingPolicy(policy(state))
+        result = None
+        while result is None and (turn_max is None or state.turn_count < turn_max):
+            if state.turn_count % interval == 0:
+                replay.keyframes[state.turn_count] = get_keyframe(replay.layout, state)
+            recorder.choices = []
+            replay.turns.append(recorder.choices)
+            result = play_turn(state, recorder)
+        if result is None:
+            result = simulate.GameResult(False, state.turn_count, 'turns')
+        return replay, result
+
+    def build_keyframes(self):
+        """Replay the log once to store its keyframes, e.g. after loading only the log."""
+        state = simulate.new_game(self.settings, self.seed)
+        self.layout = codec.Layout(state)
+        self.keyframes = {}
+        for turn, choices in enumerate(self.turns):
+            if turn % self.interval == 0:
+                self.keyframes[turn] = get_keyframe(self.layout, state)
+            if play_turn(state, LogPolicy(choices)) is not None:
+                break
+
+    def seek(self, turn, state=None):
+        """Return the state at the start of a turn, or at the end of the game for the last turn.
+
+        The generator of the state is set as it was at that point of the game, so the returned
+        state can be played forward. If state is given, it must be a state of the same game, and it is
+        overwritten in place.
+        """
+        if not 0 <= turn <= len(self.turns):
+            raise ValueError(f'turn must be between 0 and {len(self.turns)}.')
+        if not self.keyframes:
+            self.build_keyframes()
+
+        start = min(turn // self.interval * self.interval, max(self.keyframes))
+        values, rng_state = self.keyframes[start]
+        state = self.layout.decode(values, state)
+        state.rng.setstate(rng_state)
+        for choices in self.turns[start:turn]:
+            if play_turn(state, LogPolicy(choices)) is not None:
+                break
+        return state
@@ -0,0 +1,121 @@
+"""Forecasts of infection risk over the upcoming infect phase.
+
+The board is represented as matrices indexed by city and color, and the forecast is computed with
+whole-board operations on these matrices rather than by infecting copies of the cities. Draw
+probabilities are exact given the strata of the infection deck, but outbreaks are only followed
+through their first-order chain reactions, and the draws of different cities are treated as
+independent. Epidemics during the draw phase are ignored.
+
+Each draw of a city and each outbreak of a neighbor adds one cube, but a city never holds more than
+its maximum, since further cubes cause outbreaks instead. Expected cubes are therefore computed
+from the distribution of these events capped at the room left in each city rather than by capping
+the expected number of events, which would overestimate them.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+Forecast = namedtuple('Forecast', ['cities', 'colors', 'cubes', 'outbreaks'])
+
+
+@lru_cache
+def get_index(adjacency):
+    """Return the city names and the neighbor indices of a map given as ((CITY, NEIGHBORS), ...).
+
+    The neighbors of a city are the cities whose outbreaks place cubes on it, i.e. the cities that
+    list it as a neighbor, since a few maps are not symmetric.
+    """
+    names = tuple(name for name, _ in adjacency)
+    idx = {name: i for i, name in enumerate(names)}
+    sources = [[] for _ in names]
+    for i, (_, adjacent) in enumerate(adjacency):
+        for neighbor in adjacent:
+            sources[idx[neighbor]].append(i)
+    return names, tuple(tuple(indices) for indices in sources)
+
+
+# Matrix operations
+def multiply(a, b):
+    return [[x * y for x, y in zip(row_a, row_b)] for row_a, row_b in zip(a, b)]
+
+
+def complement(a):
+    return [[1 - x for x in row] for row in a]
+
+
+def gather_any(a, neighbors):
+    """Return the probability that any neighbor of each city has an independent event in a."""
+    result = []
+    for adjacent in neighbors:
+        row = [1] * len(a[0])
+        for i in adjacent:
+            row = [x * (1 - y) for x, y in zip(row, a[i])]
+        result.append([1 - x for x in row])
+    return result
+
+
+def capped_sum(probabilities, cap):
+    """Return the expectation of min(cap, X) for a sum X of independent events."""
+    distribution = [1] + [0] * cap  # Probabilities of min(cap, X) = k
+    for p in probabilities:
+        shifted = [0] + distribution[:-1]
+        shifted[cap] += distribution[cap]
+        distribution = [(1 - p) * x + p * y for x, y in zip(distribution, shifted)]
+    return sum(k * x for k, x in enumerate(distribution))
+
+
+def forecast(state, draws=None):
+    """Return the expected cubes and outbreak probabilities of every city and color.
+
+    If draws is None, the current infection rate is used. The matrices in the result are indexed
+    first by the cities and then by the colors in the same order as the fields of those names.
+    """
+    if draws is None:
+        draws = state.infection_track.rate
+    adjacency = state.topology.adjacency
+    names, neighbors = get_index(adjacency)
+    cities = [state.cities[name] for name in names]
+    colors = state.disease_track.colors
+    track = state.disease_track
+
+    cubes = [[city.cubes[color] for color in colors] for city in cities]
+    full = [[int(n == city.cube_max) for n in row] for row, city in zip(cubes, cities)]
+    near_full = [[int(n == city.cube_max - 1) for n in row] for row, city in zip(cubes, cities)]
+    blocked = [
+        [int(track.is_eradicated(color) or city.immunity(state, color)) for color in colors]
+        for city in cities
+    ]
+    allowed = complement(blocked)
+
+    # Probability each city is drawn, placed in the column of its color
+    probabilities = state.infection_deck.draw_probabilities(draws)
+    drawn = [
+        [probabilities.get(city.name, 0) * (color == city.color) for color in colors]
+        for city in cities
+    ]
+    drawn = multiply(drawn, allowed)
+
+    # Outbreaks from draws of full cities and their first-order chain reactions
+    direct = multiply(drawn, full)
+    spread = multiply(gather_any(direct, neighbors), allowed)
+    chained = [
+        [f * s + h * d * s for f, h, d, s in zip(*rows)]
+        for rows in zip(full, near_full, drawn, spread)
+    ]
+    outbreaks = complement(multiply(complement(direct), complement(chained)))
+
+    # Cubes from draws and neighboring outbreaks up to the maximum of each city
+    expected = []
+    for i, (city, adjacent) in enumerate(zip(cities, neighbors)):
+        row = []
+        for j, n in enumerate(cubes[i]):
+            events = [drawn[i][j], *[direct[k][j] * allowed[i][j] for k in adjacent]]
+            row.append(n + capped_sum(events, city.cube_max - n))
+        expected.append(row)
+
+    return Forecast(names, colors, expected, outbreaks)
+
+
+def expected_outbreaks(state, draws=None):
+    """Return the expected number of outbreaks over the upcoming infect phase."""
+    return sum(sum(row) for row in forecast(state, draws).outbreaks)
@@ -1,12 +1,50 @@
 """Definitions of player roles."""
 
+from collections import Counter
+
 import pydemic.exceptions as exceptions
+import pydemic.pieces as pieces
+import pydemic.records as records
+import pydemic.zobrist as zobrist
 from pydemic.display import indent, prompt_prefix, style, cards_to_string
 
 
 class Player:
+    __slots__ = (
+        '_city',
+        '_hash',
+        'action_count',
+        'action_num',
+        'actions',
+        'color',
+        'color_counts',
+        'cure_num',
+        'event_count',
+        'hand',
+        'hand_max',
+        'immune',
+        'name',
+        'role',
+    )
+
     def __init__(self, name, role='base', hand_max=7, color=None):
-        self.actions = {
+        self.actions = self.get_actions()
+        self.action_num = 4
+        self.action_count = self.action_num
+        self._city = None
+        self._hash = 0
+        self.immune = []  # Cells counted in GameState.immunities
+        self.cure_num = 5
+        self.hand = {}
+        self.hand_max = hand_max
+        self.color_counts = Counter()  # City cards in hand by color
+        self.event_count = 0
+        self.name = name
+        self.role = role
+        self.color = color
+
+    def get_actions(self):
+        return {
             'ground': self.ground,
             'direct': self.direct,
             'charter': self.charter,
@@ -17,15 +55,25 @@ class Player:
             'cure': self.cure,
             'pass': self.no_action,
         }
-        self.action_num = 4
-        self.action_count = self.action_num
-        self._city = None
-        self.cure_num = 5
-        self.hand = {}
-        self.hand_max = hand_max
-        self.name = name
-        self.role = role
-        self.color = color
+
+    # Pickling functions
+    def __getstate__(self):
+        # Bound methods and closures are rebuilt and counts are recomputed, so only data is sent
+        # The city is relinked to the player by GameState
+        rebuilt = ['actions', 'color_counts', 'event_count', 'immune']
+        return {
+            key: getattr(self, key)
+            for cls in type(self).__mro__
+            for key in getattr(cls, '__slots__', ())
+            if key not in rebuilt
+        }
+
+    def __setstate__(self, attrs):
+        for key, value in attrs.items():
+            setattr(self, key, value)
+        self.actions = self.get_actions()
+        self.immune = []
+        self.recount()
 
     # Property functions
     @property
@@ -36,16 +84,57 @@ class Player:
     def city(self, target):
         raise AttributeError('Use set_city method to change city.')
 
+    @property
+    def hash(self):
+        return self._hash
+
     def set_city(self, state, target):
-        if self._city is not None:  # Do not attempt to set parameters for newly instantiated players # fmt: skip
-            del self.city.players[self.name]
+        origin = self._city
+        if origin is not None:  # Do not attempt to set parameters for newly instantiated players # fmt: skip
+            del origin.players[self.name]
+            self._hash ^= zobrist.key('city', self.name, origin.name)
         self._city = target
         if target is not None:  # Do not attempt to set parameters while instantiating players
             target.players[self.name] = self
+            self._hash ^= zobrist.key('city', self.name, target.name)
+            # Moves are the most frequent event, so skip the calls when nothing is subscribed
+            hooks = state.hooks
+            callbacks = hooks.callbacks.get(('pawn_moved', self.name))
+            if callbacks:
+                for callback in callbacks:
+                    callback(state, self, origin)
+            if records.PawnMoved in hooks.observers:
+                origin_name = None if origin is None else origin.name
+                hooks.publish(state, records.PawnMoved, self.name, origin_name, target.name)
+
+    # Ability hooks
+    def subscribe(self, hooks):
+        """Register callbacks for the events that can trigger the player's abilities."""
+
+    def immune_cells(self, state):
+        """Return the (CITY_NAME, COLOR) pairs where the player prevents cubes from being placed."""
+        return []
+
+    def update_immunity(self, state):
+        # Only protected cells are kept, so checks are membership tests
+        immunities = state.immunities
+        for cell in self.immune:
+            n = immunities[cell]
+            if n > 1:
+                immunities[cell] = n - 1
+            else:
+                del immunities[cell]
+        self.immune = self.immune_cells(state)
+        for cell in self.immune:
+            immunities[cell] = immunities.get(cell, 0) + 1
 
     # Utility functions
-    def add_card(self, state, card):
+    def add_card(self, state, card, limit=True):
         self.hand[card.name] = card
+        self._hash ^= zobrist.key('hand', self.name, card.name)
+        self.count_card(card, 1)
+        if not limit:  # Caller is responsible for enforcing the hand limit
+            return
         if len(self.hand) > self.hand_max:
             print()
             print(
@@ -70,6 +159,9 @@ class Player:
             else:
                 print('Command failed: Incorrect number or form of arguments.')
 
+    def can_cure(self, color):
+        return self.color_counts[color] >= self.cure_num
+
     def can_share(self, card_name):
         if card_name not in self.hand:
             return False, 'Action failed: Player does not have the specified card.'
@@ -79,7 +171,7 @@ class Player:
 
     def discard(self, state, card_name):
         try:
-            state.player_deck.discard(self.hand.pop(card_name))
+            state.player_deck.discard(self.remove_card(card_name))
         except KeyError:
             raise exceptions.DiscardError(f'{card_name} is not in hand.')
 
@@ -92,6 +184,7 @@ class Player:
         if card.type != 'event':
             raise exceptions.EventError(f'{card_name} is not an event card.')
         card.event(state)
+        state.hooks.publish(state, records.EventPlayed, self.name, card_name)
         self.discard(state, card_name)
 
     def has_event(self, card_name):
@@ -103,6 +196,25 @@ class Player:
     def immunity(self, state, city, color):
         return False
 
+    def remove_card(self, card_name):
+        card = self.hand.pop(card_name)
+        self._hash ^= zobrist.key('hand', self.name, card_name)
+        self.count_card(card, -1)
+        return card
+
+    def count_card(self, card, n):
+        if card.type == 'city':
+            self.color_counts[card.color] += n
+        elif card.type == 'event':
+            self.event_count += n
+
+    def recount(self):
+        """Rebuild the card counts of a hand that was modified directly."""
+        self.color_counts = Counter()
+        self.event_count = 0
+        for card in self.hand.values():
+            self.count_card(card, 1)
+
     def reset(self):
         self.action_count = self.action_num
 
@@ -230,7 +342,7 @@ class Player:
             self.city.add_station(state)
         except (exceptions.DiscardError, exceptions.StationAddError) as error:
             if isinstance(error, exceptions.StationAddError):
-                self.add_card(state, state.player_deck.discard_pile.pop())
+                self.add_card(state, state.player_deck.retrieve(self.city.name))
             if city is not None:  # Return "borrowed station"
                 city.add_station(state)
             print('Action failed:', error)
@@ -293,7 +405,7 @@ class Player:
             return
         can_share, msg = giver.can_share(card)
         if can_share:
-            receiver.add_card(state, giver.hand.pop(card))
+            receiver.add_card(state, giver.remove_card(card))
             self.action_count -= 1
             print(msg)
         else:
@@ -314,10 +426,10 @@ class Player:
             print('Action failed: Not in city with research station.')
             return
 
-        cards = [card.name for card in self.hand.values() if card.color == args[0]]
-        if len(cards) < self.cure_num:
+        if not self.can_cure(args[0]):
             print('Action failed: Insufficient cards.')
             return
+        cards = [card.name for card in self.hand.values() if card.color == args[0]]
         while len(cards) > self.cure_num:
             items = input(
                 f'{prompt_prefix}'
@@ -332,7 +444,7 @@ class Player:
                     print('Card not found.')
 
         try:
-            state.disease_track.set_cured(args[0])
+            pieces.cure(state, args[0])
         except exceptions.PropertyError as error:
             print('Action failed:', error)
         else:
@@ -354,11 +466,21 @@ class Player:
 
 
 class ContingencyPlanner(Player):
+    __slots__ = ('contingency_slot',)
+
     def __init__(self, name):
         super().__init__(name, 'contingency_planner', color='light_blue')
-        self.actions = {**self.actions, 'contingency': self.contingency}
         self.contingency_slot = None
 
+    def get_actions(self):
+        return {**super().get_actions(), 'contingency': self.contingency}
+
+    @property
+    def hash(self):
+        if self.contingency_slot is None:
+            return self._hash
+        return self._hash ^ zobrist.key('contingency', self.name, self.contingency_slot.name)
+
     def event(self, state, card_name):
         in_hand = card_name in self.hand
         in_slot = (self.contingency_slot is not None) and (card_name == self.contingency_slot.name)
@@ -370,12 +492,14 @@ class ContingencyPlanner(Player):
             if card.type != 'event':
                 raise exceptions.EventError(f'{card_name} is not an event card.')
             card.event(state)
+            state.hooks.publish(state, records.EventPlayed, self.name, card_name)
             self.discard(state, card_name)
         elif in_slot:
             card = self.contingency_slot
             if card.type != 'event':
                 raise exceptions.EventError(f'{card_name} is not an event card.')
             card.event(state)
+            state.hooks.publish(state, records.EventPlayed, self.name, card_name)
             self.contingency_slot = None  # Setting to None w/o discard removes from game
 
     def has_event(self, card_name):
@@ -413,10 +537,14 @@ class ContingencyPlanner(Player):
 
 
 class Dispatcher(Player):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name, 'dispatcher', color='purple')
-        self.actions = {
-            **self.actions,
+
+    def get_actions(self):
+        return {
+            **super().get_actions(),
             'airlift': self.airlift,
             'ground': self.make_parse('ground'),
             'direct': self.make_parse('direct'),
@@ -555,21 +683,31 @@ class Dispatcher(Player):
 
 
 class Medic(Player):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name, 'medic', color='orange')
 
-    def set_city(self, state, target):
-        if self._city is not None:  # Do not attempt to set parameters for newly instantiated players # fmt: skip
-            del self.city.players[self.name]
-        self._city = target
-        if target is not None:  # Do not attempt to set parameters while instantiating players
-            target.players[self.name] = self
-            for color in state.disease_track.colors:
-                if not state.disease_track.is_active(color):
-                    try:
-                        target.remove_disease(state, color)
-                    except exceptions.PropertyError:
-                        pass
+    def subscribe(self, hooks):
+        hooks.subscribe(('pawn_moved', self.name), self.on_pawn_moved)
+        hooks.subscribe('disease_cured', self.on_disease_cured)
+
+    def on_pawn_moved(self, state, player, origin):
+        colors = state.disease_track.cured_colors
+        if not colors:  # Immunity is only gained with cures, so there is nothing to update
+            return
+        for color in colors:
+            if self.city.cubes[color] > 0:
+                self.city.remove_disease(state, color)
+        self.update_immunity(state)
+
+    def on_disease_cured(self, state, color):
+        self.update_immunity(state)
+
+    def immune_cells(self, state):
+        if self.city is None:
+            return []
+        return [(self.city.name, color) for color in state.disease_track.cured_colors]
 
     def immunity(self, state, city, color):
         if self.city and city == self.city and not state.disease_track.is_active(color):
@@ -605,14 +743,24 @@ class Medic(Player):
 
 
 class OperationsExpert(Player):
+    __slots__ = ('shuttle_action',)
+
     def __init__(self, name):
         super().__init__(name, 'operations_expert', color='light_green')
-        self.actions = {
-            **self.actions,
+        self.shuttle_action = True
+
+    def get_actions(self):
+        return {
+            **super().get_actions(),
             'opex_shuttle': self.opex_shuttle,
             'station': self.station,
         }
-        self.shuttle_action = True
+
+    @property
+    def hash(self):
+        if not self.shuttle_action:
+            return self._hash
+        return self._hash ^ zobrist.key('shuttle_action', self.name)
 
     def reset(self):
         super().reset()
@@ -691,18 +839,36 @@ class OperationsExpert(Player):
 
 
 class QuarantineSpecialist(Player):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name, 'quarantine_specialist', color='green')
 
+    def subscribe(self, hooks):
+        hooks.subscribe(('pawn_moved', self.name), self.on_pawn_moved)
+
+    def on_pawn_moved(self, state, player, origin):
+        self.update_immunity(state)
+
+    def update_immunity(self, state):
+        # Only one quarantine specialist is in a game, and it protects every color, so its cities
+        # are swapped as a whole rather than counted cell by cell
+        city = self._city
+        state.quarantined = (
+            frozenset() if city is None else city.site.topology.neighborhoods[city.name]
+        )
+
     def immunity(self, state, city, color):
         # Check city is set to avoid KeyError during initialization
-        if self.city and (city == self.city or city in self.city.neighbors.values()):
+        if self.city and (city == self.city or city.name in self.city.neighbors):
             return True
         else:
             return False
 
 
 class Researcher(Player):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name, 'researcher', color='brown')
 
@@ -713,6 +879,8 @@ class Researcher(Player):
 
 
 class Scientist(Player):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name, 'scientist', color='white')
         self.cure_num = 4
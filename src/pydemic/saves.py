@@ -0,0 +1,139 @@
+"""Saving and loading games in progress.
+
+A save stores the settings needed to set up the game, i.e. the map, the players and their roles,
+and the sizes of the tracks, followed by the codec encoding of the state and the phase of the turn.
+The encoding only contains what defines the position, so the pieces, cards, and roles themselves
+are never serialized. Loading sets up the game once per distinct set of settings and decodes every
+later save with the same settings from that setup.
+
+Format (little-endian):
+    magic: 4 bytes
+    version: uint16
+    header length: uint32
+    header: JSON object of the settings and the phase
+    values: int16 array of the encoded state
+"""
+
+import json
+import struct
+import sys
+from argparse import Namespace
+from array import array
+
+import pydemic.codec as codec
+import pydemic.main as main
+import pydemic.maps as maps
+import pydemic.roles as roles
+
+magic = b'PDSV'
+version = 1
+prefix = struct.Struct('<4sHI')
+phases = ['action', 'draw', 'infect']
+layouts = {}  # Layouts by the JSON of their settings
+
+
+def get_phase(state):
+    """Return the phase of the current turn from the actions, draws, and infections remaining."""
+    if state.current_player.action_count > 0:
+        return 'action'
+    if state.draw_count > 0:
+        return 'draw'
+    return 'infect'
+
+
+def get_settings(state):
+    map_name = state.topology.name
+    if map_name is None:
+        raise ValueError('State is not on a map in the library.')
+    return {
+        'map': map_name,
+        'players': [[name, player.role] for name, player in state.players.items()],
+        'outbreak_max': state.outbreak_track.max,
+        'infection_seq': state.infection_track.track,
+        'cube_num': state.disease_track.cube_num,
+        'station_num': state.station_count + len(state.stations),
+    }
+
+
+def get_layout(settings):
+    key = json.dumps(settings, sort_keys=True)
+    if key not in layouts:
+        args = Namespace(
+            map=maps.maps[settings['map']],
+            player_names=[name for name, _ in settings['players']],
+            outbreak_max=settings['outbreak_max'],
+            infection_seq=settings['infection_seq'],
+            cube_num=settings['cube_num'],
+            station_num=settings['station_num'],
+        )
+        role_map = {name: roles.roles.get(role, roles.Player) for name, role in settings['players']}
+        state = main.initialize_state(args, role_map=role_map)
+        layouts.setdefault(key, codec.Layout(state))
+    return layouts[key]
+
+
+def dumps(state, phase=None):
+    """Return a save of a state as bytes.
+
+    If phase is None, it is inferred from the state with get_phase.
+    """
+    settings = get_settings(state)
+    header = {**settings, 'phase': get_phase(state) if phase is None else phase}
+    header = json.dumps(header, separators=(',', ':')).encode()
+    values = array('h', get_layout(settings).encode(state))
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return prefix.pack(magic, version, len(header)) + header + values.tobytes()
+
+
+def loads(data, state=None):
+    """Return the state and phase of a save.
+
+    If state is given, it must be a state of a game with the same settings, and it is overwritten
+    in place, which is much faster than building a new state. Raises ValueError if data is not a
+    complete save, in which case a given state may be partially overwritten.
+    """
+    try:
+        file_magic, file_version, header_size = prefix.unpack_from(data)
+    except struct.error:
+        raise ValueError('Data is not a save.')
+    if file_magic != magic:
+        raise ValueError('Data is not a save.')
+    if file_version != version:
+        raise ValueError(
+            f'Save is version {file_version}, but only version {version} is supported.'
+        )
+    start = prefix.size + header_size
+    header = json.loads(bytes(data[prefix.size : start]))
+    try:
+        phase = header.pop('phase')
+        layout = get_layout(header)
+    except (AttributeError, KeyError, TypeError) as error:
+        raise ValueError(f'Save has invalid settings: {error!r}.') from error
+    if phase not in phases:
+        raise ValueError(f'Save has unknown phase {phase}.')
+    values = array('h')
+    try:
+        values.frombytes(data[start:])
+    except ValueError as error:
+        raise ValueError('Save data is truncated.') from error
+    if sys.byteorder == 'big':
+        values.byteswap()
+    new = state is None
+    try:
+        state = layout.decode(values, state)
+    except (IndexError, KeyError, StopIteration) as error:
+        raise ValueError('Save data is truncated or corrupt.') from error
+    if new:
+        state.rng.seed()  # Generators are not saved, so do not repeat the shuffles of the layout
+    return state, phase
+
+
+def save(state, path, phase=None):
+    with open(path, 'wb') as file:
+        file.write(dumps(state, phase))
+
+
+def load(path, state=None):
+    with open(path, 'rb') as file:
+        return loads(file.read(), state)
@@ -0,0 +1,116 @@
+"""Batches of game states in shared memory for parallel workers.
+
+A batch stores encoded states in fixed-width slots of a shared memory block followed by a fixed
+number of float results per slot. Workers read states from and write results to the block
+directly, so each task only passes a slot index.
+
+Batches are pickled as the name of their block, so workers started with spawn attach the block
+instead of copying it. Forked workers inherit it. In both cases, the function passed to map_states
+is sent to each worker once, so under spawn it must be importable, e.g. defined at module level.
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.shared_memory import SharedMemory
+
+import pydemic.codec as codec
+
+
+class StateBatch:
+    """Shared memory block of encoded states and their results.
+
+    If name is None, a new block is created. Otherwise the existing block with that name is
+    attached, and its layout, size, and result_width must match those of its creator.
+    """
+
+    def __init__(self, layout, size, result_width=1, name=None):
+        self.layout = layout
+        self.size = size
+        self.result_width = result_width
+        state_bytes = 8 * size * layout.width
+        result_bytes = 8 * size * result_width
+        self.shm = SharedMemory(name=name, create=name is None, size=state_bytes + result_bytes)
+        self.states = self.shm.buf[:state_bytes].cast('q')
+        self.results = self.shm.buf[state_bytes : state_bytes + result_bytes].cast('d')
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __reduce__(self):
+        # Attach the block by name rather than pickling its contents
+        return StateBatch, (self.layout, self.size, self.result_width, self.name)
+
+    def put(self, slot, state):
+        values = self.layout.encode(state)
+        width = self.layout.width
+        values.extend([0] * (width - len(values)))
+        self.states[slot * width : (slot + 1) * width] = array('q', values)
+
+    def get(self, slot, state=None):
+        width = self.layout.width
+        return self.layout.decode(self.states[slot * width : (slot + 1) * width], state)
+
+    def set_result(self, slot, values):
+        width = self.result_width
+        self.results[slot * width : (slot + 1) * width] = array('d', values)
+
+    def get_result(self, slot):
+        width = self.result_width
+        return self.results[slot * width : (slot + 1) * width].tolist()
+
+    def close(self):
+        # Views into the buffer must be released before it can be closed
+        self.states.release()
+        self.results.release()
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+# Parallel runner
+_worker = None
+
+
+def init_worker(batch, func):
+    global _worker
+    _worker = (batch, func, None)
+
+
+def run_slot(slot):
+    global _worker
+    batch, func, state = _worker
+    state = batch.get(slot, state)  # Reuse the worker's state after the first task
+    _worker = (batch, func, state)
+    batch.set_result(slot, func(state))
+
+
+def map_states(func, states, processes=None, result_width=1, start_method=None):
+    """Return the results of calling func on each state in worker processes.
+
+    States must be from the same game, and func must return a sequence of result_width numbers.
+    States are written to a shared batch once, and each task is only a slot index. If start_method
+    is None, fork is used where it is available and spawn otherwise.
+    """
+    if start_method is None:
+        start_method = 'fork' if 'fork' in get_all_start_methods() else 'spawn'
+    layout = codec.Layout(states[0])
+    batch = StateBatch(layout, len(states), result_width)
+    try:
+        for slot, state in enumerate(states):
+            batch.put(slot, state)
+
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=get_context(start_method),
+            initializer=init_worker,
+            initargs=(batch, func),
+        ) as executor:
+            for _ in executor.map(run_slot, range(len(states))):
+                pass
+        return [batch.get_result(slot) for slot in range(len(states))]
+    finally:
+        batch.close()
+        batch.unlink()
@@ -0,0 +1,408 @@
+"""Functions for playing unattended games with automated policies."""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pydemic.argfuncs as argfuncs
+import pydemic.bots as bots
+import pydemic.constants as constants
+import pydemic.exceptions as exceptions
+import pydemic.main as main
+import pydemic.pieces as pieces
+import pydemic.records as records
+import pydemic.roles as roles
+from pydemic.state import Random
+
+GameResult = namedtuple('GameResult', ['win', 'turns', 'reason'])
+
+
+# Actions
+def ground(state, player, city_name, pawn_name=None):
+    pawn = player if pawn_name is None else state.players[pawn_name]
+    pawn.set_city(state, state.cities[city_name])
+    player.action_count -= 1
+
+
+def direct(state, player, city_name, pawn_name=None):
+    pawn = player if pawn_name is None else state.players[pawn_name]
+    player.discard(state, city_name)
+    pawn.set_city(state, state.cities[city_name])
+    player.action_count -= 1
+
+
+def charter(state, player, city_name, pawn_name=None):
+    pawn = player if pawn_name is None else state.players[pawn_name]
+    player.discard(state, player.city.name)
+    pawn.set_city(state, state.cities[city_name])
+    player.action_count -= 1
+
+
+def shuttle(state, player, city_name, pawn_name=None):
+    pawn = player if pawn_name is None else state.players[pawn_name]
+    pawn.set_city(state, state.cities[city_name])
+    player.action_count -= 1
+
+
+def station(state, player, removed_name=None):
+    if removed_name is not None:
+        state.cities[removed_name].remove_station(state)
+    if not isinstance(player, roles.OperationsExpert):
+        player.discard(state, player.city.name)
+    player.city.add_station(state)
+    player.action_count -= 1
+
+
+def treat(state, player, color):
+    city = player.city
+    if isinstance(player, roles.Medic):
+        while city.cubes[color] > 0:
+            city.remove_disease(state, color)
+    else:
+        city.remove_disease(state, color)
+    player.action_count -= 1
+
+
+def share(state, player, target_name, card_name):
+    target = state.players[target_name]
+    giver, receiver = (player, target) if card_name in player.hand else (target, player)
+    receiver.add_card(state, giver.remove_card(card_name), limit=False)
+    player.action_count -= 1
+
+
+def cure(state, player, color, *card_names):
+    player.action_count -= 1
+    for card_name in card_names:
+        player.discard(state, card_name)
+    pieces.cure(state, color)
+
+
+def no_action(state, player):
+    player.action_count -= 1
+
+
+def airlift(state, player, target_name, destination_name):
+    target = state.players[target_name]
+    target.set_city(state, state.players[destination_name].city)
+    player.action_count -= 1
+
+
+def opex_shuttle(state, player, city_name, card_name):
+    player.discard(state, card_name)
+    player.set_city(state, state.cities[city_name])
+    player.action_count -= 1
+    player.shuttle_action = False
+
+
+def contingency(state, player, card_name):
+    player.contingency_slot = state.player_deck.retrieve(card_name)
+    player.action_count -= 1
+
+
+actions = {
+    'ground': ground,
+    'direct': direct,
+    'charter': charter,
+    'shuttle': shuttle,
+    'station': station,
+    'treat': treat,
+    'share': share,
+    'cure': cure,
+    'pass': no_action,
+    'airlift': airlift,
+    'opex_shuttle': opex_shuttle,
+    'contingency': contingency,
+}
+
+
+def apply_action(state, player, action):
+    """Apply an action tuple of the form (NAME, *ARGS) for a player without printing.
+
+    Actions are assumed to be legal, so no validation is performed.
+    """
+    name, *args = action
+    actions[name](state, player, *args)
+
+
+def legal_actions(state, player, destinations=None):
+    """Return a list of the legal action tuples for a player.
+
+    Moves that can reach any city, i.e. charter flights and the operations expert's special move,
+    only target the cities in destinations if it is given. The special move also only discards the
+    first of the player's city cards with the least common color.
+    """
+    city = player.city
+    hand = player.hand
+    destinations = list(state.cities) if destinations is None else list(destinations)
+    stations = list(state.stations)
+    pawns = [player]
+    if isinstance(player, roles.Dispatcher):
+        pawns = list(state.players.values())
+
+    # Movement
+    legal = []
+    for pawn in pawns:
+        pawn_args = () if pawn is player else (pawn.name,)
+        legal.extend([('ground', name, *pawn_args) for name in pawn.city.neighbors])
+        legal.extend(
+            [
+                ('direct', name, *pawn_args)
+                for name, card in hand.items()
+                if card.type == 'city' and name != pawn.city.name
+            ]
+        )
+        if city.name in hand:  # Dispatchers discard the card of their own city to move others
+            legal.extend(
+                [('charter', name, *pawn_args) for name in destinations if name != pawn.city.name]
+            )
+        if pawn.city.station:
+            legal.extend(
+                [('shuttle', name, *pawn_args) for name in stations if name != pawn.city.name]
+            )
+    if isinstance(player, roles.Dispatcher):
+        for target in state.players.values():
+            for destination in state.players.values():
+                if target is not destination and target.city is not destination.city:
+                    legal.append(('airlift', target.name, destination.name))
+    if isinstance(player, roles.OperationsExpert) and player.shuttle_action and city.station:
+        city_cards = [card for card in hand.values() if card.type == 'city']
+        if city_cards:
+            counts = player.color_counts
+            card = min(city_cards, key=lambda card: counts[card.color])
+            legal.extend(
+                [('opex_shuttle', name, card.name) for name in destinations if name != city.name]
+            )
+
+    # Station
+    can_build = city.name in hand or isinstance(player, roles.OperationsExpert)
+    if not city.station and can_build:
+        if state.station_count > 0:
+            legal.append(('station', None))
+        else:
+            legal.extend([('station', name) for name in stations])
+
+    # Treat
+    legal.extend([('treat', color) for color, cubes in city.cubes.items() if cubes > 0])
+
+    # Share
+    for other in city.players.values():
+        if other is player:
+            continue
+        for giver, receiver in [(player, other), (other, player)]:
+            for name, card in giver.hand.items():
+                if card.type == 'city' and giver.can_share(name)[0]:
+                    legal.append(('share', other.name, name))
+
+    # Cure
+    if city.station:
+        for color in state.disease_track.colors:
+            if state.disease_track.is_active(color) and player.can_cure(color):
+                names = [name for name, card in hand.items() if card.color == color]
+                legal.append(('cure', color, *names[: player.cure_num]))
+
+    # Contingency
+    if isinstance(player, roles.ContingencyPlanner) and player.contingency_slot is None:
+        legal.extend(
+            [
+                ('contingency', card.name)
+                for card in state.player_deck.discard_pile
+                if card.type == 'event'
+            ]
+        )
+
+    legal.append(('pass',))
+    return legal
+
+
+# Events
+def airlift_event(state, player_name, city_name):
+    state.players[player_name].set_city(state, state.cities[city_name])
+
+
+def forecast_event(state, *order):
+    # Order is given from top to bottom as in cards.forecast
+    top = state.infection_deck.draw_pile[:-7:-1]
+    if top:
+        state.infection_deck.set_top([top[i] for i in order][::-1])
+
+
+def government_grant_event(state, city_name):
+    state.cities[city_name].add_station(state)
+
+
+def one_quiet_night_event(state):
+    state.infect_count = 0
+
+
+def resilient_population_event(state, city_name):
+    state.infection_deck.remove(city_name)
+
+
+events = {
+    'airlift': airlift_event,
+    'forecast': forecast_event,
+    'government_grant': government_grant_event,
+    'one_quiet_night': one_quiet_night_event,
+    'resilient_population': resilient_population_event,
+}
+
+
+def apply_event(state, event):
+    """Apply an event tuple of the form (PLAYER, EVENT_CARD, *ARGS) without printing."""
+    player_name, card_name, *args = event
+    player = state.players[player_name]
+    events[card_name](state, *args)
+    state.hooks.publish(state, records.EventPlayed, player_name, card_name)
+    if card_name in player.hand:
+        player.discard(state, card_name)
+    else:
+        player.contingency_slot = None  # Setting to None w/o discard removes from game
+
+
+def play_events(state, policy, phase):
+    while (event := policy.choose_event(state, phase)) is not None:
+        apply_event(state, event)
+
+
+# Game flow
+def get_args(settings):
+    """Return validated arguments for a dictionary of game settings.
+
+    The keys of settings correspond to the command-line options. Any omitted options use their
+    default values, except player_num and epidemic_num, which default to their minimums.
+    """
+    settings = {
+        'player_num': constants.player_min,
+        'epidemic_num': constants.epidemic_min,
+        **settings,
+    }
+    player_names = [f'P{i}' for i in range(1, settings.pop('player_num') + 1)]
+    argv = ['--player_names', ','.join(player_names)]
+    for key, value in settings.items():
+        option = '--cube-num' if key == 'cube_num' else f'--{key}'
+        argv.extend([option, str(value)])
+
+    args = argfuncs.parse_args(
+        argv,
+        constants.player_min_word,
+        constants.player_max_word,
+        constants.epidemic_min_word,
+        constants.epidemic_max_word,
+        constants.default_map,
+        constants.start_city,
+        constants.outbreak_max,
+        constants.infection_seq,
+        constants.cube_num,
+        constants.station_num,
+    )
+    argfuncs.check_args(
+        args,
+        constants.player_min,
+        constants.player_max,
+        constants.player_min_word,
+        constants.player_max_word,
+        constants.epidemic_min,
+        constants.epidemic_max,
+        constants.epidemic_min_word,
+        constants.epidemic_max_word,
+    )
+
+    return args
+
+
+def new_game(settings, seed=None):
+    """Return an initialized state for a dictionary of game settings.
+
+    The state shuffles with its own generator seeded with seed, so games do not share any
+    generator and can be played concurrently.
+    """
+    args = get_args(settings)
+    state = main.initialize_state(args, rng=Random(seed))
+    main.initialize_game(state, args, verbose=False)
+    return state
+
+
+def play_game(state, policy, turn_max=None):
+    """Play a game to completion and return its result.
+
+    If turn_max is reached before the game ends, the result has a reason of "turns".
+    """
+    try:
+        while turn_max is None or state.turn_count < turn_max:
+            play_turn(state, policy)
+    except exceptions.GameOverWin:
+        return GameResult(True, state.turn_count + 1, None)
+    except exceptions.GameOverLose as error:
+        return GameResult(False, state.turn_count + 1, error.reason)
+    return GameResult(False, state.turn_count, 'turns')
+
+
+def play_turn(state, policy):
+    player = state.current_player
+    state.draw_count = 2
+    state.infect_count = state.infection_track.rate
+
+    # Player actions
+    while player.action_count > 0:
+        play_events(state, policy, 'action')
+        apply_action(state, player, policy.choose_action(state, player))
+        for other in state.players.values():  # Receivers of shared cards may be over the limit
+            enforce_limit(state, other, policy)
+
+    # Draw cards
+    while state.draw_count > 0:
+        play_events(state, policy, 'draw')
+        card = state.player_deck.draw(state)
+        state.draw_count -= 1
+        if card.type == 'epidemic':
+            epidemic(state, policy)
+            state.player_deck.discard(card)
+        else:
+            player.add_card(state, card, limit=False)
+            enforce_limit(state, player, policy)
+        state.outbreak_track.reset()
+
+    # Infect cities
+    while state.infect_count > 0:
+        play_events(state, policy, 'infect')
+        if state.infect_count == 0:  # One Quiet Night was played
+            break
+        state.infection_deck.draw(state, verbose=False)
+        state.infect_count -= 1
+        state.outbreak_track.reset()
+
+    # Turn cleanup
+    player.reset()
+    state.turn_count += 1
+
+
+def epidemic(state, policy):
+    # Mirrors main.epidemic without the interactive prompts
+    state.hooks.publish(state, records.EpidemicStage, 'increase')
+    state.infection_track.increment()
+    state.hooks.publish(state, records.EpidemicStage, 'infect')
+    state.infection_deck.infect(state, verbose=False)
+    play_events(state, policy, 'epidemic')
+    state.hooks.publish(state, records.EpidemicStage, 'intensify')
+    state.infection_deck.intensify(state.rng)
+
+
+def enforce_limit(state, player, policy):
+    while len(player.hand) > player.hand_max:
+        player.discard(state, policy.choose_discard(state, player))
+
+
+def simulate(settings, seed, policy=bots.Policy, turn_max=None):
+    """Play a seeded game with a policy class and return its result."""
+    state = new_game(settings, seed)
+    return play_game(state, policy(state), turn_max=turn_max)
+
+
+def simulate_threads(settings, seeds, policy=bots.Policy, turn_max=None, threads=None):
+    """Play seeded games in a pool of threads and return their results in the order of the seeds.
+
+    Games share no mutable state, so on free-threaded builds of Python they run on separate cores
+    without pickling the settings and results between processes.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(simulate, settings, seed, policy, turn_max) for seed in seeds]
+        return [future.result() for future in futures]
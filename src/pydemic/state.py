@@ -1,7 +1,121 @@
 """Objects maintaining global shared state."""
 
+import os
+import random
+from copy import deepcopy
+
+import pydemic.hooks as hooks
+import pydemic.zobrist as zobrist
+
+
+class CountingRandom(random.Random):
+    """Mersenne Twister that counts the 32-bit words drawn from it."""
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.count = 0
+
+    def random(self):
+        self.count += 2
+        return super().random()
+
+    def getrandbits(self, k):
+        self.count += (k + 31) // 32
+        return super().getrandbits(k)
+
+
+class Random:
+    """Generator of a game stored as its seed and the number of words drawn from it.
+
+    The Mersenne Twister behind it is only created on first use, where it is advanced to the stored
+    position, so copies of a state hold two integers instead of the 2.5 KB of a generator. Its
+    state is (seed, position), which is also the state that is pickled.
+    """
+
+    __slots__ = ('count', 'generator_', 'seed_value')
+
+    def __init__(self, seed=None):
+        self.seed(seed)
+
+    def seed(self, a=None):
+        self.seed_value = int.from_bytes(os.urandom(8), 'little') if a is None else a
+        self.count = 0
+        self.generator_ = None
+
+    @property
+    def position(self):
+        """Return the number of 32-bit words drawn from the generator since it was seeded."""
+        return self.count if self.generator_ is None else self.generator_.count
+
+    @property
+    def generator(self):
+        if self.generator_ is None:
+            generator = CountingRandom(self.seed_value)
+            if self.count:
+                generator.getrandbits(32 * self.count)  # Draws exactly count words
+            generator.count = self.count
+            self.generator_ = generator
+        return self.generator_
+
+    def getstate(self):
+        return self.seed_value, self.position
+
+    def setstate(self, state):
+        self.seed_value, self.count = state
+        self.generator_ = None
+
+    def __getstate__(self):
+        return self.getstate()
+
+    def __setstate__(self, state):
+        self.setstate(state)
+
+    def __deepcopy__(self, memo):
+        rng = Random.__new__(Random)
+        rng.setstate(self.getstate())
+        return rng
+
+    def random(self):
+        return self.generator.random()
+
+    def getrandbits(self, k):
+        return self.generator.getrandbits(k)
+
+    def randrange(self, *args):
+        return self.generator.randrange(*args)
+
+    def choice(self, seq):
+        return self.generator.choice(seq)
+
+    def shuffle(self, x):
+        self.generator.shuffle(x)
+
+    def sample(self, population, k):
+        return self.generator.sample(population, k)
+
 
 class GameState:
+    __slots__ = (
+        'board_hash',
+        'cities',
+        'disease_track',
+        'draw_count',
+        'hooks',
+        'immunities',
+        'infect_count',
+        'infection_deck',
+        'infection_track',
+        'outbreak_track',
+        'player_deck',
+        'player_order',
+        'players',
+        'quarantined',
+        'rng',
+        'station_count',
+        'stations',
+        'turn_count',
+    )
+
     def __init__(
         self,
         cities,
@@ -16,6 +130,7 @@ class GameState:
         turn_count,
         draw_count,
         infect_count,
+        rng=None,
     ):
         self.cities = cities
         self.disease_track = disease_track
@@ -29,8 +144,77 @@ class GameState:
         self.turn_count = turn_count
         self.draw_count = draw_count
         self.infect_count = infect_count
+        self.board_hash = 0  # Cubes and stations, maintained by the cities
+        self.stations = {}  # Cities with stations in order of placement, maintained by the cities
+        self.hooks = hooks.Hooks()
+        self.immunities = {}  # Counts of players protecting each cell, maintained by hooks
+        self.quarantined = frozenset()  # Cities protected by the quarantine specialist, likewise
+        self.rng = Random() if rng is None else rng  # Generator of every shuffle in the game
+        for player in players.values():
+            player.subscribe(self.hooks)
+
+    def __getstate__(self):
+        # Indices and subscriptions are rebuilt, and observers are not part of the game
+        attrs = {
+            key: getattr(self, key)
+            for key in self.__slots__
+            if key not in ['hooks', 'immunities', 'quarantined']
+        }
+        attrs['stations'] = list(self.stations)
+        return attrs
+
+    def __setstate__(self, attrs):
+        for key, value in attrs.items():
+            setattr(self, key, value)
+        cities = self.cities
+        for city in cities.values():
+            city.players = {name: self.players[name] for name in city.players}
+        self.stations = {name: cities[name] for name in self.stations}
+        self.hooks = hooks.Hooks()
+        self.immunities = {}
+        self.quarantined = frozenset()
+        for player in self.players.values():
+            player.subscribe(self.hooks)
+        self.reset_immunities()
+
+    @property
+    def topology(self):
+        return next(iter(self.cities.values())).site.topology
 
     @property
     def current_player(self):
         turn = self.turn_count % len(self.players)
         return self.players[self.player_order[turn]]
+
+    @property
+    def hash(self):
+        """Return a 64-bit hash of the position from the hashes maintained by its pieces."""
+        h = (
+            self.board_hash
+            ^ self.disease_track.hash
+            ^ self.player_deck.hash
+            ^ self.infection_deck.hash
+            ^ self.outbreak_track.hash
+            ^ self.infection_track.hash
+        )
+        for player in self.players.values():
+            h ^= player.hash
+        turn = self.turn_count % len(self.players)
+        return h ^ zobrist.key(
+            'turn', turn, self.current_player.action_count, self.draw_count, self.infect_count
+        )
+
+    def reset_immunities(self):
+        """Recompute the immunity index of a state whose players were modified directly."""
+        self.immunities.clear()
+        self.quarantined = frozenset()
+        for player in self.players.values():
+            player.immune = []
+            player.update_immunity(self)
+
+    def copy(self):
+        """Return a deep copy of the state that shares its cards and map, which are immutable.
+
+        The copy is made with the pickling methods, so it is rebuilt like an unpickled state.
+        """
+        return deepcopy(self)
@@ -0,0 +1,220 @@
+"""Parallel parameter sweeps over game settings.
+
+syntax: python -m pydemic sweep [OPTIONS]
+
+Each integer setting accepts a comma-delimited grid of values and inclusive ranges, e.g. "4:6,8".
+The map and infection_seq settings can be given multiple times to add values to their grids.
+Every combination of values is a cell, and each cell is played once per seed.
+"""
+
+import csv
+import os
+import sys
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser, ArgumentTypeError
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import product
+from math import sqrt
+
+import pydemic.bots as bots
+import pydemic.constants as constants
+import pydemic.mcts as mcts
+import pydemic.simulate as simulate
+
+grid_keys = ['player_num', 'epidemic_num', 'outbreak_max', 'cube_num', 'station_num']
+list_keys = ['map', 'infection_seq']
+loss_reasons = ['outbreaks', 'cubes', 'cards', 'turns']
+policies = {**bots.policies, 'mcts': mcts.MCTSPolicy}
+
+
+def int_grid(text):
+    values = []
+    for entry in text.strip(',').split(','):
+        try:
+            if ':' in entry:
+                start, stop = entry.split(':')
+                values.extend(range(int(start), int(stop) + 1))
+            else:
+                values.append(int(entry))
+        except ValueError:
+            raise ArgumentTypeError(f'"{entry}" is not an integer or range of integers')
+    return values
+
+
+def parse_args(args):
+    parser = ArgumentParser(
+        prog='pydemic sweep',
+        description='Play unattended games over a grid of settings and summarize the results.',
+        formatter_class=ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        '--player_num',
+        default=[constants.player_min],
+        type=int_grid,
+        help='grid of the number of players',
+    )
+    parser.add_argument(
+        '--epidemic_num',
+        default=[constants.epidemic_min],
+        type=int_grid,
+        help='grid of the number of epidemics',
+    )
+    parser.add_argument(
+        '--outbreak_max',
+        default=[constants.outbreak_max],
+        type=int_grid,
+        help='grid of the maximum number of outbreaks',
+    )
+    parser.add_argument(
+        '--cube_num',
+        default=[constants.cube_num],
+        type=int_grid,
+        help='grid of the total number of cubes for each disease',
+    )
+    parser.add_argument(
+        '--station_num',
+        default=[constants.station_num],
+        type=int_grid,
+        help='grid of the total number of stations',
+    )
+    parser.add_argument(
+        '--map',
+        action='append',
+        help=f'name of a map; may be repeated (default: {constants.default_map})',
+    )
+    parser.add_argument(
+        '--infection_seq',
+        action='append',
+        help=f'an infection rate sequence; may be repeated (default: {constants.infection_seq})',
+    )
+    parser.add_argument(
+        '--seeds',
+        default=100,
+        type=int,
+        help='the number of seeded games per cell',
+    )
+    parser.add_argument(
+        '--seed_start',
+        default=0,
+        type=int,
+        help='the first seed; seeds are consecutive integers',
+    )
+    parser.add_argument(
+        '--policy',
+        default='heuristic',
+        choices=list(policies),
+        help='the policy that plays every player',
+    )
+    parser.add_argument(
+        '--turn_max',
+        default=None,
+        type=int,
+        help='the number of turns after which unfinished games are stopped',
+    )
+    parser.add_argument(
+        '--processes',
+        default=os.cpu_count(),
+        type=int,
+        help='the number of worker processes or threads',
+    )
+    parser.add_argument(
+        '--threads',
+        action='store_true',
+        help='play games in worker threads instead of processes, e.g. on free-threaded builds',
+    )
+    parser.add_argument(
+        '--output',
+        default='sweep.csv',
+        help='the path of the summary table; use "-" for standard output',
+    )
+
+    args = parser.parse_args(args)
+    if args.map is None:
+        args.map = [constants.default_map]
+    if args.infection_seq is None:
+        args.infection_seq = [constants.infection_seq]
+    if args.seeds < 1:
+        parser.error('argument --seeds must be positive')
+    if args.processes < 1:
+        parser.error('argument --processes must be positive')
+
+    return args
+
+
+def get_cells(args):
+    keys = grid_keys + list_keys
+    grids = [getattr(args, key) for key in keys]
+    cells = [dict(zip(keys, values)) for values in product(*grids)]
+    for cell in cells:
+        simulate.get_args(cell)  # Validate settings so bad cells exit before any games are played
+    return cells
+
+
+def run_task(task):
+    idx, cell, seed, policy, turn_max = task
+    return idx, simulate.simulate(cell, seed, policy, turn_max)
+
+
+def summarize(cell, results, z=1.96):
+    n = len(results)
+    wins = sum(result.win for result in results)
+    p = wins / n
+
+    # Wilson score interval
+    center = (p + z**2 / (2 * n)) / (1 + z**2 / n)
+    margin = z * sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / (1 + z**2 / n)
+
+    reasons = Counter(result.reason for result in results if not result.win)
+    row = {
+        **cell,
+        'games': n,
+        'wins': wins,
+        'win_rate': p,
+        'ci_lower': max(0.0, center - margin),
+        'ci_upper': min(1.0, center + margin),
+        'mean_turns': sum(result.turns for result in results) / n,
+    }
+    for reason in loss_reasons:
+        row[f'loss_{reason}'] = reasons[reason]
+
+    return row
+
+
+def sweep(cells, seeds, policy='heuristic', turn_max=None, processes=None, threads=False):
+    """Play every cell once per seed across workers and return one summary row per cell.
+
+    Workers are processes unless threads is True.
+    """
+    policy = policies[policy]
+    tasks = [
+        (idx, cell, seed, policy, turn_max) for idx, cell in enumerate(cells) for seed in seeds
+    ]
+    results = [[] for _ in cells]
+    chunksize = max(1, len(tasks) // (4 * (processes or os.cpu_count() or 1)))
+    executor_class = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    with executor_class(max_workers=processes) as executor:
+        for idx, result in executor.map(run_task, tasks, chunksize=chunksize):
+            results[idx].append(result)
+
+    return [summarize(cell, cell_results) for cell, cell_results in zip(cells, results)]
+
+
+def write_rows(rows, file):
+    writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[2:] if argv is None else argv)
+    cells = get_cells(args)
+    seeds = range(args.seed_start, args.seed_start + args.seeds)
+
+    rows = sweep(cells, seeds, args.policy, args.turn_max, args.processes, args.threads)
+
+    if args.output == '-':
+        write_rows(rows, sys.stdout)
+    else:
+        with open(args.output, 'w', newline='') as file:
+            write_rows(rows, file)
+        print(f'Wrote {len(rows)} cell(s) of {len(seeds)} game(s) each to {args.output}.')
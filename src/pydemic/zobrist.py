@@ -0,0 +1,88 @@
+"""Zobrist keys for hashing game states.
+
+Each feature of a state, e.g. the number of cubes of a color in a city, is mapped to a 64-bit key,
+and a state hashes to the XOR of the keys of its features. Pieces update their hashes as they
+change, so GameState.hash is never recomputed by walking the board.
+
+Keys are derived from a digest of the feature rather than the builtin hash, so they are the same in
+every process. Decks contribute the contents of their discard piles and the sizes of their piles
+since the order of the draw piles is hidden from players. The infection deck also contributes its
+strata, i.e. what players know of the order of its draw pile after intensifies and forecasts. The
+turn contributes the phase through the actions, draws, and infections that remain.
+"""
+
+from functools import cache
+from hashlib import blake2b
+
+
+@cache
+def key(*feature):
+    digest = blake2b(repr(feature).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def cube_key(city_name, color, n):
+    return key('cubes', city_name, color, n) if n > 0 else 0
+
+
+def rehash(state):
+    """Reset the incremental hashes of the pieces of a state that was modified directly."""
+    state.board_hash = 0
+    for city in state.cities.values():
+        for color, n in city.cubes.items():
+            state.board_hash ^= cube_key(city.name, color, n)
+        if city.station:
+            state.board_hash ^= key('station', city.name)
+    track = state.disease_track
+    track.hash = 0
+    for color, status in track.statuses.items():
+        track.hash ^= key('status', color, status.name)
+    for player in state.players.values():
+        player._hash = 0
+        if player.city is not None:
+            player._hash ^= key('city', player.name, player.city.name)
+        for card_name in player.hand:
+            player._hash ^= key('hand', player.name, card_name)
+    for deck in [state.player_deck, state.infection_deck]:
+        deck.discard_hash = 0
+        for card in deck.discard_pile:
+            deck.discard_hash ^= deck.card_key(card)
+    state.infection_deck.rehash_strata()
+
+
+def compute_hash(state):
+    """Return the hash of a state computed from scratch.
+
+    This is slow and only intended to check the incremental hashes.
+    """
+    h = 0
+    for city in state.cities.values():
+        for color, n in city.cubes.items():
+            h ^= cube_key(city.name, color, n)
+        if city.station:
+            h ^= key('station', city.name)
+    for color, status in state.disease_track.statuses.items():
+        h ^= key('status', color, status.name)
+    for player in state.players.values():
+        if player.city is not None:
+            h ^= key('city', player.name, player.city.name)
+        for card_name in player.hand:
+            h ^= key('hand', player.name, card_name)
+        if getattr(player, 'contingency_slot', None) is not None:
+            h ^= key('contingency', player.name, player.contingency_slot.name)
+        if getattr(player, 'shuttle_action', False):
+            h ^= key('shuttle_action', player.name)
+    for deck in [state.player_deck, state.infection_deck]:
+        label = type(deck).__name__
+        for card in deck.discard_pile:
+            h ^= key(label, 'discard', card.name)
+        h ^= key(label, 'draw_size', len(deck.draw_pile))
+        h ^= key(label, 'discard_size', len(deck.discard_pile))
+    for i, stratum in enumerate(state.infection_deck.strata):
+        for card_name in stratum:
+            h ^= key('InfectionDeck', 'stratum', i, card_name)
+    h ^= key('outbreaks', state.outbreak_track.count)
+    h ^= key('infection', state.infection_track.position)
+    turn = state.turn_count % len(state.players)
+    h ^= key('turn', turn, state.current_player.action_count, state.draw_count, state.infect_count)
+    return h
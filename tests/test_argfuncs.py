@@ -131,3 +131,9 @@ def test_infection_seq_nonnumeric():
     args = parse_args(args)
     with pytest.raises(SystemExit):
         check_args(args)
+
+
+def test_help_lists_sweep(capsys):
+    with pytest.raises(SystemExit):
+        parse_args(['--help'])
+    assert 'pydemic sweep [OPTIONS]' in capsys.readouterr().out
@@ -0,0 +1,141 @@
+"""Tests for autosave."""
+
+import time
+
+import pytest
+
+import pydemic.argfuncs as argfuncs
+import pydemic.autosave as autosave
+import pydemic.constants as constants
+import pydemic.main as main
+import pydemic.saves as saves
+import pydemic.simulate as simulate
+
+
+def test_checkpoint(tmp_path):
+    path = tmp_path / 'game.autosave'
+    state = simulate.new_game({'player_num': 2}, 0)
+    autosaver = autosave.Autosaver(path, interval=0)
+    assert not autosaver.written
+    autosaver.checkpoint(state)
+    autosaver.close()
+    assert autosaver.written
+    loaded, phase = saves.load(path)
+    assert loaded.hash == state.hash
+    assert phase == 'action'
+    assert not (tmp_path / 'game.autosave.tmp').exists()
+
+
+def test_batched_writes(tmp_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr(autosave, 'write_atomic', lambda path, data: writes.append(data))
+    state = simulate.new_game({'player_num': 2}, 0)
+    autosaver = autosave.Autosaver(tmp_path / 'game.autosave', interval=60)
+    for _ in range(20):
+        autosaver.checkpoint(state)
+    state.turn_count += 1
+    autosaver.checkpoint(state)
+    autosaver.close()
+    assert 1 <= len(writes) <= 2  # The first checkpoint and the latest one
+    assert saves.loads(writes[-1])[0].turn_count == 1
+
+
+def fail_writes(monkeypatch, count):
+    """Make the first count writes fail, and return the list of attempted writes."""
+    writes = []
+
+    def write_atomic(path, data):
+        writes.append(data)
+        if len(writes) <= count:
+            raise OSError('No space left on device')
+
+    monkeypatch.setattr(autosave, 'write_atomic', write_atomic)
+    return writes
+
+
+def test_write_error_checkpoint(tmp_path, monkeypatch):
+    writes = fail_writes(monkeypatch, 1)
+    state = simulate.new_game({'player_num': 2}, 0)
+    autosaver = autosave.Autosaver(tmp_path / 'game.autosave', interval=0)
+    autosaver.checkpoint(state)
+    deadline = time.monotonic() + 5
+    while autosaver.error is None and time.monotonic() < deadline:
+        time.sleep(0.001)
+    with pytest.raises(OSError):
+        autosaver.checkpoint(state)  # Queued before raising, so the writer retries
+    autosaver.close()
+    assert len(writes) == 2
+    assert autosaver.written
+
+
+def test_write_error_close(tmp_path, monkeypatch):
+    fail_writes(monkeypatch, 1)
+    state = simulate.new_game({'player_num': 2}, 0)
+    autosaver = autosave.Autosaver(tmp_path / 'game.autosave', interval=0)
+    autosaver.checkpoint(state)
+    with pytest.raises(OSError):
+        autosaver.close()
+    assert not autosaver.written
+    autosaver.close()  # Errors are only raised once
+
+
+def test_command_checkpoint(tmp_path, monkeypatch):
+    path = tmp_path / 'game.autosave'
+    state = simulate.new_game({'player_num': 2}, 0)
+    state.draw_count, state.infect_count = 2, 2
+    autosaver = autosave.Autosaver(path, interval=0)
+    autosaver.attach(state)
+    neighbor = next(iter(state.current_player.city.neighbors))
+    monkeypatch.setattr('builtins.input', lambda prompt: f'ground {neighbor}')
+    main.interface(state, state.current_player.actions, '')
+    autosaver.close()
+    loaded, phase = saves.load(path)
+    assert loaded.current_player.city.name == neighbor
+    assert loaded.current_player.action_count == 3
+    assert phase == 'action'
+
+
+def test_discard(tmp_path):
+    path = tmp_path / 'game.autosave'
+    state = simulate.new_game({'player_num': 2}, 0)
+    autosaver = autosave.Autosaver(path, interval=0)
+    autosaver.checkpoint(state)
+    autosaver.discard()
+    assert not path.exists()
+
+
+def interrupt_game(tmp_path, monkeypatch, capsys, load_path):
+    state = simulate.new_game({'player_num': 2}, 0)
+    saves.save(state, load_path)
+    args = argfuncs.parse_args(
+        ['--load', str(load_path), '--autosave', str(tmp_path / 'game.autosave')],
+        constants.player_min_word,
+        constants.player_max_word,
+        constants.epidemic_min_word,
+        constants.epidemic_max_word,
+        constants.default_map,
+        constants.start_city,
+        constants.outbreak_max,
+        constants.infection_seq,
+        constants.cube_num,
+        constants.station_num,
+    )
+
+    def game_loop(state, phase):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(main, 'game_loop', game_loop)
+    with pytest.raises(SystemExit):
+        main.main(args)
+    return capsys.readouterr().out
+
+
+def test_interrupt_without_checkpoint(tmp_path, monkeypatch, capsys):
+    out = interrupt_game(tmp_path, monkeypatch, capsys, tmp_path / 'game.sav')
+    assert 'The game was saved' not in out
+    assert not (tmp_path / 'game.autosave').exists()
+
+
+def test_interrupt_resumed_game(tmp_path, monkeypatch, capsys):
+    out = interrupt_game(tmp_path, monkeypatch, capsys, tmp_path / 'game.autosave')
+    assert 'The game was saved' in out
@@ -0,0 +1,106 @@
+"""Tests for binlog."""
+
+import pytest
+
+import pydemic.binlog as binlog
+import pydemic.bots as bots
+import pydemic.replay as replay
+import pydemic.simulate as simulate
+
+from .utils import default_init
+
+
+def log_game(path, seed, turn_max=10):
+    state = simulate.new_game({'player_num': 2}, seed)
+    recorder = replay.RecordingPolicy(bots.HeuristicPolicy(state))
+    with binlog.LogWriter(path, state) as writer:
+        simulate.play_game(state, binlog.LoggingPolicy(recorder, writer), turn_max=turn_max)
+    return [choice for choice in recorder.choices if choice is not None]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'game.log'
+    choices = log_game(path, 0)
+    with binlog.LogReader(path) as reader:
+        assert len(reader) == len(choices)
+        for i, choice in enumerate(choices):
+            turn, phase, actor, kind, name, args = reader.decode(i)
+            if kind == 'action':
+                assert (name, *args) == choice
+            elif kind == 'event':
+                assert (actor, name, *args) == choice
+            else:
+                assert phase == 'discard' and args == (choice,)
+        turns = reader.column('turn').tolist()
+        assert turns == sorted(turns)
+        assert reader[-1] == reader[len(reader) - 1]
+        assert len(reader[0]) == binlog.width
+
+
+def test_append(tmp_path):
+    path = tmp_path / 'game.log'
+    n = len(log_game(path, 0, turn_max=3))
+    m = len(log_game(path, 1, turn_max=3))
+    with binlog.LogReader(path) as reader:
+        assert len(reader) == n + m
+        assert reader[n][0] == 0  # Second game starts at turn 0
+    assert path.stat().st_size == 4 * binlog.width * (n + m + 1)
+
+
+def test_append_mismatch(tmp_path):
+    path = tmp_path / 'game.log'
+    log_game(path, 0, turn_max=1)
+    size = path.stat().st_size
+    state = simulate.new_game({'player_num': 3}, 0)
+    with pytest.raises(ValueError):
+        binlog.LogWriter(path, state)
+    assert path.stat().st_size == size
+
+
+def test_namespaces(tmp_path):
+    assert set(binlog.arg_namespaces) == set(binlog.codes)
+    path = tmp_path / 'game.log'
+    state = default_init(player_names='atlanta,forecast')  # Named after a city and an event
+    decisions = [
+        ('action', 'atlanta', 'action', 'share', ('forecast', 'atlanta')),
+        ('action', 'forecast', 'action', 'ground', ('chicago', 'atlanta')),
+        ('action', 'forecast', 'action', 'station', (None,)),
+        ('infect', 'atlanta', 'event', 'airlift', ('forecast', 'atlanta')),
+        ('infect', 'forecast', 'event', 'forecast', (2, 0, 1)),
+        ('discard', 'atlanta', 'discard', None, ('forecast',)),
+    ]
+    with binlog.LogWriter(path, state) as writer:
+        for phase, actor, kind, name, args in decisions:
+            writer.write(state, phase, actor, kind, name, args)
+    with binlog.LogReader(path) as reader:
+        assert [reader.decode(i)[1:] for i in range(len(reader))] == decisions
+
+
+def test_hash_column(tmp_path):
+    path = tmp_path / 'game.log'
+    state = simulate.new_game({'player_num': 2}, 0)
+    with binlog.LogWriter(path, state) as writer:
+        writer.write(state, 'action', 'P1', 'action', 'pass')
+    with binlog.LogReader(path) as reader:
+        lo, hi = reader[0][-2:]
+        assert (lo & 0xFFFFFFFF) | (hi & 0xFFFFFFFF) << 32 == state.hash
+        assert reader.decode(0) == (0, 'action', 'P1', 'action', 'pass', ())
+
+
+def test_rng_column(tmp_path):
+    path = tmp_path / 'game.log'
+    log_game(path, 0, turn_max=20)
+    start = simulate.new_game({'player_num': 2}, 0).rng.position
+    with binlog.LogReader(path) as reader:
+        positions = reader.column('rng').tolist()
+    assert positions[0] == start > 0
+    assert positions == sorted(positions)
+    assert positions[-1] > positions[0]  # Epidemics shuffle the infection discard pile
+
+
+def test_bad_header(tmp_path):
+    path = tmp_path / 'game.log'
+    path.write_bytes(bytes(4 * binlog.width))
+    (tmp_path / 'game.log.json').write_text('{"symbols": [], "codes": [], "phases": []}')
+    with pytest.raises(ValueError):
+        binlog.LogReader(path)
@@ -0,0 +1,185 @@
+"""Tests for bots."""
+
+import pytest
+
+import pydemic.bots as bots
+import pydemic.cards as cards
+import pydemic.roles as roles
+import pydemic.simulate as simulate
+
+from .utils import default_init
+
+
+def setup_bot(state, player_name='A'):
+    policy = bots.HeuristicPolicy(state)
+    player = state.players[player_name]
+    player.set_city(state, state.cities['atlanta'])
+    return policy, player
+
+
+def give_cards(state, player, color, n):
+    names = [card.name for card in state.player_deck.draw_pile if card.color == color][:n]
+    for name in names:
+        player.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, name))
+    return names
+
+
+# Index tests
+def test_distances():
+    state = default_init()
+    index = bots.BoardIndex(state)
+    assert index.distances['atlanta']['atlanta'] == 0
+    assert index.distances['atlanta']['washington'] == 1
+    assert index.distances['atlanta']['london'] == 3
+    assert index.distances['london']['atlanta'] == 3
+
+
+def test_station_distance():
+    state = default_init()
+    index = bots.BoardIndex(state)
+    state.cities['london'].add_station(state)
+    stations = index.stations(state)
+    assert index.station_distance('new_york', stations) == 1
+    assert index.station_distance('atlanta', []) is None
+
+
+# Decision tests
+@pytest.mark.parametrize('role', [roles.Player, 'scientist'])
+def test_choose_cure(role):
+    state = default_init(role_map={'A': role})
+    policy, player = setup_bot(state)
+    state.cities['atlanta'].add_station(state)
+    names = give_cards(state, player, 'yellow', player.cure_num)
+    action = policy.choose_action(state, player)
+    assert action == ('cure', 'yellow', *names)
+
+
+def test_choose_cure_move_to_station():
+    state = default_init()
+    policy, player = setup_bot(state)
+    state.cities['washington'].add_station(state)
+    give_cards(state, player, 'yellow', player.cure_num)
+    action = policy.choose_action(state, player)
+    assert action == ('ground', 'washington')
+
+
+def test_choose_treat():
+    state = default_init()
+    policy, player = setup_bot(state)
+    state.cities['atlanta'].add_disease(state, 'blue', 2, verbose=False)
+    state.cities['atlanta'].add_disease(state, 'red', 1, verbose=False)
+    action = policy.choose_action(state, player)
+    assert action == ('treat', 'blue')
+
+
+def test_choose_move_toward_risk():
+    state = default_init()
+    policy, player = setup_bot(state)
+    state.cities['montreal'].add_disease(state, 'blue', 3, verbose=False)
+    action = policy.choose_action(state, player)
+    assert action in [('ground', 'chicago'), ('ground', 'washington')]
+
+
+def test_step_toward_charter_nearest():
+    state = default_init()
+    policy, player = setup_bot(state)
+    player.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, 'atlanta'))
+    bot = policy.bots['A']
+    action = bot.step_toward(state, player, ['bangkok', 'london'], bot.counts(player), [])
+    assert action == ('charter', 'london')
+
+
+def test_choose_share_give():
+    state = default_init()
+    policy, player_1 = setup_bot(state)
+    player_2 = state.players['B']
+    player_2.set_city(state, player_1.city)
+    player_1.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, 'atlanta'))
+    give_cards(state, player_2, 'blue', 3)
+    action = policy.choose_action(state, player_1)
+    assert action == ('share', 'B', 'atlanta')
+
+
+def test_choose_discard():
+    state = default_init()
+    policy, player = setup_bot(state)
+    give_cards(state, player, 'blue', 3)
+    give_cards(state, player, 'red', 1)
+    player.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, 'airlift'))
+    card_name = policy.choose_discard(state, player)
+    assert player.hand[card_name].color == 'red'
+
+
+# Role tests
+def test_dispatcher_airlift():
+    state = default_init(role_map={'A': 'dispatcher'})
+    policy, player_1 = setup_bot(state)
+    player_2 = state.players['B']
+    player_3 = state.players['C']
+    player_2.set_city(state, state.cities['london'])
+    player_3.set_city(state, state.cities['tokyo'])
+    state.players['D'].set_city(state, state.cities['london'])
+    state.cities['tokyo'].add_station(state)
+    give_cards(state, player_2, 'yellow', player_2.cure_num)
+    action = policy.choose_action(state, player_1)
+    assert action == ('airlift', 'B', 'C')
+
+
+def test_medic_treat_value():
+    state = default_init(role_map={'A': 'medic'})
+    policy, player = setup_bot(state)
+    state.cities['atlanta'].add_disease(state, 'blue', 1, verbose=False)
+    state.cities['atlanta'].add_disease(state, 'red', 2, verbose=False)
+    assert policy.choose_action(state, player) == ('treat', 'red')
+
+
+def test_operations_expert_station():
+    state = default_init(role_map={'A': 'operations_expert'})
+    policy, player = setup_bot(state)
+    assert policy.choose_action(state, player) == ('station', None)
+
+
+def test_operations_expert_shuttle():
+    state = default_init(role_map={'A': 'operations_expert'})
+    policy, player = setup_bot(state)
+    state.cities['atlanta'].add_station(state)
+    state.cities['tokyo'].add_disease(state, 'red', 3, verbose=False)
+    names = give_cards(state, player, 'black', 1)
+    action = policy.choose_action(state, player)
+    assert action == ('opex_shuttle', 'tokyo', names[0])
+
+
+def test_researcher_share_any():
+    state = default_init(role_map={'A': 'researcher'})
+    policy, player_1 = setup_bot(state)
+    player_2 = state.players['B']
+    player_2.set_city(state, player_1.city)
+    names = give_cards(state, player_1, 'red', 1)
+    give_cards(state, player_2, 'red', 3)
+    action = policy.choose_action(state, player_1)
+    assert action == ('share', 'B', names[0])
+
+
+def test_scientist_hoards():
+    state = default_init(role_map={'A': 'scientist', 'B': roles.Player})
+    policy = bots.HeuristicPolicy(state)
+    player_1 = state.players['A']
+    player_2 = state.players['B']
+    names_1 = give_cards(state, player_1, 'red', 2)
+    names_2 = give_cards(state, player_2, 'red', 2)
+    assert not policy.bots['A'].is_spendable(state, player_1, names_1[0], {'red': 2})
+    assert policy.bots['B'].is_spendable(state, player_2, names_2[0], {'red': 2})
+
+
+# Game tests
+@pytest.mark.parametrize('seed', range(10))
+def test_heuristic_game(seed, capsys):
+    state = simulate.new_game({'player_num': seed % 3 + 2}, seed)
+    result = simulate.play_game(state, bots.HeuristicPolicy(state))
+    assert result.win or result.reason in ['outbreaks', 'cubes', 'cards']
+    assert capsys.readouterr().out == ''
+
+    # Cubes are conserved between the board and the disease track
+    for color in state.disease_track.colors:
+        board_cubes = sum(city.cubes[color] for city in state.cities.values())
+        assert board_cubes + state.disease_track.cubes[color] == state.disease_track.cube_num
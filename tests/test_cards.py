@@ -1,12 +1,46 @@
 """Tests for cards."""
 
+import pickle
+
 import pytest
 
 import pydemic.cards as cards
+import pydemic.codec as codec
 import pydemic.exceptions as exceptions
 from .utils import default_init
 
 
+# Card tests
+def test_cards_shared():
+    state_1 = default_init()
+    state_2 = default_init()
+    cards_1 = {(card.type, card.name): card for card in codec.get_cards(state_1)}
+    cards_2 = {(card.type, card.name): card for card in codec.get_cards(state_2)}
+    assert cards_1.keys() == cards_2.keys()
+    for key, card in cards_1.items():
+        assert card is cards_2[key]
+    copy = state_1.copy()
+    assert all(card is cards_1[(card.type, card.name)] for card in codec.get_cards(copy))
+
+
+def test_card_immutable():
+    card = cards.event_cards[0]
+    with pytest.raises(AttributeError):
+        card.name = 'airlift'
+    with pytest.raises(AttributeError):
+        card.population = 0
+
+
+def test_card_pickle():
+    state = default_init()
+    for card in codec.get_cards(state):
+        assert pickle.loads(pickle.dumps(card)) is card
+    card = state.infection_deck.draw_pile[-1]
+    copy = cards.Card(card.type, card.name, card.color)  # Unshared cards load as shared ones
+    assert copy is not card
+    assert pickle.loads(pickle.dumps(copy)) is card
+
+
 # Deck tests
 def test_infection_deck_draw_simple():
     state = default_init()
@@ -53,6 +87,78 @@ def test_infection_deck_remove_twice():
     assert draw_cards[1] not in state.infection_deck.discard_pile
 
 
+def test_infection_deck_strata():
+    state = default_init()
+    deck = state.infection_deck
+    for _ in range(5):
+        deck.draw(state)
+    drawn = set(card.name for card in deck.discard_pile)
+    deck.intensify(state.rng)
+    assert deck.strata[-1] == drawn
+    assert sum(len(stratum) for stratum in deck.strata) == len(deck.draw_pile)
+    for name in drawn:
+        assert deck.draw_probability(name, 1) == pytest.approx(1 / 5)
+        assert deck.draw_probability(name, 5) == 1
+    bottom = deck.draw_pile[0].name
+    assert deck.draw_probability(bottom, 5) == 0
+    assert deck.draw_probability(bottom, 7) == pytest.approx(2 / (len(deck.draw_pile) - 5))
+
+
+@pytest.mark.parametrize('k', [1, 3, 9])
+def test_infection_deck_draw_probabilities(k):
+    state = default_init()
+    deck = state.infection_deck
+    for _ in range(4):
+        deck.draw(state)
+    deck.intensify(state.rng)
+    for _ in range(2):
+        deck.draw(state)
+    probabilities = deck.draw_probabilities(k)
+    assert set(probabilities) == set(card.name for card in deck.draw_pile)
+    assert sum(probabilities.values()) == pytest.approx(k)  # Expected number of cards drawn
+    for name, p in probabilities.items():
+        assert deck.draw_probability(name, k) == p
+
+
+def test_infection_deck_set_top():
+    state = default_init()
+    deck = state.infection_deck
+    top = deck.draw_pile[-3:][::-1]
+    deck.set_top(top)
+    assert deck.draw_pile[-3:] == top
+    assert deck.draw_probability(top[-1].name, 1) == 1
+    assert deck.draw_probability(top[0].name, 2) == 0
+    assert deck.draw_probability(top[0].name, 3) == 1
+
+
+def test_player_deck_subdecks():
+    state = default_init(epidemic_num='4')
+    deck = state.player_deck
+    deck.add_epidemics(4, state.rng)
+    assert sum(n for n, _ in deck.subdecks) == len(deck.draw_pile)
+    n, e = deck.subdecks[-1]
+    assert e == 1
+    assert deck.epidemic_probability(1) == pytest.approx(1 / n)
+    assert deck.epidemic_probability(2) == pytest.approx(2 / n)
+
+    # Draw through the top subdeck
+    cards_drawn = [deck.draw() for _ in range(n)]
+    assert sum(card.type == 'epidemic' for card in cards_drawn) == 1
+    assert len(deck.subdecks) == 3
+
+
+def test_player_deck_epidemic_probability_boundary():
+    state = default_init()
+    deck = state.player_deck
+    deck.add_epidemics(4, state.rng)
+    while deck.subdecks[-1][0] > 1:
+        deck.draw()
+    n_next = deck.subdecks[-2][0]
+    p = deck.subdecks[-1][1]  # Last card of the subdeck is an epidemic iff one remains
+    assert deck.epidemic_probability(1) == p
+    assert deck.epidemic_probability(2) == pytest.approx(p + (1 - p) / n_next)
+
+
 def test_player_deck_draw_simple():
     state = default_init()
     top_card = state.player_deck.draw_pile[-1]
@@ -125,6 +231,7 @@ def test_government_grant():
     cards.input = lambda x: city.name
     cards.government_grant(state)
     assert city.station
+    assert city.name in state.stations
 
 
 def test_one_quiet_night():
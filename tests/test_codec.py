@@ -0,0 +1,95 @@
+"""Tests for codec."""
+
+import pydemic.bots as bots
+import pydemic.codec as codec
+import pydemic.simulate as simulate
+import pydemic.zobrist as zobrist
+
+from .utils import default_init
+
+
+def play(state, turns):
+    policy = bots.HeuristicPolicy(state)
+    for _ in range(turns):
+        simulate.play_turn(state, policy)
+    return state
+
+
+def test_round_trip():
+    state = play(simulate.new_game({}, seed=0), 6)
+    for name in ['tokyo', 'london']:
+        if not state.cities[name].station:
+            state.cities[name].add_station(state)
+    layout = codec.Layout(state)
+    values = layout.encode(state)
+    assert len(values) <= layout.width
+    decoded = layout.decode(values)
+    assert layout.encode(decoded) == values
+    assert decoded.hash == state.hash == zobrist.compute_hash(decoded)
+    assert decoded.infection_deck.strata == state.infection_deck.strata
+    assert decoded.player_deck.subdecks == state.player_deck.subdecks
+    assert list(decoded.stations) == list(state.stations)
+    for name, player in state.players.items():
+        assert decoded.players[name].city.name == player.city.name
+        assert list(decoded.players[name].hand) == list(player.hand)
+
+
+def test_decode_immunities():
+    state = default_init(role_map={'A': 'medic', 'B': 'quarantine_specialist'})
+    for player in state.players.values():
+        player.set_city(state, state.cities['atlanta'])
+    layout = codec.Layout(state)
+    later = state.copy()
+    later.players['A'].set_city(later, later.cities['london'])
+    simulate.cure(later, later.players['A'], 'blue')
+    decoded = layout.decode(layout.encode(later))
+    assert decoded.immunities == later.immunities
+    assert decoded.quarantined == later.quarantined
+    assert decoded.cities['london'].immunity(decoded, 'blue')
+    assert not decoded.cities['london'].immunity(decoded, 'red')
+
+
+def test_decode_later_state():
+    state = simulate.new_game({'player_num': 3}, seed=1)
+    layout = codec.Layout(state)
+    later = play(state.copy(), 5)
+    decoded = layout.decode(layout.encode(later))
+    assert decoded.turn_count == later.turn_count
+    assert decoded.player_order == later.player_order
+    assert decoded.hash == later.hash
+
+
+def test_decode_independent():
+    state = simulate.new_game({}, seed=0)
+    layout = codec.Layout(state)
+    values = layout.encode(state)
+    decoded_1, decoded_2 = layout.decode(values), layout.decode(values)
+    decoded_1.cities['atlanta'].add_disease(decoded_1, 'blue', 1, verbose=False)
+    decoded_1.infection_deck.draw_pile.pop()
+    assert decoded_2.hash == layout.template.hash == state.hash
+    assert len(decoded_2.infection_deck.draw_pile) == len(state.infection_deck.draw_pile)
+    assert decoded_2.cities['atlanta'].site is state.cities['atlanta'].site  # Map is shared
+
+
+def test_decode_in_place():
+    state = simulate.new_game({}, seed=0)
+    layout = codec.Layout(state)
+    scratch = play(state.copy(), 4)
+    decoded = layout.decode(layout.encode(state), scratch)
+    assert decoded is scratch
+    assert decoded.hash == state.hash
+    for city in decoded.cities.values():
+        assert city.cubes == state.cities[city.name].cubes
+
+
+def test_role_state():
+    state = default_init(role_map={'A': 'contingency_planner', 'B': 'operations_expert'})
+    state.players['A'].set_city(state, state.cities['atlanta'])
+    state.players['B'].set_city(state, state.cities['atlanta'])
+    event = next(card for card in state.player_deck.draw_pile if card.type == 'event')
+    state.players['A'].contingency_slot = event
+    state.players['B'].shuttle_action = False
+    layout = codec.Layout(state)
+    decoded = layout.decode(layout.encode(state))
+    assert decoded.players['A'].contingency_slot is event
+    assert not decoded.players['B'].shuttle_action
@@ -0,0 +1,62 @@
+"""Tests for determinize."""
+
+import random
+
+import pydemic.determinize as determinize
+import pydemic.simulate as simulate
+
+
+def names(cards):
+    return [card.name for card in cards]
+
+
+def test_get_segments():
+    pile = list(range(10))
+    assert determinize.get_segments(pile, [3, 4]) == [[0, 1, 2], [3, 4, 5], [6, 7, 8, 9]]
+    assert determinize.get_segments(pile, [10]) == [pile]
+
+
+def test_sample_consistent():
+    state = simulate.new_game({}, seed=0)
+    for _ in range(3):
+        state.infection_deck.draw(state, verbose=False)
+    state.infection_deck.intensify(state.rng)
+    sampler = determinize.Sampler(state)
+    sample = sampler.sample(state, random.Random(0))
+
+    # Strata and subdecks keep their cards
+    for deck_1, deck_2 in [
+        (state.infection_deck, sample.infection_deck),
+        (state.player_deck, sample.player_deck),
+    ]:
+        assert names(deck_1.discard_pile) == names(deck_2.discard_pile)
+        assert sorted(names(deck_1.draw_pile)) == sorted(names(deck_2.draw_pile))
+    stop = len(sample.infection_deck.draw_pile)
+    for stratum in reversed(state.infection_deck.strata):
+        assert set(names(sample.infection_deck.draw_pile[stop - len(stratum) : stop])) == stratum
+        stop -= len(stratum)
+    stop = len(sample.player_deck.draw_pile)
+    for n, e in reversed(state.player_deck.subdecks):
+        subdeck = sample.player_deck.draw_pile[stop - n : stop]
+        assert sum(card.type == 'epidemic' for card in subdeck) == e
+        stop -= n
+
+    # Hidden orders differ
+    assert names(state.player_deck.draw_pile) != names(sample.player_deck.draw_pile)
+
+
+def test_sample_known_order():
+    state = simulate.new_game({}, seed=0)
+    top = state.infection_deck.draw_pile[-6:]
+    state.infection_deck.set_top(top)
+    sampler = determinize.Sampler(state)
+    for seed in range(5):
+        sample = sampler.sample(state, random.Random(seed))
+        assert sample.infection_deck.draw_pile[-6:] == top
+
+
+def test_sample_leaves_state():
+    state = simulate.new_game({}, seed=0)
+    pile = list(state.player_deck.draw_pile)
+    determinize.Sampler(state).sample(state, random.Random(0))
+    assert state.player_deck.draw_pile == pile
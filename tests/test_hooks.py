@@ -0,0 +1,45 @@
+"""Tests for hooks."""
+
+import pydemic.hooks as hooks
+import pydemic.simulate as simulate
+
+from .utils import default_init
+
+
+def test_emit_calls_subscribers_in_order():
+    bus = hooks.Hooks()
+    calls = []
+    bus.subscribe('event', lambda state, *args: calls.append((1, state, args)))
+    bus.subscribe('event', lambda state, *args: calls.append((2, state, args)))
+    bus.emit('event', None, 'a', 'b')
+    bus.emit('other', None)
+    assert calls == [(1, None, ('a', 'b')), (2, None, ('a', 'b'))]
+
+
+def test_pawn_moved_keyed_by_pawn():
+    state = default_init()
+    calls = []
+    state.hooks.subscribe(('pawn_moved', 'A'), lambda state, *args: calls.append(args))
+    player_a, player_b = state.players['A'], state.players['B']
+    player_b.set_city(state, state.cities['atlanta'])
+    player_a.set_city(state, state.cities['atlanta'])
+    player_a.set_city(state, state.cities['chicago'])
+    assert calls == [(player_a, None), (player_a, state.cities['atlanta'])]
+
+
+def test_disease_cured_action():
+    state = default_init()
+    player = state.players['A']
+    player.set_city(state, state.cities['atlanta'])
+    calls = []
+    state.hooks.subscribe('disease_cured', lambda state, color: calls.append(color))
+    simulate.cure(state, player, 'blue')
+    assert calls == ['blue']
+
+
+def test_copy_rebinds_callbacks():
+    state = default_init(role_map={'A': 'quarantine_specialist'})
+    copy = state.copy()
+    copy.players['A'].set_city(copy, copy.cities['atlanta'])
+    assert copy.cities['chicago'].immunity(copy, 'blue')
+    assert not state.cities['chicago'].immunity(state, 'blue')
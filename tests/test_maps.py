@@ -0,0 +1,46 @@
+"""Tests for maps."""
+
+import pickle
+
+import pydemic.maps as maps
+import pydemic.simulate as simulate
+
+
+def test_topology_shared():
+    state_1 = simulate.new_game({'player_num': 4}, 0)
+    state_2 = simulate.new_game({'player_num': 2}, 1)
+    topology = maps.get_topology('default')
+    assert state_1.topology is state_2.topology is topology
+    assert maps.get_topology(maps.maps['default']) is topology
+    for name, city in state_1.cities.items():
+        assert city.site is state_2.cities[name].site is topology.sites[name]
+        assert city.cubes is not state_2.cities[name].cubes
+    assert state_1.copy().topology is topology
+
+
+def test_topology_sites():
+    topology = maps.get_topology('default')
+    assert set(topology.sites) == set(maps.default)
+    assert set(topology.colors) == set(attrs.color for attrs in maps.default.values())
+    for name, site in topology.sites.items():
+        attrs = maps.default[name]
+        assert (site.color, site.population, list(site.neighbors)) == (
+            attrs.color,
+            attrs.population,
+            attrs.neighbors,
+        )
+
+
+def test_topology_pickle():
+    topology = maps.get_topology('default')
+    site = topology.sites['atlanta']
+    assert pickle.loads(pickle.dumps(topology)) is topology
+    assert pickle.loads(pickle.dumps(site)) is site
+
+    # Maps outside the library are pickled by value
+    map = {name: maps.default[name] for name in maps.default}
+    custom = maps.get_topology(map)
+    assert custom is not topology and custom.name is None
+    loaded = pickle.loads(pickle.dumps(custom))
+    assert loaded.adjacency == topology.adjacency
+    assert loaded.sites['atlanta'].topology is loaded
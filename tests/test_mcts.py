@@ -0,0 +1,134 @@
+"""Tests for mcts."""
+
+import random
+
+import pytest
+
+import pydemic.bots as bots
+import pydemic.mcts as mcts
+import pydemic.simulate as simulate
+
+
+def test_choose_action_legal():
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    agent = mcts.Agent(time_limit=None, iteration_limit=20, seed=0)
+    action = agent.choose_action(state, player)
+    assert action in simulate.legal_actions(state, player)
+
+
+def test_choose_action_no_determinize():
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    agent = mcts.Agent(time_limit=None, iteration_limit=20, determinize=False, seed=0)
+    action = agent.choose_action(state, player)
+    assert action in simulate.legal_actions(state, player)
+
+
+def test_choose_winning_cure():
+    state = simulate.new_game({'player_num': 2}, seed=0)
+    player = state.current_player
+    player.set_city(state, state.cities['atlanta'])
+    for name in list(player.hand):
+        player.discard(state, name)
+    blue = [card for card in state.player_deck.draw_pile if card.color == 'blue']
+    for card in blue[: player.cure_num]:
+        state.player_deck.draw_pile.remove(card)
+        player.add_card(state, card)
+    for color in ['black', 'red', 'yellow']:
+        state.disease_track.set_cured(color)
+    agent = mcts.Agent(time_limit=None, iteration_limit=50, seed=0)
+    action = agent.choose_action(state, player)
+    assert action[:2] == ('cure', 'blue')  # Curing the last disease wins immediately
+
+
+def test_search_iteration_limit():
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    agent = mcts.Agent(time_limit=60, iteration_limit=25, seed=0)
+    agent.policy = bots.HeuristicPolicy(state)
+    root = agent.get_root(state, player)
+    assert agent.search(state, player, root) == 25
+    assert root.visits == 25
+
+
+def test_choose_action_preserves_random_state():
+    state = simulate.new_game({}, seed=0)
+    agent = mcts.Agent(time_limit=None, iteration_limit=10, seed=0)
+    random_state = random.getstate()
+    agent.choose_action(state, state.current_player)
+    assert random.getstate() == random_state
+
+
+def test_choose_action_no_missing_budget():
+    with pytest.raises(ValueError):
+        mcts.Agent(time_limit=None, iteration_limit=None)
+
+
+def test_subtree_reuse():
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    agent = mcts.Agent(time_limit=None, iteration_limit=50, seed=0)
+    action = agent.choose_action(state, player)
+    subtree = agent.root
+    visits = subtree.visits
+    simulate.apply_action(state, player, action)
+    agent.choose_action(state, player)
+    assert subtree.visits == visits + 50
+
+
+def test_subtree_discarded():
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    agent = mcts.Agent(time_limit=None, iteration_limit=50, seed=0)
+    action = agent.choose_action(state, player)
+    subtree = agent.root
+    other = next(other for other in simulate.legal_actions(state, player) if other != action)
+    simulate.apply_action(state, player, other)
+    visits = subtree.visits
+    root = agent.get_root(state, player)
+    assert root is not subtree
+    assert root.visits == 0
+    agent.choose_action(state, player)
+    assert agent.root is not subtree
+    assert root.visits == 50
+    assert subtree.visits == visits
+
+
+def test_root_parallel():
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    agent = mcts.Agent(time_limit=None, iteration_limit=20, processes=2, seed=0)
+    try:
+        action = agent.choose_action(state, player)
+        assert action in simulate.legal_actions(state, player)
+        executor = agent.executor
+        simulate.apply_action(state, player, action)
+        action = agent.choose_action(state, player)
+        assert action in simulate.legal_actions(state, player)
+        assert agent.executor is executor  # The pool is reused across decisions
+    finally:
+        agent.close()
+    assert agent.executor is None
+
+
+def test_root_parallel_no_fork(monkeypatch):
+    monkeypatch.setattr(mcts, 'get_all_start_methods', lambda: ['spawn'])
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    agent = mcts.Agent(time_limit=None, iteration_limit=20, processes=2, seed=0)
+    action = agent.choose_action(state, player)
+    assert action in simulate.legal_actions(state, player)
+    assert agent.executor is None
+
+
+def test_evaluate():
+    state = simulate.new_game({}, seed=0)
+    assert 0 < mcts.evaluate(state) < 1
+
+
+def test_mcts_policy():
+    state = simulate.new_game({}, seed=0)
+    policy = mcts.MCTSPolicy(state, time_limit=None, iteration_limit=5, seed=0)
+    result = simulate.play_game(state, policy, turn_max=2)
+    assert result.turns <= 2
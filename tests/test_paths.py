@@ -0,0 +1,194 @@
+"""Tests for paths."""
+
+import random
+
+import pytest
+
+import pydemic.cards as cards
+import pydemic.main as main
+import pydemic.paths as paths
+import pydemic.roles as roles
+import pydemic.simulate as simulate
+
+from .utils import default_init
+
+
+def test_find_path_ground():
+    state = default_init()
+    moves = paths.find_path(state, 'atlanta', 'atlanta')
+    assert moves == ()
+    moves = paths.find_path(state, 'atlanta', 'washington')
+    assert moves == (('ground', 'washington', None),)
+    moves = paths.find_path(state, 'atlanta', 'london')
+    assert len(moves) == 3
+    assert all(action == 'ground' for action, _, _ in moves)
+
+
+def test_find_path_shuttle():
+    state = default_init()
+    state.cities['atlanta'].add_station(state)
+    state.cities['tokyo'].add_station(state)
+    moves = paths.find_path(state, 'atlanta', 'osaka')
+    assert moves == (('shuttle', 'tokyo', None), ('ground', 'osaka', None))
+
+
+def test_find_path_cards():
+    state = default_init()
+    player = state.players['A']
+    for name in ['tokyo', 'atlanta']:
+        player.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, name))
+
+    # Ground moves only without a hand
+    assert len(paths.find_path(state, 'atlanta', 'osaka')) > 2
+
+    moves = paths.find_path(state, 'atlanta', 'osaka', player.hand)
+    assert len(moves) == 1
+    assert moves[0] == ('charter', 'osaka', 'atlanta')
+
+    # Prefer routes that spend fewer cards
+    moves = paths.find_path(state, 'atlanta', 'chicago', player.hand)
+    assert moves == (('ground', 'chicago', None),)
+
+
+def test_find_path_no_reuse():
+    state = default_init()
+    player = state.players['A']
+    player.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, 'tokyo'))
+    moves = paths.find_path(state, 'atlanta', 'johannesburg', player.hand)
+    assert len(moves) > 2  # Flying to tokyo and chartering with the same card takes two
+    spent = [card for _, _, card in moves if card is not None]
+    assert len(spent) == len(set(spent))
+
+
+def test_find_path_memoized():
+    state = default_init()
+    paths.shortest_path.cache_clear()
+    paths.find_path(state, 'atlanta', 'london')
+    paths.find_path(state, 'atlanta', 'london')
+    assert paths.shortest_path.cache_info().hits == 1
+
+
+def test_print_path(capsys):
+    state = default_init()
+    state.player_order = list(state.players)
+    main.print_path(state, 'atlanta', 'washington')
+    out = capsys.readouterr().out
+    assert '1 action(s)' in out
+    main.print_path(state, 'atlanta', 'nowhere')
+    assert capsys.readouterr().out.startswith('Action failed')
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_reachability_matches_path(seed):
+    state = default_init()
+    random.seed(seed)
+    state.cities['atlanta'].add_station(state)
+    if seed > 0:
+        state.cities[random.choice(['tokyo', 'lagos'])].add_station(state)
+    for player in state.players.values():
+        player.set_city(state, state.cities[random.choice(list(state.cities))])
+        for _ in range(3):
+            card = state.player_deck.draw_pile.pop()
+            if card.type == 'city':
+                player.add_card(state, card)
+    reach = paths.reachability(state, actions=4)
+    for player in state.players.values():
+        layers = reach[(player.name, player.name)]
+        for name in state.cities:
+            moves = paths.find_path(state, player.city.name, name, player.hand)
+            actions = len(moves)
+            if actions <= 4:
+                assert name in layers[actions]
+            else:
+                assert all(name not in layer for layer in layers)
+
+
+def test_reachability_special_roles():
+    state = default_init(role_map={'A': 'operations_expert', 'B': 'dispatcher', 'C': roles.Player})
+    state.cities['atlanta'].add_station(state)
+    for name, city_name in [('A', 'atlanta'), ('B', 'atlanta'), ('C', 'tokyo')]:
+        state.players[name].set_city(state, state.cities[city_name])
+    state.players['A'].add_card(state, cards.pop_by_name(state.player_deck.draw_pile, 'lima'))
+    reach = paths.reachability(state, actions=2)
+
+    # The operations expert flies anywhere from a station with any card
+    assert len(reach[('A', 'A')][1]) == len(state.cities) - 1
+
+    # The dispatcher moves other pawns to each other
+    assert 'atlanta' in reach[('B', 'C')][1]
+    assert 'tokyo' in reach[('B', 'A')][1]
+    assert ('A', 'C') not in reach
+
+
+def get_destination(state, mover, action):
+    """Return the pawn moved by a movement action and the name of its destination."""
+    name, *args = action
+    if name == 'airlift':
+        return args[0], state.players[args[1]].city.name
+    return (args[1] if len(args) > 1 else mover), args[0]
+
+
+def search_reach(state, mover, actions):
+    """Return the least actions for the mover to bring each pawn to each city by exhaustive search."""
+    moves = {'ground', 'direct', 'charter', 'shuttle', 'airlift'}
+    best = {(name, player.city.name): 0 for name, player in state.players.items()}
+    frontier = [state]
+    seen = set()
+    for k in range(1, actions + 1):
+        layer = []
+        for parent in frontier:
+            for action in simulate.legal_actions(parent, parent.players[mover]):
+                if action[0] not in moves:
+                    continue
+                best.setdefault(get_destination(parent, mover, action), k)
+                if k == actions:
+                    continue  # Only the destination of the last action is needed
+                child = parent.copy()
+                simulate.apply_action(child, child.players[mover], action)
+                key = (
+                    tuple(player.city.name for player in child.players.values()),
+                    frozenset(child.players[mover].hand),
+                )
+                if key not in seen:
+                    seen.add(key)
+                    layer.append(child)
+        frontier = layer
+    return best
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_reachability_dispatcher_search(seed):
+    state = default_init(
+        player_names='A,B,C', role_map={'A': roles.Player, 'B': 'dispatcher', 'C': roles.Player}
+    )
+    rng = random.Random(seed)
+    state.cities['atlanta'].add_station(state)
+    if seed % 2:
+        state.cities[rng.choice(['tokyo', 'lagos'])].add_station(state)
+    for player in state.players.values():
+        player.set_city(state, state.cities[rng.choice(list(state.cities))])
+    dispatcher = state.players['B']
+    names = rng.sample([name for name in state.cities if name != dispatcher.city.name], 3)
+    if seed < 2:
+        names[0] = dispatcher.city.name  # Charter other pawns
+    for name in names:
+        dispatcher.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, name))
+    dispatcher.action_count = 2
+
+    best = search_reach(state, 'B', 2)
+    reach = paths.reachability(state, actions=2)
+    for pawn in state.players:
+        for k, layer in enumerate(reach[('B', pawn)]):
+            assert sorted(layer) == sorted(
+                name for (other, name), cost in best.items() if other == pawn and cost == k
+            )
+
+
+def test_print_reach(capsys):
+    state = default_init()
+    for player in state.players.values():
+        player.set_city(state, state.cities['atlanta'])
+    main.print_reach(state, 'A')
+    out = capsys.readouterr().out
+    assert '1: ' in out
+    assert 'B' not in out
@@ -27,7 +27,7 @@ def test_add_disease_outbreak():
     track_cube_num = state.disease_track.cubes[color]
     city.add_disease(state, color, 1)
     assert city.cubes[color] == city.cube_max
-    for neighbor in city.neighbors.values():
+    for neighbor in [state.cities[name] for name in city.neighbors]:
         assert neighbor.cubes[color] == 1
     assert state.disease_track.cubes[color] == track_cube_num - len(city.neighbors)
     assert state.outbreak_track.count == 1
@@ -66,7 +66,7 @@ def test_add_disease_outbreak_max():
     with pytest.raises(exceptions.GameOverLose):
         city.add_disease(state, color, 1)
     assert city.cubes[color] == city.cube_max
-    for neighbor in city.neighbors.values():
+    for neighbor in [state.cities[name] for name in city.neighbors]:
         assert neighbor.cubes[color] == 0
     assert state.disease_track.cubes[color] == track_cube_num
     assert state.outbreak_track.count == state.outbreak_track.max
@@ -102,6 +102,7 @@ def test_add_station_to_city_without():
     city.add_station(state)
     assert city.station
     assert state.station_count == station_count - 1
+    assert list(state.stations) == [city.name]
 
 
 def test_add_station_to_city_with():
@@ -133,6 +134,7 @@ def test_remove_station_from_city_with():
     city.remove_station(state)
     assert not city.station
     assert state.station_count == station_count + 1
+    assert city.name not in state.stations
 
 
 def test_remove_station_from_city_without():
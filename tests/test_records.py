@@ -0,0 +1,97 @@
+"""Tests for records."""
+
+import pytest
+
+import pydemic.bots as bots
+import pydemic.exceptions as exceptions
+import pydemic.pieces as pieces
+import pydemic.records as records
+import pydemic.simulate as simulate
+
+from .utils import default_init
+
+
+def test_recorder_kinds():
+    state = default_init()
+    recorder = records.Recorder(state, [records.PawnMoved, records.StationBuilt])
+    player = state.players['A']
+    player.set_city(state, state.cities['atlanta'])
+    player.set_city(state, state.cities['chicago'])
+    state.cities['chicago'].add_station(state)
+    state.cities['chicago'].add_disease(state, 'blue', 2)
+    assert recorder.records == [
+        records.PawnMoved('A', None, 'atlanta'),
+        records.PawnMoved('A', 'atlanta', 'chicago'),
+        records.StationBuilt('chicago'),
+    ]
+
+
+def test_cubes_and_outbreaks():
+    state = default_init()
+    recorder = records.Recorder(state)
+    city = state.cities['atlanta']
+    city.add_disease(state, 'blue', 3, verbose=False)
+    city.add_disease(state, 'blue', 1, verbose=False)
+    city.remove_disease(state, 'blue')
+    assert recorder.records[0] == records.CubesPlaced('atlanta', 'blue', 3)
+    assert recorder.records[1] == records.Outbreak('atlanta', 'blue')
+    assert recorder.records[2:-1] == [
+        records.CubesPlaced(name, 'blue', 1) for name in city.neighbors
+    ]
+    assert recorder.records[-1] == records.CubesRemoved('atlanta', 'blue', 1)
+
+
+def test_cure_and_eradication():
+    state = default_init()
+    recorder = records.Recorder(state)
+    city = state.cities['atlanta']
+    city.add_disease(state, 'blue', 2, verbose=False)
+    pieces.cure(state, 'blue')
+    city.remove_disease(state, 'blue')
+    assert recorder.records[1:] == [
+        records.Cured('blue'),
+        records.CubesRemoved('atlanta', 'blue', 2),
+        records.Eradicated('blue'),
+    ]
+
+
+def test_winning_cure():
+    state = default_init()
+    recorder = records.Recorder(state, [records.Cured, records.Eradicated])
+    colors = state.disease_track.colors
+    with pytest.raises(exceptions.GameOverWin):
+        for color in colors:
+            pieces.cure(state, color)
+    assert recorder.records == [
+        record for color in colors for record in [records.Cured(color), records.Eradicated(color)]
+    ]
+
+
+def test_game_stream():
+    state = simulate.new_game({'player_num': 2}, seed=0)
+    recorder = records.Recorder(state)
+    simulate.play_game(state, bots.HeuristicPolicy(state), turn_max=12)
+    kinds = [type(record) for record in recorder.records]
+    assert records.CardDrawn in kinds
+    assert records.PawnMoved in kinds
+
+    # Epidemic stages are published in order with the infect stage drawing a card
+    stages = [
+        i for i, record in enumerate(recorder.records) if type(record) is records.EpidemicStage
+    ]
+    assert stages
+    for i in stages[::3]:
+        assert recorder.records[i : i + 2] == [
+            records.EpidemicStage('increase'),
+            records.EpidemicStage('infect'),
+        ]
+        assert recorder.records[i + 2].deck == 'infection'
+
+
+def test_copy_drops_observers():
+    state = default_init()
+    recorder = records.Recorder(state)
+    copy = state.copy()
+    assert not copy.hooks.observers
+    copy.players['A'].set_city(copy, copy.cities['atlanta'])
+    assert recorder.records == []
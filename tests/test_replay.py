@@ -0,0 +1,68 @@
+"""Tests for replay."""
+
+import pytest
+
+import pydemic.bots as bots
+import pydemic.codec as codec
+import pydemic.exceptions as exceptions
+import pydemic.replay as replay
+import pydemic.simulate as simulate
+
+
+def play_encodings(settings, seed, turn_max=None):
+    # Encodings of the state at the start of each turn and at the end of the game
+    state = simulate.new_game(settings, seed)
+    layout = codec.Layout(state)
+    policy = bots.HeuristicPolicy(state)
+    encodings = []
+    try:
+        while turn_max is None or state.turn_count < turn_max:
+            encodings.append(layout.encode(state))
+            simulate.play_turn(state, policy)
+    except exceptions.GameOver:
+        pass
+    encodings.append(layout.encode(state))
+    return encodings
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_seek_every_turn(seed):
+    settings = {'player_num': 3}
+    game, result = replay.Replay.record(settings, seed, bots.HeuristicPolicy, interval=4)
+    assert result == simulate.simulate(settings, seed, bots.HeuristicPolicy)
+    encodings = play_encodings(settings, seed)
+    assert len(encodings) == len(game.turns) + 1
+    assert sorted(game.keyframes) == list(range(0, len(game.turns), 4))
+    for turn in [5, 0, len(game.turns), 3, 8, 7]:
+        if turn <= len(game.turns):
+            state = game.seek(turn)
+            assert game.layout.encode(state) == encodings[turn]
+
+
+def test_seek_in_place_and_continue():
+    settings = {'player_num': 2}
+    game, _ = replay.Replay.record(settings, 0, bots.HeuristicPolicy, interval=3, turn_max=8)
+    encodings = play_encodings(settings, 0, turn_max=8)
+    state = game.seek(2)
+    state = game.seek(7, state)
+    assert game.layout.encode(state) == encodings[7]
+
+    # The generator is restored, so the game continues as it was played
+    simulate.play_turn(state, replay.LogPolicy(game.turns[7]))
+    assert game.layout.encode(state) == encodings[8]
+
+
+def test_build_keyframes_from_log():
+    settings = {'player_num': 2}
+    game, _ = replay.Replay.record(settings, 1, bots.HeuristicPolicy, interval=5, turn_max=12)
+    loaded = replay.Replay(settings, 1, game.turns, interval=5)
+    for turn in [11, 4, 12]:
+        state = loaded.seek(turn)
+        assert loaded.layout.encode(state) == game.layout.encode(game.seek(turn))
+    assert sorted(loaded.keyframes) == sorted(game.keyframes)
+
+
+def test_seek_out_of_range():
+    game, _ = replay.Replay.record({}, 0, turn_max=2)
+    with pytest.raises(ValueError):
+        game.seek(3)
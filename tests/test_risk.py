@@ -0,0 +1,112 @@
+"""Tests for risk."""
+
+import pytest
+
+import pydemic.main as main
+import pydemic.pieces as pieces
+import pydemic.risk as risk
+import pydemic.simulate as simulate
+
+from .utils import default_init
+
+
+def get_cell(forecast, field, city_name, color):
+    i = forecast.cities.index(city_name)
+    j = forecast.colors.index(color)
+    return getattr(forecast, field)[i][j]
+
+
+def test_forecast_empty_board():
+    state = default_init()
+    forecast = risk.forecast(state, draws=2)
+    added = sum(sum(row) for row in forecast.cubes)
+    assert added == pytest.approx(2)  # Each draw adds one cube when no city is full
+    assert all(p == 0 for row in forecast.outbreaks for p in row)
+
+
+def test_forecast_direct_outbreak():
+    state = default_init()
+    card = state.infection_deck.draw_pile[-1]
+    state.infection_deck.set_top([card])  # Reveal the top card
+    city = state.cities[card.name]
+    city.add_disease(state, card.color, 3, verbose=False)
+    forecast = risk.forecast(state, draws=1)
+    assert get_cell(forecast, 'outbreaks', city.name, card.color) == pytest.approx(1)
+    assert get_cell(forecast, 'cubes', city.name, card.color) == 3
+    for neighbor in [state.cities[name] for name in city.neighbors]:
+        assert get_cell(forecast, 'cubes', neighbor.name, card.color) == pytest.approx(1)
+
+
+def test_forecast_one_way_neighbor():
+    state = default_init()
+    card = next(card for card in state.infection_deck.draw_pile if card.name == 'kolkata')
+    state.infection_deck.draw_pile.remove(card)
+    state.infection_deck.draw_pile.append(card)
+    state.infection_deck.set_top([card])
+    state.cities['kolkata'].add_disease(state, 'black', 3, verbose=False)
+    forecast = risk.forecast(state, draws=1)
+    # Kolkata lists Bangkok as a neighbor, but Bangkok does not list Kolkata
+    assert get_cell(forecast, 'cubes', 'bangkok', 'black') == pytest.approx(1)
+
+
+def test_forecast_chain_outbreak():
+    state = default_init()
+    card = state.infection_deck.draw_pile[-1]
+    state.infection_deck.set_top([card])
+    city = state.cities[card.name]
+    neighbor = state.cities[city.neighbors[0]]
+    city.add_disease(state, card.color, 3, verbose=False)
+    neighbor.add_disease(state, card.color, 3, verbose=False)
+    forecast = risk.forecast(state, draws=1)
+    assert get_cell(forecast, 'outbreaks', neighbor.name, card.color) == pytest.approx(1)
+
+
+def test_forecast_cube_max(monkeypatch):
+    monkeypatch.setattr(pieces.City, 'cube_max', 4)
+    state = default_init()
+    card = state.infection_deck.draw_pile[-1]
+    state.infection_deck.set_top([card])
+    city = state.cities[card.name]
+    city.add_disease(state, card.color, 3, verbose=False)
+    forecast = risk.forecast(state, draws=1)
+    assert get_cell(forecast, 'outbreaks', city.name, card.color) == 0
+    assert get_cell(forecast, 'cubes', city.name, card.color) == pytest.approx(4)
+
+
+def test_forecast_capped_cubes():
+    state = default_init()
+    deck = state.infection_deck
+    top = [card for card in deck.draw_pile if card.name in ('atlanta', 'chicago')]
+    deck.draw_pile = [card for card in deck.draw_pile if card not in top] + top
+    deck.strata = [stratum - {'atlanta', 'chicago'} for stratum in deck.strata]
+    deck.strata = [stratum for stratum in deck.strata if stratum] + [{'atlanta', 'chicago'}]
+    state.cities['atlanta'].add_disease(state, 'blue', 2, verbose=False)
+    state.cities['chicago'].add_disease(state, 'blue', 3, verbose=False)
+    forecast = risk.forecast(state, draws=1)
+    # Atlanta gains a cube if it is drawn or Chicago outbreaks but never more than one
+    assert get_cell(forecast, 'cubes', 'atlanta', 'blue') == pytest.approx(2 + 1 - 0.5 * 0.5)
+
+
+def test_forecast_immunity():
+    state = default_init(role_map={'A': 'quarantine_specialist'})
+    card = state.infection_deck.draw_pile[-1]
+    city = state.cities[card.name]
+    state.players['A'].set_city(state, city)
+    forecast = risk.forecast(state, draws=1)
+    assert get_cell(forecast, 'cubes', city.name, card.color) == 0
+
+
+def test_expected_outbreaks():
+    state = simulate.new_game({}, seed=0)
+    forecast = risk.forecast(state)
+    assert risk.expected_outbreaks(state) == pytest.approx(
+        sum(sum(row) for row in forecast.outbreaks)
+    )
+
+
+def test_print_status_risk(capsys):
+    state = simulate.new_game({}, seed=0)
+    main.print_status(state, 'risk')
+    out = capsys.readouterr().out
+    assert out.startswith('INFECTION RISK')
+    assert 'Expected outbreaks' in out
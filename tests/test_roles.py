@@ -4,6 +4,7 @@ import pytest
 
 import pydemic.cards as cards
 import pydemic.roles as roles
+import pydemic.simulate as simulate
 from .utils import default_init
 
 
@@ -332,6 +333,37 @@ def test_pass():
     assert player.action_count == action_count - 1
 
 
+def test_color_counts():
+    state = default_init()
+    player_1 = state.players['A']
+    player_2 = state.players['B']
+    city = state.cities['atlanta']
+    player_1.set_city(state, city)
+    player_2.set_city(state, city)
+    player_1.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, city.name))
+    player_1.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, 'airlift'))
+    assert player_1.color_counts[city.color] == 1
+    assert player_1.event_count == 1
+    player_1.share(state, player_2.name, city.name)
+    assert player_1.color_counts[city.color] == 0
+    assert player_2.color_counts[city.color] == 1
+    player_1.discard(state, 'airlift')
+    assert player_1.event_count == 0
+
+
+@pytest.mark.parametrize('role', ['scientist', roles.Player])
+def test_can_cure(role):
+    state = default_init(role_map={'A': role})
+    player = state.players['A']
+    color = 'blue'
+    cure_cards = [card for card in state.player_deck.draw_pile if card.color == color]
+    for card in cure_cards[: player.cure_num - 1]:
+        player.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, card.name))
+    assert not player.can_cure(color)
+    player.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, cure_cards[-1].name))
+    assert player.can_cure(color)
+
+
 # Contingency planner tests
 def test_contingency_success():
     state = default_init(role_map={'A': 'contingency_planner'})
@@ -603,6 +635,22 @@ def test_medic_immunity():
     assert player.immunity(state, city, color)
 
 
+def test_medic_immunity_index():
+    state = default_init(role_map={'A': 'medic'})
+    player = state.players['A']
+    city_1 = state.cities['atlanta']
+    city_2 = state.cities['chicago']
+    color = 'blue'
+    player.set_city(state, city_1)
+    assert not city_1.immunity(state, color)
+    simulate.cure(state, player, color)
+    assert city_1.immunity(state, color)
+    player.set_city(state, city_2)
+    assert not city_1.immunity(state, color)
+    assert city_2.immunity(state, color)
+    assert not city_2.immunity(state, 'red')
+
+
 def test_medic_not_immunity_not_cured():
     state = default_init(role_map={'A': 'medic'})
     player = state.players['A']
@@ -718,15 +766,30 @@ def test_quarantine_specialist_immunity():
     state = default_init(role_map={'A': 'quarantine_specialist'})
     player = state.players['A']
     city = state.cities['atlanta']
-    for neighbor in city.neighbors.values():
+    for neighbor in [state.cities[name] for name in city.neighbors]:
         for color in state.disease_track.colors:
             assert not player.immunity(state, neighbor, color)
     player.set_city(state, city)
-    for neighbor in city.neighbors.values():
+    for neighbor in [state.cities[name] for name in city.neighbors]:
         for color in state.disease_track.colors:
             assert player.immunity(state, neighbor, color)
 
 
+def test_quarantine_specialist_immunity_index():
+    state = default_init(role_map={'A': 'quarantine_specialist'})
+    player = state.players['A']
+    city_1 = state.cities['atlanta']
+    city_2 = state.cities['tokyo']
+    player.set_city(state, city_1)
+    player.set_city(state, city_2)
+    assert state.quarantined == {city_2.name, *city_2.neighbors}  # No stale cities
+    assert not state.immunities
+    for name in [city_2.name, *city_2.neighbors]:
+        assert state.cities[name].immunity(state, 'red')
+    for name in [city_1.name, *city_1.neighbors]:
+        assert not state.cities[name].immunity(state, 'red')
+
+
 # Researcher tests
 def test_researcher_share_success():
     state = default_init(role_map={'A': 'researcher', 'B': roles.Player})
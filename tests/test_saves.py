@@ -0,0 +1,131 @@
+"""Tests for saves."""
+
+import json
+import random
+
+import pytest
+
+import pydemic.bots as bots
+import pydemic.exceptions as exceptions
+import pydemic.main as main
+import pydemic.saves as saves
+import pydemic.simulate as simulate
+import pydemic.zobrist as zobrist
+
+from .utils import default_init
+
+
+def play(state, turns):
+    policy = bots.HeuristicPolicy(state)
+    for _ in range(turns):
+        simulate.play_turn(state, policy)
+    return state
+
+
+def assert_same(state_1, state_2):
+    assert state_1.hash == state_2.hash == zobrist.compute_hash(state_2)
+    assert [card.name for card in state_1.player_deck.draw_pile] == [
+        card.name for card in state_2.player_deck.draw_pile
+    ]
+    assert [card.name for card in state_1.infection_deck.draw_pile] == [
+        card.name for card in state_2.infection_deck.draw_pile
+    ]
+    assert state_1.player_order == state_2.player_order
+    assert (state_1.draw_count, state_1.infect_count) == (state_2.draw_count, state_2.infect_count)
+    for name, player in state_1.players.items():
+        other = state_2.players[name]
+        assert type(other) is type(player)
+        assert other.city.name == player.city.name
+        assert list(other.hand) == list(player.hand)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_round_trip(tmp_path, seed):
+    state = play(simulate.new_game({'player_num': 4}, seed), 5)
+    path = tmp_path / 'game.sav'
+    saves.save(state, path)
+    loaded, phase = saves.load(path)
+    assert phase == 'action'
+    assert_same(state, loaded)
+
+
+def test_load_in_place():
+    state_1 = play(simulate.new_game({'player_num': 3}, 0), 2)
+    state_2 = play(state_1.copy(), 4)
+    loaded, _ = saves.loads(saves.dumps(state_1))
+    loaded, _ = saves.loads(saves.dumps(state_2), loaded)
+    assert_same(state_2, loaded)
+
+
+def test_load_does_not_advance_generator():
+    state = simulate.new_game({'player_num': 2}, 0)
+    data = saves.dumps(state, 'draw')
+    saves.layouts.clear()
+    random_state = random.getstate()
+    loaded, _ = saves.loads(data)
+    assert random.getstate() == random_state
+    assert loaded.rng.getstate() != state.rng.getstate()
+
+
+def test_phase():
+    state = default_init()
+    for player in state.players.values():
+        player.set_city(state, state.cities['atlanta'])
+    state.draw_count, state.infect_count = 2, 2
+    assert saves.get_phase(state) == 'action'
+    state.current_player.action_count = 0
+    assert saves.get_phase(state) == 'draw'
+    state.draw_count = 0
+    assert saves.get_phase(state) == 'infect'
+    _, phase = saves.loads(saves.dumps(state))
+    assert phase == 'infect'
+
+
+def test_bad_data():
+    state = simulate.new_game({'player_num': 2}, 0)
+    data = saves.dumps(state)
+    with pytest.raises(ValueError):
+        saves.loads(b'XXXX' + data[4:])
+    with pytest.raises(ValueError):
+        saves.loads(data[:4] + (99).to_bytes(2, 'little') + data[6:])
+    with pytest.raises(ValueError):
+        saves.loads(b'')
+    for n in [1, 2, 100]:
+        with pytest.raises(ValueError):
+            saves.loads(data[:-n])  # Truncated values
+
+    # Header without a setting
+    prefix_size = saves.prefix.size
+    _, _, header_size = saves.prefix.unpack_from(data)
+    header = json.loads(data[prefix_size : prefix_size + header_size])
+    del header['cube_num']
+    header = json.dumps(header).encode()
+    with pytest.raises(ValueError):
+        saves.loads(
+            saves.prefix.pack(saves.magic, saves.version, len(header))
+            + header
+            + data[prefix_size + header_size :]
+        )
+
+
+def test_resume_infect_phase(monkeypatch):
+    state = simulate.new_game({'player_num': 2}, 0)
+    state.current_player.action_count = 0
+    state.draw_count, state.infect_count = 0, 2
+    state, phase = saves.loads(saves.dumps(state))
+    commands = iter(['infect', 'infect'])
+    monkeypatch.setattr('builtins.input', lambda prompt: next(commands))
+    discard_num = len(state.infection_deck.discard_pile)
+    main.play_turn(state, phase)
+    assert state.turn_count == 1
+    assert len(state.infection_deck.discard_pile) == discard_num + 2
+
+
+def test_load_command(tmp_path):
+    state = simulate.new_game({'player_num': 2}, 0)
+    path = tmp_path / 'game.sav'
+    saves.save(state, path)
+    with pytest.raises(exceptions.GameLoaded) as info:
+        main.load_game(state, str(path))
+    assert info.value.phase == 'action'
+    assert_same(state, info.value.state)
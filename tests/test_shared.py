@@ -0,0 +1,55 @@
+"""Tests for shared."""
+
+import pickle
+
+import pytest
+
+import pydemic.bots as bots
+import pydemic.codec as codec
+import pydemic.mcts as mcts
+import pydemic.shared as shared
+import pydemic.simulate as simulate
+
+
+def test_state_batch():
+    state = simulate.new_game({}, seed=0)
+    layout = codec.Layout(state)
+    batch = shared.StateBatch(layout, 2, result_width=2)
+    try:
+        batch.put(1, state)
+        assert batch.get(1).hash == state.hash
+        batch.set_result(1, [0.5, 2])
+        assert batch.get_result(1) == [0.5, 2.0]
+
+        # Attach to the same block by name
+        other = shared.StateBatch(layout, 2, result_width=2, name=batch.name)
+        assert other.get(1).hash == state.hash
+        assert other.get_result(1) == [0.5, 2.0]
+        other.close()
+
+        # Pickles attach to the same block
+        other = pickle.loads(pickle.dumps(batch))
+        assert other.name == batch.name
+        assert other.get_result(1) == [0.5, 2.0]
+        other.close()
+    finally:
+        batch.close()
+        batch.unlink()
+
+
+def evaluate(state):
+    return [mcts.evaluate(state), state.turn_count]
+
+
+@pytest.mark.parametrize('start_method', ['fork', 'spawn'])
+def test_map_states(start_method):
+    state = simulate.new_game({}, seed=0)
+    policy = bots.HeuristicPolicy(state)
+    states = [state.copy()]
+    for _ in range(3):
+        simulate.play_turn(state, policy)
+        states.append(state.copy())
+    results = shared.map_states(
+        evaluate, states, processes=2, result_width=2, start_method=start_method
+    )
+    assert results == [evaluate(state) for state in states]
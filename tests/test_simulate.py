@@ -0,0 +1,135 @@
+"""Tests for simulate."""
+
+import random
+
+import pytest
+
+import pydemic.bots as bots
+import pydemic.cards as cards
+import pydemic.roles as roles
+import pydemic.simulate as simulate
+
+from .utils import default_init
+
+
+def test_new_game_settings():
+    state = simulate.new_game({'player_num': 3, 'epidemic_num': 5, 'station_num': 3}, seed=0)
+    assert len(state.players) == 3
+    assert sum(card.type == 'epidemic' for card in state.player_deck.draw_pile) == 5
+    assert state.station_count == 2
+    assert state.cities['atlanta'].station
+
+
+def test_new_game_seeded():
+    state_1 = simulate.new_game({}, seed=1)
+    state_2 = simulate.new_game({}, seed=1)
+    names_1 = [card.name for card in state_1.player_deck.draw_pile]
+    names_2 = [card.name for card in state_2.player_deck.draw_pile]
+    assert names_1 == names_2
+
+
+class GlobalRandomPolicy(bots.HeuristicPolicy):
+    def choose_action(self, state, player):
+        random.random()
+        return super().choose_action(state, player)
+
+
+def test_new_game_own_generator():
+    # Games shuffle with their own generators, so other users of the global generator and other
+    # games do not change how a seeded game plays out
+    state_1 = simulate.new_game({'player_num': 4}, seed=2)
+    state_2 = simulate.new_game({'player_num': 4}, seed=2)
+    result_1 = simulate.play_game(state_1, GlobalRandomPolicy(state_1))
+    simulate.simulate({'player_num': 4}, seed=3, policy=bots.HeuristicPolicy)
+    result_2 = simulate.play_game(state_2, bots.HeuristicPolicy(state_2))
+    assert result_1 == result_2
+    assert state_1.hash == state_2.hash
+    assert state_1.rng.getstate() == state_2.rng.getstate()
+
+
+def test_simulate_threads():
+    seeds = range(12)
+    results = simulate.simulate_threads({'player_num': 4}, seeds, bots.HeuristicPolicy, threads=4)
+    assert results == [
+        simulate.simulate({'player_num': 4}, seed, bots.HeuristicPolicy) for seed in seeds
+    ]
+
+
+def test_play_turn():
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    hand_size = len(player.hand)
+    deck_size = len(state.player_deck.draw_pile)
+    simulate.play_turn(state, bots.Policy(state))
+    assert state.turn_count == 1
+    assert player.action_count == player.action_num
+    assert len(state.player_deck.draw_pile) == deck_size - 2
+    assert len(player.hand) <= min(hand_size + 2, player.hand_max)
+
+
+def test_play_game_pass(capsys):
+    result = simulate.simulate({}, seed=0)
+    assert not result.win
+    assert result.reason in ['outbreaks', 'cubes', 'cards']
+    assert capsys.readouterr().out == ''
+
+
+def test_play_game_turn_max():
+    state = simulate.new_game({}, seed=0)
+    result = simulate.play_game(state, bots.Policy(state), turn_max=1)
+    assert result == simulate.GameResult(False, 1, 'turns')
+
+
+@pytest.mark.parametrize('role', [roles.Player, 'medic'])
+def test_apply_action_treat(role):
+    state = default_init(role_map={'A': role})
+    player = state.players['A']
+    city = state.cities['atlanta']
+    player.set_city(state, city)
+    city.add_disease(state, 'blue', 3, verbose=False)
+    simulate.apply_action(state, player, ('treat', 'blue'))
+    assert city.cubes['blue'] == (0 if role == 'medic' else 2)
+    assert player.action_count == player.action_num - 1
+
+
+def test_apply_action_share():
+    state = simulate.new_game({}, seed=0)
+    player_1, player_2 = state.players.values()
+    card = cards.pop_by_name(state.player_deck.draw_pile, player_1.city.name)
+    player_2.add_card(state, card)
+    simulate.apply_action(state, player_1, ('share', player_2.name, card.name))
+    assert card in player_1.hand.values()
+    assert card not in player_2.hand.values()
+
+
+def test_apply_event_forecast():
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    player.add_card(state, cards.pop_by_name(state.player_deck.draw_pile, 'forecast'), limit=False)
+    order = [5, 1, 4, 0, 3, 2]
+    old_top = state.infection_deck.draw_pile[-1:-7:-1]
+    simulate.apply_event(state, (player.name, 'forecast', *order))
+    new_top = state.infection_deck.draw_pile[-1:-7:-1]
+    for idx, card in zip(order, new_top):
+        assert card is old_top[idx]
+    assert 'forecast' not in player.hand
+
+
+def test_legal_actions():
+    state = simulate.new_game({'player_num': 2}, seed=0)
+    player = state.current_player
+    legal = simulate.legal_actions(state, player)
+    for neighbor in player.city.neighbors:
+        assert ('ground', neighbor) in legal
+    assert ('pass',) in legal
+    assert ('station', None) not in legal or player.role == 'operations_expert'
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_legal_actions_apply(seed):
+    # Every legal action applies without error
+    state = simulate.new_game({'player_num': 4}, seed=seed)
+    player = state.current_player
+    for action in simulate.legal_actions(state, player):
+        copy = state.copy()
+        simulate.apply_action(copy, copy.players[player.name], action)
@@ -0,0 +1,50 @@
+"""Tests for startup imports."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+interactive_modules = ['readline', 'inspect']
+command_modules = [
+    'pydemic.autosave',
+    'pydemic.codec',
+    'pydemic.paths',
+    'pydemic.risk',
+    'pydemic.saves',
+]
+game_modules = ['pydemic.main', 'pydemic.roles', 'pydemic.cards', 'pydemic.pieces']
+
+
+def run(*args):
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, check=True, env=env, text=True
+    )
+
+
+def imported_modules(*args):
+    """Return the modules imported by the interpreter, as reported by -X importtime."""
+    process = run('-X', 'importtime', *args)
+    modules = set()
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            modules.add(line.split('|')[-1].strip())
+    return modules
+
+
+@pytest.mark.parametrize('flag', ['--help', '--version'])
+def test_cli_flags_skip_game_modules(flag):
+    modules = imported_modules('-m', 'pydemic', flag)
+    assert 'pydemic.argfuncs' in modules
+    for module in interactive_modules + command_modules + game_modules:
+        assert module not in modules
+
+
+def test_library_import_skips_interactive_modules():
+    code = 'import sys; import pydemic.main; print("\\n".join(sys.modules))'
+    modules = set(run('-c', code).stdout.split())
+    assert 'pydemic.main' in modules
+    for module in interactive_modules + command_modules:
+        assert module not in modules
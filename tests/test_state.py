@@ -0,0 +1,138 @@
+"""Tests for state."""
+
+import gc
+import pickle
+import tracemalloc
+
+import pytest
+
+import pydemic.bots as bots
+import pydemic.cards as cards
+import pydemic.roles as roles
+import pydemic.simulate as simulate
+import pydemic.zobrist as zobrist
+
+from .utils import default_init
+
+
+def play(state, turns):
+    policy = bots.HeuristicPolicy(state)
+    for _ in range(turns):
+        simulate.play_turn(state, policy)
+    return state
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_pickle_round_trip(seed):
+    state = play(simulate.new_game({'player_num': 4}, seed), 4)
+    loaded = pickle.loads(pickle.dumps(state))
+    assert loaded.hash == state.hash == zobrist.compute_hash(loaded)
+    assert list(loaded.stations) == list(state.stations)
+    for name, city in state.cities.items():
+        other = loaded.cities[name]
+        assert other.site is city.site
+        assert list(other.players) == list(city.players)
+    for name, player in state.players.items():
+        other = loaded.players[name]
+        assert other.city is loaded.cities[player.city.name]
+        assert other.actions.keys() == player.actions.keys()
+        assert other.color_counts == player.color_counts
+
+    # Both states play on identically, since the generator is pickled with the state
+    result = simulate.play_game(state, bots.HeuristicPolicy(state))
+    assert simulate.play_game(loaded, bots.HeuristicPolicy(loaded)) == result
+
+
+def test_pickle_roles():
+    role_map = {
+        'A': 'dispatcher',
+        'B': 'medic',
+        'C': 'quarantine_specialist',
+        'D': 'contingency_planner',
+    }
+    state = default_init(role_map=role_map)
+    for player in state.players.values():
+        player.set_city(state, state.cities['atlanta'])
+    simulate.cure(state, state.players['B'], 'blue')
+    loaded = pickle.loads(pickle.dumps(state))
+    assert loaded.immunities == state.immunities
+    assert loaded.cities['chicago'].immunity(loaded, 'red')
+
+    # Dispatcher actions are closures over the unpickled player
+    dispatcher = loaded.players['A']
+    dispatcher.actions['ground'](loaded, 'chicago', 'B')
+    assert loaded.players['B'].city.name == 'chicago'
+    assert loaded.players['B'].immunity(loaded, loaded.cities['chicago'], 'blue')
+    assert state.players['B'].city.name == 'atlanta'
+
+
+def test_pickle_cards():
+    for card in [cards.Card('infection', 'atlanta', 'blue'), *cards.event_cards]:
+        loaded = pickle.loads(pickle.dumps(card))
+        assert (loaded.type, loaded.name, loaded.color) == (card.type, card.name, card.color)
+    card = pickle.loads(pickle.dumps(cards.event_cards[0]))
+    assert card.event is cards.event_cards[0].event
+
+
+def test_rng_copies_continue_stream():
+    state = simulate.new_game({}, 0)
+    play(state, 5)
+    copies = [state.copy(), pickle.loads(pickle.dumps(state))]
+    for copy in copies:
+        assert copy.rng.getstate() == state.rng.getstate()
+    draws = [state.rng.getrandbits(64) for _ in range(3)]
+    for copy in copies:
+        assert [copy.rng.getrandbits(64) for _ in range(3)] == draws
+        assert copy.rng.position == state.rng.position
+
+
+def test_rng_position():
+    state = simulate.new_game({}, 0)
+    state.rng.seed(1)
+    assert state.rng.position == 0
+    state.rng.random()
+    state.rng.getrandbits(64)
+    assert state.rng.position == 4
+    state.rng.shuffle(list(range(10)))
+    assert state.rng.position >= 4 + 9  # One word per swap unless a draw is rejected
+
+
+def state_bytes(n=100):
+    """Return the bytes allocated per copy of a new four-player game on the default map."""
+    state = simulate.new_game({'player_num': 4}, 0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        copies = [state.copy() for _ in range(n)]
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    assert len(copies) == n
+    return size / n
+
+
+def test_state_memory():
+    size = state_bytes()
+    print(f'{size:.0f} bytes per GameState')
+    assert size < 32_000
+
+
+def test_pieces_are_slotted():
+    state = play(simulate.new_game({'player_num': 4}, 0), 4)
+    pieces = [
+        state,
+        state.hooks,
+        state.disease_track,
+        state.outbreak_track,
+        state.infection_track,
+        state.player_deck,
+        state.infection_deck,
+        *state.cities.values(),
+        *[role('A') for role in roles.roles.values()],
+        *state.player_deck.draw_pile,
+        *state.infection_deck.draw_pile,
+    ]
+    for piece in pieces:
+        assert not hasattr(piece, '__dict__'), type(piece).__name__
@@ -0,0 +1,69 @@
+"""Tests for sweep."""
+
+import csv
+from argparse import ArgumentTypeError
+
+import pytest
+
+import pydemic.simulate as simulate
+import pydemic.sweep as sweep
+
+
+def test_int_grid():
+    assert sweep.int_grid('4:6,8') == [4, 5, 6, 8]
+
+
+def test_int_grid_fail():
+    with pytest.raises(ArgumentTypeError):
+        sweep.int_grid('4:six')
+
+
+def test_get_cells():
+    args = sweep.parse_args(['--player_num', '2:3', '--epidemic_num', '4,6', '--map', 'default'])
+    cells = sweep.get_cells(args)
+    assert len(cells) == 4
+    assert {(cell['player_num'], cell['epidemic_num']) for cell in cells} == {
+        (2, 4),
+        (2, 6),
+        (3, 4),
+        (3, 6),
+    }
+
+
+def test_get_cells_invalid():
+    args = sweep.parse_args(['--epidemic_num', '3'])
+    with pytest.raises(SystemExit):
+        sweep.get_cells(args)
+
+
+def test_summarize():
+    results = [
+        simulate.GameResult(True, 10, None),
+        simulate.GameResult(False, 6, 'outbreaks'),
+        simulate.GameResult(False, 8, 'cards'),
+        simulate.GameResult(False, 4, 'outbreaks'),
+    ]
+    row = sweep.summarize({'player_num': 2}, results)
+    assert row['games'] == 4
+    assert row['win_rate'] == 0.25
+    assert row['ci_lower'] < 0.25 < row['ci_upper']
+    assert row['mean_turns'] == 7
+    assert row['loss_outbreaks'] == 2
+    assert row['loss_cards'] == 1
+    assert row['loss_cubes'] == 0
+
+
+def test_main(tmp_path):
+    path = tmp_path / 'sweep.csv'
+    argv = ['--player_num', '2,4', '--seeds', '3', '--processes', '2', '--output', str(path)]
+    sweep.main(argv)
+    with open(path) as file:
+        rows = list(csv.DictReader(file))
+    assert [row['player_num'] for row in rows] == ['2', '4']
+    assert all(row['games'] == '3' for row in rows)
+
+
+def test_sweep_threads():
+    cells = [{'player_num': 2}, {'player_num': 4}]
+    rows = sweep.sweep(cells, range(4), 'heuristic', processes=2, threads=True)
+    assert rows == sweep.sweep(cells, range(4), 'heuristic', processes=2)
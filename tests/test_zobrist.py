@@ -0,0 +1,99 @@
+"""Tests for zobrist."""
+
+import pytest
+
+import pydemic.bots as bots
+import pydemic.exceptions as exceptions
+import pydemic.simulate as simulate
+import pydemic.zobrist as zobrist
+
+from .utils import default_init
+
+
+def test_key_deterministic():
+    assert zobrist.key('cubes', 'atlanta', 'blue', 1) == zobrist.key('cubes', 'atlanta', 'blue', 1)
+    assert zobrist.key('cubes', 'atlanta', 'blue', 1) != zobrist.key('cubes', 'atlanta', 'blue', 2)
+    assert 0 <= zobrist.key('station', 'atlanta') < 2**64
+
+
+def test_hash_new_game():
+    state = simulate.new_game({}, seed=0)
+    assert state.hash == zobrist.compute_hash(state)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_hash_play_game(seed):
+    state = simulate.new_game({'player_num': 4}, seed=seed)
+    policy = bots.HeuristicPolicy(state)
+    try:
+        for _ in range(20):
+            simulate.play_turn(state, policy)
+            assert state.hash == zobrist.compute_hash(state)
+    except exceptions.GameOver:
+        pass
+
+
+def test_hash_disease_reversible():
+    state = default_init()
+    city = state.cities['atlanta']
+    h = state.hash
+    city.add_disease(state, 'blue', 2, verbose=False)
+    assert state.hash != h
+    city.remove_disease(state, 'blue')
+    city.remove_disease(state, 'blue')
+    assert state.hash == h
+
+
+def test_hash_transposition():
+    state_1 = simulate.new_game({}, seed=0)
+    state_2 = state_1.copy()
+    player_1 = state_1.current_player
+    player_2 = state_2.current_player
+    start = player_1.city.name
+    neighbor = next(iter(player_1.city.neighbors))
+
+    # Moving away and back reaches the same position as passing twice
+    simulate.apply_action(state_1, player_1, ('ground', neighbor))
+    assert state_1.hash != state_2.hash
+    simulate.apply_action(state_1, player_1, ('ground', start))
+    simulate.apply_action(state_2, player_2, ('pass',))
+    simulate.apply_action(state_2, player_2, ('pass',))
+    assert state_1.hash == state_2.hash
+
+
+def test_hash_share():
+    state = simulate.new_game({}, seed=0)
+    player = state.current_player
+    other = next(other for other in state.players.values() if other is not player)
+    card_name = next(iter(player.hand))
+    h = state.hash
+    other.add_card(state, player.remove_card(card_name), limit=False)
+    assert state.hash != h
+    assert state.hash == zobrist.compute_hash(state)
+
+
+def test_hash_forecast():
+    state_1 = simulate.new_game({}, seed=0)
+    state_2 = state_1.copy()
+    h = state_1.hash
+
+    # Forecasts reveal the order of the top cards, so different orders are different positions
+    simulate.forecast_event(state_1, 0, 1, 2, 3, 4, 5)
+    simulate.forecast_event(state_2, 1, 0, 2, 3, 4, 5)
+    assert len({h, state_1.hash, state_2.hash}) == 3
+    for state in [state_1, state_2]:
+        assert state.hash == zobrist.compute_hash(state)
+        state.infection_deck.draw(state, verbose=False)
+        assert state.hash == zobrist.compute_hash(state)
+
+
+def test_hash_phase():
+    state = simulate.new_game({}, seed=0)
+    state.draw_count, state.infect_count = 2, 2
+    player = state.current_player
+    while player.action_count > 0:
+        simulate.apply_action(state, player, ('pass',))
+    h = state.hash
+    state.draw_count = 0  # Same pieces, but the draw phase is over
+    assert state.hash != h
+    assert state.hash == zobrist.compute_hash(state)